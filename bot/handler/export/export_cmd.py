@@ -1,5 +1,7 @@
-import json
+import asyncio
+import gzip
 import os
+import shutil
 import tempfile
 import logging
 from typing import List, Dict, Any, Optional
@@ -13,11 +15,34 @@ from datetime import datetime
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
 
-from scrap.core.exporter import DataExporter
+from scrap.core.exporter import DataExporter, PYARROW_AVAILABLE, write_json_stream
 from scrap.analysis.filters import load_ads_data
 
 logger = logging.getLogger(__name__)
 
+# Au-delà de cette taille, l'export JSON est envoyé compressé en gzip
+JSON_GZIP_THRESHOLD = 1024 * 1024
+# Légende des fichiers envoyés par export_all_formats
+FORMAT_LABELS = {
+    'json': "📄 Export JSON",
+    'csv': "📊 Export CSV",
+    'excel': "📈 Export Excel",
+    'parquet': "🗜️ Export Parquet",
+    'feather': "🏹 Export Feather",
+}
+
+def _gzip_if_large(path: str) -> str:
+    """Remplace le fichier par sa version gzippée s'il dépasse JSON_GZIP_THRESHOLD"""
+    if os.path.getsize(path) <= JSON_GZIP_THRESHOLD:
+        return path
+    gz_path = path + '.gz'
+    try:
+        with open(path, 'rb') as src, gzip.open(gz_path, 'wb', compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst)
+    finally:
+        os.unlink(path)
+    return gz_path
+
 class BotExporter:
     """Classe pour exporter et envoyer des fichiers via Telegram"""
     
@@ -31,25 +56,36 @@ class BotExporter:
         logger.info(f"Total des données chargées: {len(data)} éléments")
         return data
     
+    def _write_json_file(self, data: List[Dict[str, Any]]) -> str:
+        """Écrit l'export JSON compact dans un fichier temporaire, gzippé s'il est volumineux"""
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+            write_json_stream(data, f)
+            temp_path = f.name
+        return _gzip_if_large(temp_path)
+    
     async def export_and_send_json(self, message: Message, data: List[Dict[str, Any]], filename: Optional[str] = None) -> bool:
-        """Exporte et envoie un fichier JSON"""
+        """Exporte et envoie un fichier JSON (compact, compressé en gzip au-delà de JSON_GZIP_THRESHOLD)"""
         try:
-            # Créer un fichier temporaire
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-                temp_path = f.name
+            # Écriture en flux hors de la boucle asyncio
+            temp_path = await asyncio.to_thread(self._write_json_file, data)
+            compressed = temp_path.endswith('.gz')
             
             # Envoyer le fichier
             file_name = filename or f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            if compressed and not file_name.endswith('.gz'):
+                file_name += '.gz'
             file = FSInputFile(temp_path, filename=file_name)
+            size_kb = os.path.getsize(temp_path) / 1024
             
-            await message.answer_document(
-                document=file,
-                caption=f"📄 Export JSON\n📊 {len(data)} annonces\n📅 {datetime.now().strftime('%d/%m/%Y %H:%M')}"
-            )
-            
-            # Nettoyer le fichier temporaire
-            os.unlink(temp_path)
+            try:
+                await message.answer_document(
+                    document=file,
+                    caption=f"📄 Export JSON{' (gzip)' if compressed else ''}\n📊 {len(data)} annonces\n"
+                            f"💾 {size_kb:.0f} Ko\n📅 {datetime.now().strftime('%d/%m/%Y %H:%M')}"
+                )
+            finally:
+                # Nettoyer le fichier temporaire
+                os.unlink(temp_path)
             return True
             
         except Exception as e:
@@ -91,6 +127,12 @@ class BotExporter:
             await message.answer(f"❌ Erreur lors de l'export CSV: {e}")
             return False
     
+    def _write_excel_file(self, data: List[Dict[str, Any]], path: str) -> pd.DataFrame:
+        """Écrit l'export Excel et retourne le DataFrame aplati (pour la légende)"""
+        frames = self.exporter.build_frames(data)
+        self.exporter._write_excel(frames, path)
+        return frames.flat
+    
     async def export_and_send_excel(self, message: Message, data: List[Dict[str, Any]], filename: Optional[str] = None) -> bool:
         """Exporte et envoie un fichier Excel"""
         try:
@@ -98,21 +140,12 @@ class BotExporter:
                 await message.answer("❌ Aucune donnée à exporter")
                 return False
             
-            # Convertir en DataFrame
-            df = pd.DataFrame(data)
-            df_flat = self.exporter._flatten_dataframe(df)
-            df_simple = self.exporter._simplify_dataframe(df)
-            stats_df = self.exporter._create_stats_dataframe(data)
-            
             # Créer un fichier temporaire
             with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as f:
                 temp_path = f.name
             
-            # Écrire le fichier Excel
-            with pd.ExcelWriter(temp_path, engine='openpyxl') as writer:
-                df_flat.to_excel(writer, sheet_name='Données', index=False)
-                df_simple.to_excel(writer, sheet_name='Données_Originales', index=False)
-                stats_df.to_excel(writer, sheet_name='Statistiques', index=False)
+            # Construire les DataFrames et écrire le classeur en flux, hors de la boucle asyncio
+            df_flat = await asyncio.to_thread(self._write_excel_file, data, temp_path)
             
             # Envoyer le fichier
             file_name = filename or f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
@@ -132,8 +165,60 @@ class BotExporter:
             await message.answer(f"❌ Erreur lors de l'export Excel: {e}")
             return False
     
+    def _write_arrow_file(self, data: List[Dict[str, Any]], fmt: str) -> str:
+        """Écrit l'export Parquet ou Feather dans un fichier temporaire"""
+        df_flat = self.exporter._arrow_dataframe(data)
+        with tempfile.NamedTemporaryFile(suffix=f'.{fmt}', delete=False) as f:
+            temp_path = f.name
+        if fmt == 'parquet':
+            df_flat.to_parquet(temp_path, engine='pyarrow', compression='zstd', index=False)
+        else:
+            df_flat.to_feather(temp_path, compression='zstd')
+        return temp_path
+    
+    async def _export_and_send_arrow(self, message: Message, data: List[Dict[str, Any]], fmt: str,
+                                     label: str, filename: Optional[str] = None) -> bool:
+        try:
+            if not data:
+                await message.answer("❌ Aucune donnée à exporter")
+                return False
+            
+            temp_path = await asyncio.to_thread(self._write_arrow_file, data, fmt)
+            
+            # Envoyer le fichier
+            file_name = filename or f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+            file = FSInputFile(temp_path, filename=file_name)
+            size_kb = os.path.getsize(temp_path) / 1024
+            
+            try:
+                await message.answer_document(
+                    document=file,
+                    caption=f"🗜️ Export {label}\n📊 {len(data)} annonces\n💾 {size_kb:.0f} Ko\n"
+                            f"📅 {datetime.now().strftime('%d/%m/%Y %H:%M')}"
+                )
+            finally:
+                # Nettoyer le fichier temporaire
+                os.unlink(temp_path)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de l'export {label}: {e}")
+            await message.answer(f"❌ Erreur lors de l'export {label}: {e}")
+            return False
+    
+    async def export_and_send_parquet(self, message: Message, data: List[Dict[str, Any]], filename: Optional[str] = None) -> bool:
+        """Exporte et envoie un fichier Parquet"""
+        return await self._export_and_send_arrow(message, data, 'parquet', 'Parquet', filename)
+    
+    async def export_and_send_feather(self, message: Message, data: List[Dict[str, Any]], filename: Optional[str] = None) -> bool:
+        """Exporte et envoie un fichier Arrow IPC (Feather)"""
+        return await self._export_and_send_arrow(message, data, 'feather', 'Feather', filename)
+    
     async def export_all_formats(self, message: Message, data: List[Dict[str, Any]], filename: Optional[str] = None) -> bool:
-        """Exporte et envoie tous les formats"""
+        """
+        Exporte et envoie tous les formats : les DataFrames sont construits une
+        seule fois et les fichiers écrits en parallèle (DataExporter.export_all_formats)
+        """
         try:
             if not data:
                 await message.answer("❌ Aucune donnée à exporter")
@@ -142,26 +227,41 @@ class BotExporter:
             # Message de progression
             progress_msg = await message.answer("🔄 Export en cours...")
             
+            base_filename = os.path.splitext(filename)[0] if filename else f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             success_count = 0
-            total_formats = 3
-            
-            # Export JSON
-            if await self.export_and_send_json(message, data, filename):
-                success_count += 1
-            
-            # Export CSV
-            if await self.export_and_send_csv(message, data, filename):
-                success_count += 1
             
-            # Export Excel
-            if await self.export_and_send_excel(message, data, filename):
-                success_count += 1
+            with tempfile.TemporaryDirectory() as temp_dir:
+                exporter = DataExporter(temp_dir)
+                results = await asyncio.to_thread(exporter.export_all_formats, data, base_filename)
+                timings = exporter.last_timings
+                
+                for fmt, path in results.items():
+                    if path is None:
+                        await message.answer(f"❌ Erreur lors de l'export {fmt.upper()}")
+                        continue
+                    try:
+                        if fmt == 'json':
+                            path = await asyncio.to_thread(_gzip_if_large, path)
+                        await message.answer_document(
+                            document=FSInputFile(path, filename=os.path.basename(path)),
+                            caption=f"{FORMAT_LABELS.get(fmt, fmt)}\n📊 {len(data)} annonces\n"
+                                    f"⏱️ {timings.get(fmt, 0):.1f} s"
+                        )
+                        success_count += 1
+                    except Exception as e:
+                        logger.error(f"Erreur lors de l'envoi de l'export {fmt}: {e}")
+                        await message.answer(f"❌ Erreur lors de l'envoi de l'export {fmt.upper()}: {e}")
             
             # Message de résumé
+            durations = ", ".join(
+                f"{'préparation' if name == 'frames' else name.upper()} {seconds:.1f} s"
+                for name, seconds in timings.items()
+            )
             await progress_msg.edit_text(
                 f"✅ Export terminé !\n"
                 f"📊 {len(data)} annonces exportées\n"
-                f"📁 {success_count}/{total_formats} formats envoyés\n"
+                f"📁 {success_count}/{len(results)} formats envoyés\n"
+                f"⏱️ {durations}\n"
                 f"📅 {datetime.now().strftime('%d/%m/%Y %H:%M')}"
             )
             
@@ -186,14 +286,20 @@ async def export_cmd(message: Message):
             return
         
         # Créer les boutons pour choisir le format
-        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        buttons = [
             [
                 InlineKeyboardButton(text="📄 JSON", callback_data="export_json"),
                 InlineKeyboardButton(text="📊 CSV", callback_data="export_csv"),
                 InlineKeyboardButton(text="📈 Excel", callback_data="export_excel")
-            ],
-            [InlineKeyboardButton(text="📁 Tous les formats", callback_data="export_all")]
-        ])
+            ]
+        ]
+        if PYARROW_AVAILABLE:
+            buttons.append([
+                InlineKeyboardButton(text="🗜️ Parquet", callback_data="export_parquet"),
+                InlineKeyboardButton(text="🏹 Feather", callback_data="export_feather")
+            ])
+        buttons.append([InlineKeyboardButton(text="📁 Tous les formats", callback_data="export_all")])
+        keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
         
         await message.answer(
             f"📊 <b>Export des données</b>\n\n"
@@ -231,6 +337,14 @@ async def export_callback(callback: types.CallbackQuery):
             await callback.message.edit_text("🔄 Export Excel en cours...")
             success = await bot_exporter.export_and_send_excel(callback.message, data)
             
+        elif callback.data == "export_parquet":
+            await callback.message.edit_text("🔄 Export Parquet en cours...")
+            success = await bot_exporter.export_and_send_parquet(callback.message, data)
+            
+        elif callback.data == "export_feather":
+            await callback.message.edit_text("🔄 Export Feather en cours...")
+            success = await bot_exporter.export_and_send_feather(callback.message, data)
+            
         elif callback.data == "export_all":
             await callback.message.edit_text("🔄 Export de tous les formats en cours...")
             success = await bot_exporter.export_all_formats(callback.message, data)
@@ -277,6 +391,28 @@ async def export_excel_cmd(message: Message):
     except Exception as e:
         await message.answer(f"❌ Erreur: {e}")
 
+async def export_parquet_cmd(message: Message):
+    """Commande pour exporter en Parquet seulement"""
+    try:
+        data = bot_exporter.load_data_from_files()
+        if data:
+            await bot_exporter.export_and_send_parquet(message, data)
+        else:
+            await message.answer("❌ Aucune donnée trouvée")
+    except Exception as e:
+        await message.answer(f"❌ Erreur: {e}")
+
+async def export_feather_cmd(message: Message):
+    """Commande pour exporter en Arrow IPC (Feather) seulement"""
+    try:
+        data = bot_exporter.load_data_from_files()
+        if data:
+            await bot_exporter.export_and_send_feather(message, data)
+        else:
+            await message.answer("❌ Aucune donnée trouvée")
+    except Exception as e:
+        await message.answer(f"❌ Erreur: {e}")
+
 async def export_stats_cmd(message: Message):
     """Commande pour afficher les statistiques des données"""
     try:
@@ -1,6 +1,8 @@
+import asyncio
 from aiogram.types import Message, BufferedInputFile
 from scrap.jobs.statistic import get_attribute_value, find_element_value, get_max, get_min, get_mean
 from scrap.jobs.fetch_ads import fetch_description_ads
+from scrap.core.dataset import DATA_DIR, dataset
 import json
 import os
 from collections import Counter, defaultdict
@@ -21,24 +23,21 @@ async def extract_cmd(message: Message):
     except ValueError:
         await message.reply("Usage : /extract <attribute|element> <clé> [index]")
         return
-    data_dir = os.path.join("scrap", "tools", "scrap", "data")
+    data_dir = DATA_DIR
     if not os.path.exists(data_dir):
         await message.reply("Aucune donnée à extraire. Lancez d'abord /search.")
         return
     results = []
-    for file in os.listdir(data_dir):
-        if file.startswith("ads_") and file.endswith(".json"):
-            file_path = os.path.join(data_dir, file)
-            with open(file_path, encoding="utf-8") as f:
-                data = json.load(f)
-            if mode == "attribute":
-                res = get_attribute_value(data, param, index)
-            elif mode == "element":
-                res = find_element_value(data, param, index)
-            else:
-                await message.reply("Mode inconnu. Utilisez 'attribute' ou 'element'.")
-                return
-            results.append({file: res})
+    # Fichiers issus du cache partagé : les index de clés des annonces sont réutilisés entre commandes
+    for file, data in dataset.files().items():
+        if mode == "attribute":
+            res = get_attribute_value(data, param, index)
+        elif mode == "element":
+            res = find_element_value(data, param, index)
+        else:
+            await message.reply("Mode inconnu. Utilisez 'attribute' ou 'element'.")
+            return
+        results.append({file: res})
     if not results:
         await message.reply("Aucun fichier ads_<nbr>.json trouvé.")
         return
@@ -58,13 +57,14 @@ async def extract_description_cmd(message: Message):
         await message.reply("Usage : /description <url_annonce>")
         return
     try:
-        description = fetch_description_ads(url)
-        await message.reply(f"Description : {description}")
+        # Requête bloquante (retries, backoff) : exécutée hors de la boucle du bot
+        description = await asyncio.to_thread(fetch_description_ads, url.strip())
+        await message.reply(f"Description : {description}"[:4000])
     except Exception as e:
         await message.reply(f"Erreur lors de la récupération : {e}")
 
 async def list_attributes_elements_cmd(message: Message):
-    data_dir = os.path.join("scrap", "tools", "scrap", "data")
+    data_dir = DATA_DIR
     if not os.path.exists(data_dir):
         await message.reply("Aucune donnée à analyser. Lancez d'abord /search.")
         return
@@ -104,7 +104,7 @@ async def list_attributes_elements_cmd(message: Message):
     await message.reply(msg, parse_mode="HTML")
 
 async def list_attributes_cmd(message: Message):
-    data_dir = os.path.join("scrap", "tools", "scrap", "data")
+    data_dir = DATA_DIR
     if not os.path.exists(data_dir):
         await message.reply("Aucune donnée à analyser. Lancez d'abord /search.")
         return
@@ -135,7 +135,7 @@ async def list_attributes_cmd(message: Message):
     await message.reply(msg, parse_mode="HTML")
 
 async def list_elements_cmd(message: Message):
-    data_dir = os.path.join("scrap", "tools", "scrap", "data")
+    data_dir = DATA_DIR
     if not os.path.exists(data_dir):
         await message.reply("Aucune donnée à analyser. Lancez d'abord /search.")
         return
@@ -234,7 +234,7 @@ async def histogram_cmd(message: Message):
     except ValueError:
         await message.reply("Usage : /histogram <attribute|element> <clé> [index]")
         return
-    data_dir = os.path.join("scrap", "tools", "scrap", "data")
+    data_dir = DATA_DIR
     if not os.path.exists(data_dir):
         await message.reply("Aucune donnée à analyser. Lancez d'abord /search.")
         return
@@ -1,9 +1,113 @@
+import asyncio
+from html import escape
+from typing import Any, Dict
 from aiogram.types import Message, InputFile
-from scrap.analysis.filters import load_ads_data, filter_ads, filter_by_price, filter_by_location
+from scrap.analysis.filters import load_ads, load_store
 from scrap.analysis.statistics import get_summary_statistics
 from scrap.analysis.charts import create_price_histogram, create_brand_chart, create_location_chart, create_summary_chart, plot_price_histogram, plot_location_histogram
 from aiogram.types import BufferedInputFile
-from scrap.jobs.statistic import get_attribute_value
+from scrap.core.storage import get_storage
+
+FILTER_USAGE = "Usage: /filter [filtres]\nExemples: /filter city=Paris | /filter min=10000 max=20000 | /filter brand=\"Land Rover\" city=\"New York\""
+
+def parse_filter_args(command_text: str) -> Dict[str, Any]:
+    """
+    Parse les filtres d'une commande (/filter, /history) en gérant les
+    guillemets pour les noms avec espaces. Lève ValueError si un prix est invalide.
+    """
+    parts = []
+    current_part = ""
+    in_quotes = False
+    
+    # Parser caractère par caractère pour gérer les guillemets
+    for char in command_text:
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ' ' and not in_quotes:
+            if current_part.strip():
+                parts.append(current_part.strip())
+            current_part = ""
+        else:
+            current_part += char
+    
+    # Ajouter la dernière partie
+    if current_part.strip():
+        parts.append(current_part.strip())
+    
+    # Parsing flexible des arguments
+    filters = {
+        "min_price": None,
+        "max_price": None,
+        "city": None,
+        "brand": None,
+        # Pour compatibilité, on stocke les mots isolés
+        "keywords": [],
+        # Autres clés key=value (ex : search=3 pour /history)
+        "options": {}
+    }
+    
+    for arg in parts[1:]:
+        if '=' in arg:
+            key, value = arg.split('=', 1)
+            key = key.lower()
+            # Nettoyer les guillemets autour de la valeur
+            value = value.strip().strip('"')
+            if key == 'min':
+                try:
+                    filters["min_price"] = float(value)
+                except ValueError:
+                    raise ValueError("min doit être un nombre valide")
+            elif key == 'max':
+                try:
+                    filters["max_price"] = float(value)
+                except ValueError:
+                    raise ValueError("max doit être un nombre valide")
+            elif key == 'city':
+                filters["city"] = value
+            elif key == 'brand':
+                filters["brand"] = value
+            else:
+                filters["options"][key] = value
+                filters["keywords"].append(value)
+        else:
+            # Ancien format : si nombre, c'est min/max, sinon ville
+            # Nettoyer les guillemets
+            clean_arg = arg.strip('"')
+            try:
+                val = float(clean_arg)
+                if filters["min_price"] is None:
+                    filters["min_price"] = val
+                elif filters["max_price"] is None:
+                    filters["max_price"] = val
+            except ValueError:
+                if filters["city"] is None:
+                    filters["city"] = clean_arg
+                else:
+                    filters["keywords"].append(clean_arg)
+    
+    filters["count"] = len(parts) - 1
+    return filters
+
+def describe_filters(filters: Dict[str, Any]) -> str:
+    """
+    Lignes de description des critères appliqués
+    """
+    text = ""
+    min_price, max_price = filters["min_price"], filters["max_price"]
+    if min_price is not None or max_price is not None:
+        price_range = ""
+        if min_price is not None:
+            price_range += f"Prix ≥ {min_price}€"
+        if max_price is not None:
+            if price_range:
+                price_range += " et "
+            price_range += f"Prix ≤ {max_price}€"
+        text += f"💰 {price_range}\n"
+    if filters["city"]:
+        text += f"📍 Ville: {escape(filters['city'])}\n"
+    if filters["brand"]:
+        text += f"🏷 Marque: {escape(filters['brand'])}\n"
+    return text
 
 async def filter_cmd(message: Message):
     """
@@ -16,101 +120,29 @@ async def filter_cmd(message: Message):
       /filter city="New York" brand="Land Rover"
     """
     if not message.text:
-        await message.reply("Usage: /filter [filtres]\nExemples: /filter city=Paris | /filter min=10000 max=20000 | /filter brand=\"Land Rover\" city=\"New York\"")
+        await message.reply(FILTER_USAGE)
         return
     try:
-        # Parser la commande en gérant les guillemets pour les noms avec espaces
-        command_text = message.text
-        parts = []
-        current_part = ""
-        in_quotes = False
-        
-        # Parser caractère par caractère pour gérer les guillemets
-        for char in command_text:
-            if char == '"':
-                in_quotes = not in_quotes
-            elif char == ' ' and not in_quotes:
-                if current_part.strip():
-                    parts.append(current_part.strip())
-                current_part = ""
-            else:
-                current_part += char
-        
-        # Ajouter la dernière partie
-        if current_part.strip():
-            parts.append(current_part.strip())
-        
-        if len(parts) < 2:
-            await message.reply("Usage: /filter [filtres]\nExemples: /filter city=Paris | /filter min=10000 max=20000 | /filter brand=\"Land Rover\" city=\"New York\"")
+        try:
+            filters = parse_filter_args(message.text)
+        except ValueError as e:
+            await message.reply(f"❌ {e}")
             return
         
-        # Parsing flexible des arguments
-        min_price = None
-        max_price = None
-        city = None
-        brand = None
-        # Pour compatibilité, on stocke les mots isolés
-        keywords = []
-        
-        for arg in parts[1:]:
-            if '=' in arg:
-                key, value = arg.split('=', 1)
-                key = key.lower()
-                # Nettoyer les guillemets autour de la valeur
-                value = value.strip().strip('"')
-                if key == 'min':
-                    try:
-                        min_price = float(value)
-                    except ValueError:
-                        await message.reply(f"❌ min doit être un nombre valide")
-                        return
-                elif key == 'max':
-                    try:
-                        max_price = float(value)
-                    except ValueError:
-                        await message.reply(f"❌ max doit être un nombre valide")
-                        return
-                elif key == 'city':
-                    city = value
-                elif key == 'brand':
-                    brand = value
-                else:
-                    keywords.append(value)
-            else:
-                # Ancien format : si nombre, c'est min/max, sinon ville
-                # Nettoyer les guillemets
-                clean_arg = arg.strip('"')
-                try:
-                    val = float(clean_arg)
-                    if min_price is None:
-                        min_price = val
-                    elif max_price is None:
-                        max_price = val
-                except ValueError:
-                    if city is None:
-                        city = clean_arg
-                    else:
-                        keywords.append(clean_arg)
+        if filters["count"] < 1:
+            await message.reply(FILTER_USAGE)
+            return
         
         # Charge et filtre les données
-        ads = load_ads_data()
-        if not ads:
+        store = load_store()
+        if not len(store):
             await message.reply("❌ Aucune donnée disponible. Lancez d'abord /search")
             return
         
-        # Application des filtres combinés
-        filtered_ads = ads
-        if min_price is not None or max_price is not None:
-            filtered_ads = filter_by_price(filtered_ads, min_price, max_price)
-        if city:
-            filtered_ads = filter_by_location(filtered_ads, [city])
-        if brand:
-            # Filtre par marque (attribut brand) - plus flexible pour les noms avec espaces
-            brand_lower = brand.lower()
-            filtered_ads = [ad for ad in filtered_ads if any(
-                brand_lower in str(b).lower() or str(b).lower() in brand_lower
-                for b in (get_attribute_value(ad, "brand") or [])
-            )]
+        # Application des filtres combinés (masque booléen sur les colonnes)
+        # La marque est comparée dans les deux sens, plus souple pour les noms avec espaces
+        filtered_ads = store.select(store.mask(filters["min_price"], filters["max_price"],
+                                               city=filters["city"], brand=filters["brand"]))
         # On pourrait ajouter d'autres filtres ici (keywords, etc)
         
         if not filtered_ads:
@@ -120,23 +152,73 @@ async def filter_cmd(message: Message):
         # Affiche le résultat
         result_msg = f"🔍 <b>Résultats du filtrage</b>\n\n"
         result_msg += f"📦 {len(filtered_ads)} annonces trouvées\n"
-        if min_price is not None or max_price is not None:
-            price_range = ""
-            if min_price is not None:
-                price_range += f"Prix ≥ {min_price}€"
-            if max_price is not None:
-                if price_range:
-                    price_range += " et "
-                price_range += f"Prix ≤ {max_price}€"
-            result_msg += f"💰 {price_range}\n"
-        if city:
-            result_msg += f"📍 Ville: {city}\n"
-        if brand:
-            result_msg += f"🏷 Marque: {brand}\n"
+        result_msg += describe_filters(filters)
         await message.reply(result_msg, parse_mode="HTML")
     except Exception as e:
         await message.reply(f"❌ Erreur lors du filtrage: {str(e)}")
 
+async def history_cmd(message: Message):
+    """
+    Commande: /history [filtres] - Interroge l'historique SQLite de toutes les recherches
+    Exemples :
+      /history
+      /history min=5000 max=15000 city=Lyon
+      /history search=2 brand=Renault
+    """
+    if not message.text:
+        return
+    try:
+        try:
+            filters = parse_filter_args(message.text)
+        except ValueError as e:
+            await message.reply(f"❌ {e}")
+            return
+        
+        storage = get_storage()
+        
+        # Sans filtre : liste des recherches enregistrées
+        if filters["count"] < 1:
+            searches = await asyncio.to_thread(storage.searches)
+            if not searches:
+                await message.reply("📭 Aucune recherche enregistrée. Lancez d'abord /search")
+                return
+            msg = "🗂 <b>Recherches enregistrées</b>\n\n"
+            for search in searches[:20]:
+                msg += f"#{search['id']} • {search['ads']} annonces • {search['last_run']}\n   {escape(search['url'])}\n"
+            msg += "\nFiltrer : /history [search=id] [min=..] [max=..] [city=..] [brand=..]"
+            await message.reply(msg[:4000], parse_mode="HTML")
+            return
+        
+        search = filters["options"].get("search")
+        query = {
+            "min_price": filters["min_price"],
+            "max_price": filters["max_price"],
+            "city": filters["city"],
+            "brand": filters["brand"],
+            "search_id": int(search) if search else None
+        }
+        # Requêtes SQL indexées, exécutées hors de la boucle asyncio
+        price_stats = await asyncio.to_thread(storage.price_stats, **query)
+        total = await asyncio.to_thread(storage.count, **query)
+        cheapest = await asyncio.to_thread(storage.query, 10, "price", **query)
+        
+        if total == 0:
+            await message.reply("❌ Aucune annonce trouvée avec ces critères")
+            return
+        
+        msg = f"🗂 <b>Historique des annonces</b>\n\n"
+        msg += f"📦 {total} annonces trouvées\n"
+        msg += describe_filters(filters)
+        if price_stats["count"]:
+            msg += f"💶 Min {price_stats['min']:.0f}€ • Moyenne {price_stats['mean']:.0f}€ • Max {price_stats['max']:.0f}€\n"
+        msg += "\n<b>Les moins chères :</b>\n"
+        for ad in cheapest:
+            price = f"{ad.price:.0f}€" if ad.price is not None else "?"
+            msg += f"• {escape(ad.subject or '')} - {price} - {escape(ad.city or '')}\n"
+        await message.reply(msg[:4000], parse_mode="HTML")
+    except Exception as e:
+        await message.reply(f"❌ Erreur lors de la requête: {str(e)}")
+
 async def stats_cmd(message: Message):
     """
     Commande: /stats - Affiche les statistiques générales
@@ -157,7 +239,9 @@ async def stats_cmd(message: Message):
             msg += f"   Min: {price_stats['min']:.0f}€\n"
             msg += f"   Max: {price_stats['max']:.0f}€\n"
             msg += f"   Moyenne: {price_stats['mean']:.0f}€\n"
-            msg += f"   Médiane: {price_stats['median']:.0f}€\n\n"
+            msg += f"   Médiane: {price_stats['median']:.0f}€\n"
+            msg += f"   Écart-type: {price_stats['std']:.0f}€\n"
+            msg += f"   Quartiles: {price_stats['p25']:.0f}€ - {price_stats['p75']:.0f}€\n\n"
         
         if stats["brand_stats"]:
             msg += "🏷 <b>Top 5 marques</b>\n"
@@ -185,7 +269,7 @@ async def chart_cmd(message: Message):
             return
         
         chart_type = parts[1].lower()
-        ads = load_ads_data()
+        ads = load_ads()
         
         if not ads:
             await message.reply("❌ Aucune donnée disponible. Lancez d'abord /search")
@@ -223,7 +307,7 @@ async def chart_img_cmd(message: Message):
             return
         
         chart_type = parts[1].lower()
-        ads = load_ads_data()
+        ads = load_ads()
         
         if not ads:
             await message.reply("❌ Aucune donnée disponible. Lancez d'abord /search")
@@ -19,9 +19,39 @@ COMMANDS_HELP = [
     },
     {
         "cmd": "/search",
-        "usage": "/search [url] [nombre_de_pages]",
-        "desc": "Lance le scraping sur l'URL donnée pour le nombre de pages indiqué.",
-        "example": "/search https://www.leboncoin.fr/recherche?category=2 2"
+        "usage": "/search [url] [nombre_de_pages] [incremental]",
+        "desc": "Lance le scraping sur l'URL donnée pour le nombre de pages indiqué. Le scraping tourne en tâche de fond et renvoie un numéro de job. Avec 'incremental', les anciens résultats sont conservés, seules les annonces nouvelles ou modifiées sont enregistrées et la pagination s'arrête à la première page déjà connue. Refusé si le jeu de données courant provient d'une autre recherche.",
+        "example": "/search https://www.leboncoin.fr/recherche?category=2 2\n/search https://www.leboncoin.fr/recherche?category=2 20 incremental"
+    },
+    {
+        "cmd": "/jobs",
+        "usage": "/jobs",
+        "desc": "Liste les jobs de scraping en cours, en attente et récemment terminés.",
+        "example": "/jobs"
+    },
+    {
+        "cmd": "/netstats",
+        "usage": "/netstats",
+        "desc": "Affiche la réutilisation des sessions HTTP partagées, les compteurs du cache HTTP et le nombre de proxies disponibles.",
+        "example": None
+    },
+    {
+        "cmd": "/schedule",
+        "usage": "/schedule [url] [nombre_de_pages] every=[durée] | cron=\"[expression]\" [jitter=[durée]] [full]",
+        "desc": "Planifie une recherche récurrente en tâche de fond (incrémentale par défaut, 'full' pour tout retélécharger). Durées : 90s, 30m, 2h, 1d. Le jitter décale aléatoirement chaque exécution. Les résultats sont enregistrés en base (voir /history) sans toucher au jeu de données courant.",
+        "example": "/schedule https://www.leboncoin.fr/recherche?category=2 5 every=2h jitter=10m\n/schedule https://www.leboncoin.fr/recherche?category=2 5 cron=\"0 8,18 * * *\""
+    },
+    {
+        "cmd": "/schedules",
+        "usage": "/schedules",
+        "desc": "Liste les recherches planifiées, leur prochaine exécution et le résultat de la dernière.",
+        "example": None
+    },
+    {
+        "cmd": "/unschedule",
+        "usage": "/unschedule [id]",
+        "desc": "Supprime une recherche planifiée.",
+        "example": "/unschedule 1"
     },
     {
         "cmd": "/extract",
@@ -32,9 +62,15 @@ COMMANDS_HELP = [
     {
         "cmd": "/description",
         "usage": "/description [url_annonce]",
-        "desc": "Récupère la description d'une annonce précise à partir de son URL.",
+        "desc": "Récupère la description d'une annonce précise à partir de son URL (page mise en cache 24 h).",
         "example": "/description https://www.leboncoin.fr/ad/voitures/2997258439"
     },
+    {
+        "cmd": "/descriptions",
+        "usage": "/descriptions [nombre_max]",
+        "desc": "Récupère en tâche de fond la description de toutes les annonces du jeu de données courant et l'ajoute aux fichiers (champ description). Reprend là où le job précédent s'est arrêté.",
+        "example": "/descriptions\n/descriptions 200"
+    },
     {
         "cmd": "/list_attributes_elements",
         "usage": "/list_attributes_elements",
@@ -77,6 +113,12 @@ COMMANDS_HELP = [
         "desc": "Filtre les annonces selon plusieurs critères combinables : prix min, prix max, ville (city), marque (brand), etc. Utilisez des guillemets pour les noms avec espaces.",
         "example": "/filter city=Paris\n/filter min=10000 max=20000\n/filter brand=Renault city=Lyon\n/filter brand=\"Land Rover\" city=\"New York\"\n/filter min=5000 max=15000 city=Marseille brand=Peugeot"
     },
+    {
+        "cmd": "/history",
+        "usage": "/history [filtres]",
+        "desc": "Interroge l'historique de toutes les recherches (base SQLite). Sans argument, liste les recherches enregistrées. Mêmes filtres que /filter, plus search=[id] pour une recherche précise.",
+        "example": "/history\n/history min=5000 max=15000 city=Lyon\n/history search=2 brand=Renault"
+    },
     {
         "cmd": "/stats",
         "usage": "/stats",
@@ -104,13 +146,13 @@ COMMANDS_HELP = [
     {
         "cmd": "/export",
         "usage": "/export",
-        "desc": "Affiche un menu pour exporter les données vers différents formats (JSON, CSV, Excel).",
+        "desc": "Affiche un menu pour exporter les données vers différents formats (JSON, CSV, Excel, Parquet, Feather).",
         "example": "/export"
     },
     {
         "cmd": "/exportjson",
         "usage": "/exportjson",
-        "desc": "Exporte directement les données en format JSON et les envoie dans la conversation.",
+        "desc": "Exporte directement les données en format JSON compact (une annonce par ligne) et les envoie dans la conversation. Au-delà de 1 Mo, le fichier est envoyé compressé (.json.gz).",
         "example": "/exportjson"
     },
     {
@@ -122,9 +164,21 @@ COMMANDS_HELP = [
     {
         "cmd": "/exportexcel",
         "usage": "/exportexcel",
-        "desc": "Exporte directement les données en format Excel avec plusieurs feuilles et les envoie dans la conversation.",
+        "desc": "Exporte directement les données en format Excel avec plusieurs feuilles et les envoie dans la conversation. Au-delà de la limite d'Excel (1 048 576 lignes), les données continuent sur une feuille suivante.",
         "example": "/exportexcel"
     },
+    {
+        "cmd": "/exportparquet",
+        "usage": "/exportparquet",
+        "desc": "Exporte les données aplaties au format Parquet (colonnes typées, compressé en zstd), idéal pour l'analyse avec pandas, Polars ou DuckDB.",
+        "example": "/exportparquet"
+    },
+    {
+        "cmd": "/exportfeather",
+        "usage": "/exportfeather",
+        "desc": "Exporte les données aplaties au format Arrow IPC (Feather), le plus rapide à recharger avec pandas ou pyarrow.",
+        "example": "/exportfeather"
+    },
     {
         "cmd": "/exportstats",
         "usage": "/exportstats",
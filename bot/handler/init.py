@@ -2,10 +2,13 @@ from bot.handler.start import start_cmd
 from bot.handler.help import help_cmd
 from aiogram.filters import Command
 from bot.handler.search.search_cmd import search_cmd
+from bot.handler.search.descriptions_cmd import descriptions_cmd
 from bot.handler.extract.extract_cmd import extract_cmd, extract_description_cmd, list_attributes_elements_cmd, list_attributes_cmd, list_elements_cmd, max_cmd, min_cmd, mean_cmd
-from bot.handler.filter.filter_cmd import filter_cmd, stats_cmd, chart_cmd, chart_img_cmd
-from bot.handler.export.export_cmd import export_cmd, export_callback, export_json_cmd, export_csv_cmd, export_excel_cmd, export_stats_cmd
+from bot.handler.filter.filter_cmd import filter_cmd, history_cmd, stats_cmd, chart_cmd, chart_img_cmd
+from bot.handler.export.export_cmd import export_cmd, export_callback, export_json_cmd, export_csv_cmd, export_excel_cmd, export_parquet_cmd, export_feather_cmd, export_stats_cmd
 from bot.handler.cleanup_cmd import cleanup_cmd, cleanup_status_cmd
+from bot.handler.jobs_cmd import jobs_cmd, netstats_cmd
+from bot.handler.schedule_cmd import schedule_cmd, schedules_cmd, unschedule_cmd
 from aiogram import types
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
@@ -59,8 +62,14 @@ def register_handlers(dp):
     dp.message.register(help_cmd, Command("help"))
     dp.callback_query.register(help_callback, lambda c: c.data == "show_help")
     dp.message.register(search_cmd, Command("search"))
+    dp.message.register(jobs_cmd, Command("jobs"))
+    dp.message.register(netstats_cmd, Command("netstats"))
+    dp.message.register(schedule_cmd, Command("schedule"))
+    dp.message.register(schedules_cmd, Command("schedules"))
+    dp.message.register(unschedule_cmd, Command("unschedule"))
     dp.message.register(extract_cmd, Command("extract"))
     dp.message.register(extract_description_cmd, Command("description"))
+    dp.message.register(descriptions_cmd, Command("descriptions"))
     dp.message.register(list_attributes_elements_cmd, Command("list"))
     dp.message.register(list_attributes_cmd, Command("list_attributes"))
     dp.message.register(list_elements_cmd, Command("list_elements"))
@@ -68,6 +77,7 @@ def register_handlers(dp):
     dp.message.register(min_cmd, Command("min"))
     dp.message.register(mean_cmd, Command("mean"))
     dp.message.register(filter_cmd, Command("filter"))
+    dp.message.register(history_cmd, Command("history"))
     dp.message.register(stats_cmd, Command("stats"))
     dp.message.register(chart_cmd, Command("chart"))
     dp.message.register(chart_img_cmd, Command("chartimg"))
@@ -75,6 +85,8 @@ def register_handlers(dp):
     dp.message.register(export_json_cmd, Command("exportjson"))
     dp.message.register(export_csv_cmd, Command("exportcsv"))
     dp.message.register(export_excel_cmd, Command("exportexcel"))
+    dp.message.register(export_parquet_cmd, Command("exportparquet"))
+    dp.message.register(export_feather_cmd, Command("exportfeather"))
     dp.message.register(export_stats_cmd, Command("exportstats"))
     dp.message.register(cleanup_cmd, Command("cleanup"))
     dp.message.register(cleanup_status_cmd, Command("cleanupstatus"))
@@ -0,0 +1,57 @@
+from html import escape
+from aiogram.types import Message
+from scrap.jobs.executor import job_manager
+from scrap.infra.http_client import async_session_pool, session_pool
+from scrap.infra.proxy_pool import get_proxy_pool
+from scrap.infra.response_cache import get_response_cache
+
+async def jobs_cmd(message: Message):
+    """
+    Commande: /jobs - Liste les jobs en cours, en attente et récemment terminés
+    """
+    active = job_manager.active_jobs()
+    recent = job_manager.recent_jobs()[:5]
+
+    if not active and not recent:
+        await message.reply("📭 Aucun job en cours ni récent.")
+        return
+
+    msg = "⚙️ <b>Jobs en cours</b>\n\n"
+    if active:
+        for job in active:
+            started = job.started_at.strftime('%H:%M:%S') if job.started_at else "-"
+            msg += f"#{job.id} {escape(job.name)}\n   {job.status} • {job.progress} • démarré à {started}\n"
+    else:
+        msg += "Aucun job en cours.\n"
+
+    if recent:
+        msg += "\n🕘 <b>Derniers jobs</b>\n\n"
+        for job in recent:
+            line = f"#{job.id} {escape(job.name)}\n   {job.status} • {job.progress}"
+            if job.error:
+                line += f" • {escape(job.error)}"
+            msg += line + "\n"
+
+    if len(msg) > 4000:
+        msg = msg[:3990] + "... (résultat tronqué)"
+    await message.reply(msg, parse_mode="HTML")
+
+async def netstats_cmd(message: Message):
+    """
+    Commande: /netstats - Réutilisation des sessions HTTP et état du pool de proxies
+    """
+    sync_stats = session_pool.stats()
+    async_stats = async_session_pool.stats()
+    pool = get_proxy_pool()
+
+    msg = "🔌 <b>Connexions</b>\n\n"
+    msg += (f"Sessions HTTP : {sync_stats['sessions']} ouvertes • {sync_stats['created']} créées • "
+            f"{sync_stats['evicted']} fermées • réutilisation {sync_stats['reuse_rate']:.0%}\n")
+    msg += (f"Session asynchrone : {async_stats['created']} créée(s) • "
+            f"réutilisation {async_stats['reuse_rate']:.0%}\n")
+    cache_stats = get_response_cache().stats()
+    msg += (f"Cache HTTP : {cache_stats['entries']} pages ({cache_stats['bytes'] / 1_000_000:.1f} Mo) • "
+            f"{cache_stats['hits']} hits • {cache_stats['misses']} miss • "
+            f"{cache_stats['revalidated']} revalidées • taux {cache_stats['hit_rate']:.0%}\n")
+    msg += f"\n🌐 Proxies : {pool.count_available()} disponibles sur {len(pool.proxies)}\n"
+    await message.reply(msg, parse_mode="HTML")
@@ -0,0 +1,94 @@
+import shlex
+from html import escape
+from aiogram.types import Message
+from scrap.infra.scheduler import scheduler, parse_duration
+
+SCHEDULE_USAGE = (
+    "Usage : /schedule <url> <nombre_de_pages> every=<durée> | cron=\"<expression>\" [jitter=<durée>] [full]\n"
+    "Exemples :\n"
+    "/schedule https://www.leboncoin.fr/recherche?category=2 5 every=2h jitter=10m\n"
+    "/schedule https://www.leboncoin.fr/recherche?category=2 5 cron=\"0 8,18 * * *\""
+)
+
+async def schedule_cmd(message: Message):
+    """
+    Commande: /schedule <url> <pages> every=<durée>|cron="<expr>" [jitter=<durée>] [full]
+    Planifie une recherche récurrente (incrémentale par défaut, 'full' pour tout retélécharger)
+    """
+    try:
+        args = shlex.split(message.text or "")[1:]
+    except ValueError:
+        await message.reply(SCHEDULE_USAGE)
+        return
+    if len(args) < 3:
+        await message.reply(SCHEDULE_USAGE)
+        return
+
+    url, pages, *options = args
+    interval = cron = None
+    jitter = 0
+    incremental = True
+    try:
+        pages = int(pages)
+        for option in options:
+            key, _, value = option.partition("=")
+            key = key.lower()
+            if key == "every":
+                interval = parse_duration(value)
+            elif key == "cron":
+                cron = value
+            elif key == "jitter":
+                jitter = parse_duration(value)
+            elif key == "full":
+                incremental = False
+            else:
+                raise ValueError(f"Option inconnue : {option}")
+        schedule = scheduler.add(url, pages, interval=interval, cron=cron, jitter=jitter,
+                                 incremental=incremental, owner=message.chat.id)
+    except ValueError as e:
+        await message.reply(f"❌ {e}\n\n{SCHEDULE_USAGE}")
+        return
+
+    await message.reply(
+        f"🕒 Recherche planifiée #{schedule.id} : {schedule.rule}, {schedule.pages} pages\n"
+        f"Prochaine exécution : {schedule.next_run.replace('T', ' ')}\n"
+        f"Supprimer : /unschedule {schedule.id}"
+    )
+
+async def schedules_cmd(message: Message):
+    """
+    Commande: /schedules - Liste les recherches planifiées
+    """
+    schedules = scheduler.list()
+    if not schedules:
+        await message.reply("📭 Aucune recherche planifiée. Ajoutez-en une avec /schedule")
+        return
+
+    msg = "🕒 <b>Recherches planifiées</b>\n\n"
+    for schedule in schedules:
+        mode = "incrémentale" if schedule.incremental else "complète"
+        state = " • en cours" if scheduler.is_running(schedule.id) else ""
+        msg += f"#{schedule.id} {escape(schedule.url)}\n"
+        msg += f"   {escape(schedule.rule)} • {schedule.pages} pages • {mode}{state}\n"
+        msg += f"   prochaine : {(schedule.next_run or '-').replace('T', ' ')}"
+        if schedule.last_status:
+            msg += f" • dernière : {escape(schedule.last_status)}"
+        msg += "\n"
+
+    if len(msg) > 4000:
+        msg = msg[:3990] + "... (résultat tronqué)"
+    await message.reply(msg, parse_mode="HTML")
+
+async def unschedule_cmd(message: Message):
+    """
+    Commande: /unschedule <id> - Supprime une recherche planifiée
+    """
+    parts = (message.text or "").split()
+    if len(parts) != 2 or not parts[1].lstrip("#").isdigit():
+        await message.reply("Usage : /unschedule <id>")
+        return
+    schedule_id = int(parts[1].lstrip("#"))
+    if scheduler.remove(schedule_id):
+        await message.reply(f"🗑️ Recherche planifiée #{schedule_id} supprimée.")
+    else:
+        await message.reply(f"❌ Aucune recherche planifiée #{schedule_id}.")
@@ -0,0 +1,58 @@
+from aiogram.types import Message
+from aiogram.exceptions import TelegramBadRequest
+from scrap.jobs.descriptions import enrich_descriptions
+from scrap.jobs.executor import job_manager
+
+USAGE = "Usage : /descriptions [nombre_max]"
+
+async def descriptions_cmd(message: Message):
+    """
+    Commande: /descriptions [nombre_max] - Récupère en tâche de fond la description
+    de toutes les annonces du jeu de données courant (reprend là où le job précédent s'est arrêté)
+    """
+    parts = (message.text or "").split()
+    limit = None
+    if len(parts) > 1:
+        try:
+            limit = int(parts[1])
+        except ValueError:
+            await message.reply(USAGE)
+            return
+
+    job = job_manager.submit(
+        "/descriptions" + (f" ({limit} max)" if limit else ""),
+        lambda job: _run_descriptions(message, job, limit),
+        owner=message.chat.id
+    )
+    await message.reply(f"🆔 Job #{job.id} soumis. Suivez son avancement ici ou avec /jobs.")
+
+async def _run_descriptions(message: Message, job, limit) -> int:
+    progress_msg = await message.reply(f"🔄 Récupération des descriptions (job #{job.id})...")
+
+    async def on_progress(done: int, total: int):
+        job.total = total
+        job.done = done
+        # Pas d'édition à chaque annonce : Telegram limite le nombre de modifications
+        if done % 10 and done != total:
+            return
+        try:
+            await progress_msg.edit_text(f"⏳ Job #{job.id} : {done}/{total} annonces traitées")
+        except TelegramBadRequest:
+            pass
+
+    try:
+        report = await enrich_descriptions(on_progress=on_progress, limit=limit)
+    except Exception as e:
+        await message.reply(f"❌ Job #{job.id} en échec : {e}")
+        raise
+
+    if not report.total:
+        await message.reply("❌ Aucune annonce disponible. Lancez d'abord /search")
+        return 0
+    text = (f"✅ Job #{job.id} terminé : {report.fetched} descriptions récupérées, "
+            f"{report.already_known} déjà connues, {report.missing} sans description")
+    if report.failed:
+        text += f", {report.failed} en échec (relancez /descriptions pour les reprendre)"
+    text += f"\n💾 {report.files_updated} fichiers mis à jour"
+    await message.reply(text)
+    return report.fetched
@@ -1,45 +1,86 @@
+import asyncio
 from aiogram.types import Message
-from scrap.jobs.fetch_ads import fetch_ads
-import os
-import glob
+from aiogram.exceptions import TelegramBadRequest
+from scrap.jobs.fetch_ads import dataset_matches_search, fetch_ads_async
+from scrap.jobs.executor import job_manager
+from scrap.utils.cleanup import cleanup_ads_data
+
+INCREMENTAL_FLAGS = ("incremental", "inc", "incr")
+USAGE = "Usage : /search <url> <nombre_de_pages> [incremental]"
 
 async def search_cmd(message: Message):
     if not message.text:
-        await message.reply("Usage : /search <url> <nombre_de_pages>")
+        await message.reply(USAGE)
         return
-    
+
     try:
-        _, url, page = message.text.split(maxsplit=2)
+        _, url, page, *options = message.text.split()
         page_int = int(page)
     except ValueError:
-        await message.reply("Usage : /search <url> <nombre_de_pages>")
+        await message.reply(USAGE)
         return
-    
-    # Supprimer les anciennes données avant de commencer le nouveau scraping
-    data_dir = os.path.join("scrap", "tools", "scrap", "data")
-    if os.path.exists(data_dir):
-        # Supprimer tous les fichiers ads_*.json
-        pattern = os.path.join(data_dir, "ads_*.json")
-        files_to_delete = glob.glob(pattern)
-        
-        if files_to_delete:
-            deleted_count = 0
-            for file_path in files_to_delete:
-                try:
-                    os.remove(file_path)
-                    deleted_count += 1
-                except Exception as e:
-                    print(f"Erreur lors de la suppression de {file_path}: {e}")
-            
-            await message.reply(f"🗑️ {deleted_count} anciens fichiers supprimés. Début du nouveau scraping...")
-        else:
-            await message.reply("🔄 Début du scraping...")
+    incremental = any(option.lower() in INCREMENTAL_FLAGS for option in options)
+    if incremental and not await asyncio.to_thread(dataset_matches_search, url):
+        await message.reply("❌ Le jeu de données courant provient d'une autre recherche : "
+                            "le mode incrémental les mélangerait. Relancez sans 'incremental'.")
+        return
+
+    # Le scraping tourne en tâche de fond : le bot reste disponible pendant ce temps
+    mode = ", incrémental" if incremental else ""
+    job = job_manager.submit(
+        f"/search {url} ({page_int} pages{mode})",
+        lambda job: _run_search(message, job, url, page_int, incremental),
+        owner=message.chat.id,
+        total=page_int
+    )
+    await message.reply(f"🆔 Job #{job.id} soumis. Suivez son avancement ici ou avec /jobs.")
+
+async def _run_search(message: Message, job, url: str, page_int: int, incremental: bool = False) -> int:
+    if incremental:
+        # Les anciens résultats sont conservés : seules les pages téléchargées sont réécrites
+        text = f"🔄 Début du scraping incrémental (job #{job.id})..."
     else:
-        await message.reply("🔄 Création du répertoire de données et début du scraping...")
-    
-    # Lancer le scraping
-    count = fetch_ads(url, page_int)
-    if count:
-        await message.reply(f"✅ Recherche terminée : {count} annonces trouvées pour {page_int} pages sur {url}")
+        # Supprimer les anciennes données au démarrage effectif du job
+        # (et non à la soumission, pour ne pas écraser un job en cours)
+        deleted_count = cleanup_ads_data()
+        if deleted_count:
+            text = f"🗑️ {deleted_count} anciens fichiers supprimés. Début du scraping (job #{job.id})..."
+        else:
+            text = f"🔄 Début du scraping (job #{job.id})..."
+    progress_msg = await message.reply(text)
+
+    found = 0
+
+    async def on_page(page_number: int, count: int):
+        nonlocal found
+        job.advance()
+        found += count
+        try:
+            await progress_msg.edit_text(
+                f"⏳ Job #{job.id} : {job.progress} pages traitées, {found} annonces trouvées "
+                f"(dernière : page {page_number})"
+            )
+        except TelegramBadRequest:
+            pass
+
+    try:
+        report = await fetch_ads_async(url, page_int, on_page=on_page, incremental=incremental)
+    except Exception as e:
+        await message.reply(f"❌ Job #{job.id} en échec : {e}")
+        raise
+
+    if report.failed_pages:
+        pages = ", ".join(f"{page} ({kind})" for page, kind in sorted(report.failed_pages.items()))
+        await message.reply(f"⚠️ Job #{job.id} : pages inaccessibles après plusieurs tentatives : {pages}")
+
+    if incremental and report.pages:
+        text = (f"✅ Job #{job.id} terminé : {report.pages}/{page_int} pages téléchargées, "
+                f"{report.new} nouvelles annonces, {report.changed} modifiées, {report.unchanged} inchangées")
+        if report.stopped_at is not None:
+            text += f"\n⏹ Arrêt à la page {report.stopped_at}, déjà entièrement connue"
+        await message.reply(text)
+    elif report.ads:
+        await message.reply(f"✅ Job #{job.id} terminé : {report.ads} annonces trouvées pour {page_int} pages sur {url}")
     else:
-        await message.reply("❌ Aucune annonce trouvée. Vérifie l'URL ou réessaie plus tard.") 
\ No newline at end of file
+        await message.reply(f"❌ Job #{job.id} : aucune annonce trouvée. Vérifie l'URL ou réessaie plus tard.")
+    return report.ads
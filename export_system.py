@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Système d'exportation et de téléchargement de données
-Permet d'exporter les données vers JSON, CSV, Excel et Google Sheets
+Permet d'exporter les données vers JSON, CSV, Excel, Parquet, Feather et Google Sheets
 """
 
 import json
@@ -63,13 +63,16 @@ def load_data_from_file(filepath: str) -> list:
         logger.error(f"Erreur lors du chargement: {e}")
         return []
 
-def export_data(data: list, format_type: str = "all", filename: Optional[str] = None) -> dict:
-    """Exporte les données vers le format spécifié"""
+def export_data(data, format_type: str = "all", filename: Optional[str] = None,
+                ndjson: bool = False, compression: Optional[str] = None) -> dict:
+    """Exporte les données vers le format spécifié (pour JSON, `data` peut être un itérateur)"""
     exporter = DataExporter()
     
     try:
         if format_type == "json":
-            filepath = exporter.export_to_json(data, filename)
+            if filename and not os.path.splitext(filename)[1]:
+                filename += ".ndjson" if ndjson else ".json"
+            filepath = exporter.export_to_json(data, filename, ndjson=ndjson, compression=compression)
             return {"json": filepath}
         elif format_type == "csv":
             filepath = exporter.export_to_csv(data, filename)
@@ -77,6 +80,12 @@ def export_data(data: list, format_type: str = "all", filename: Optional[str] =
         elif format_type == "excel":
             filepath = exporter.export_to_excel(data, filename)
             return {"excel": filepath}
+        elif format_type == "parquet":
+            filepath = exporter.export_to_parquet(data, filename)
+            return {"parquet": filepath}
+        elif format_type == "feather":
+            filepath = exporter.export_to_feather(data, filename)
+            return {"feather": filepath}
         elif format_type == "all":
             return exporter.export_all_formats(data, filename)
         else:
@@ -116,6 +125,12 @@ Exemples d'utilisation:
   # Exporter vers CSV seulement
   python export_system.py --file ads_1.json --export csv
   
+  # Exporter vers Parquet (colonnes typées, compressé ; nécessite pyarrow)
+  python export_system.py --file ads_1.json --export parquet
+  
+  # Exporter toute la base en NDJSON compressé, sans la charger en mémoire
+  python export_system.py --db --export json --ndjson --compress gzip
+  
   # Démarrer le serveur web
   python export_system.py --server
   
@@ -132,11 +147,29 @@ Exemples d'utilisation:
     
     parser.add_argument(
         '--export', '-e',
-        choices=['json', 'csv', 'excel', 'all'],
+        choices=['json', 'csv', 'excel', 'parquet', 'feather', 'all'],
         default='all',
         help='Format d\'export (défaut: all)'
     )
     
+    parser.add_argument(
+        '--ndjson',
+        action='store_true',
+        help='Export JSON au format NDJSON (une annonce par ligne)'
+    )
+    
+    parser.add_argument(
+        '--compress', '-c',
+        choices=['gzip', 'zstd'],
+        help='Compresser l\'export JSON (zstd nécessite: pip install zstandard)'
+    )
+    
+    parser.add_argument(
+        '--db',
+        action='store_true',
+        help='Lire les annonces depuis la base SQLite (export JSON en flux, mémoire constante)'
+    )
+    
     parser.add_argument(
         '--filename', '-n',
         type=str,
@@ -184,7 +217,14 @@ Exemples d'utilisation:
         return
     
     # Charger et exporter les données
-    if args.file:
+    if args.db:
+        from scrap.core.storage import get_storage
+        logger.info("Chargement depuis la base SQLite")
+        data = get_storage().iter_raw()
+        if args.export != "json" or args.google_sheets:
+            data = list(data)
+        # Sinon export JSON en flux : les annonces ne sont jamais toutes en mémoire
+    elif args.file:
         logger.info(f"Chargement du fichier: {args.file}")
         data = load_data_from_file(args.file)
     else:
@@ -196,7 +236,8 @@ Exemples d'utilisation:
         return
     
     logger.info(f"Export vers le format: {args.export}")
-    results = export_data(data, args.export, args.filename)
+    results = export_data(data, args.export, args.filename,
+                          ndjson=args.ndjson, compression=args.compress)
     
     if results:
         logger.info("Export réussi!")
@@ -4,6 +4,9 @@ from aiogram.enums import ParseMode
 from aiogram.client.default import DefaultBotProperties
 from bot.config import TOKEN
 from bot.handler.init import register_handlers
+from scrap.infra.scheduler import scheduler
+from scrap.infra.proxy_pool import ProxyReplenisher, get_proxy_pool
+from scrap.infra.http_client import async_session_pool, cookie_store, session_pool
 
 async def main():
     if TOKEN is None:
@@ -14,7 +17,20 @@ async def main():
     )
     dp = Dispatcher()
     register_handlers(dp)
-    await dp.start_polling(bot)
+    # Recherches planifiées : les notifications partent dans le chat qui les a créées
+    scheduler.notify = bot.send_message
+    scheduler.start()
+    # Réapprovisionnement du pool de proxies en tâche de fond
+    replenisher = ProxyReplenisher(get_proxy_pool())
+    replenisher.start()
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await scheduler.stop()
+        await replenisher.stop()
+        await async_session_pool.close()
+        session_pool.close()
+        cookie_store.flush()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,15 +1,14 @@
 from typing import List, Dict, Any, Optional
-from .statistics import get_price_distribution, get_brand_statistics, get_location_statistics
-from .filters import load_ads_data
+from .statistics import get_price_distribution, get_brand_statistics, get_location_statistics, get_summary_statistics, get_valid_prices, summarize_prices
+from scrap.core.models import as_ads
 import matplotlib.pyplot as plt
+import numpy as np
 import io
 
-def create_price_histogram(ads: List[Dict[str, Any]], max_bars: int = 10) -> str:
+def render_price_histogram(distribution: Dict[str, Any]) -> str:
     """
-    Crée un histogramme des prix en format texte pour Telegram
+    Met en forme une distribution de prix (get_price_distribution) en histogramme texte
     """
-    distribution = get_price_distribution(ads, max_bars)
-    
     if not distribution["ranges"]:
         return "❌ Aucune donnée de prix disponible"
     
@@ -17,7 +16,7 @@ def create_price_histogram(ads: List[Dict[str, Any]], max_bars: int = 10) -> str
     
     max_count = max(distribution["counts"]) if distribution["counts"] else 0
     
-    for i, (range_name, count) in enumerate(zip(distribution["ranges"], distribution["counts"])):
+    for range_name, count in zip(distribution["ranges"], distribution["counts"]):
         if max_count > 0:
             bar_length = int((count / max_count) * 20)  # 20 caractères max
             bar = "█" * bar_length
@@ -29,113 +28,89 @@ def create_price_histogram(ads: List[Dict[str, Any]], max_bars: int = 10) -> str
     chart += f"\n📈 Total: {distribution['total_ads']} annonces"
     return chart
 
-def create_brand_chart(ads: List[Dict[str, Any]], top_n: int = 10) -> str:
+def render_top_chart(title: str, counts: Dict[str, int], top_n: int, empty_message: str) -> str:
     """
-    Crée un graphique des marques les plus populaires
+    Met en forme des comptes déjà triés (marques, villes, ...) en barres texte
     """
-    brand_stats = get_brand_statistics(ads)
-    
-    if not brand_stats:
-        return "❌ Aucune donnée de marque disponible"
+    if not counts:
+        return empty_message
     
-    chart = f"🏷 <b>Top {top_n} des marques</b>\n\n"
+    chart = f"{title}\n\n"
     
-    max_count = max(brand_stats.values()) if brand_stats else 0
+    max_count = max(counts.values())
     
-    for i, (brand, count) in enumerate(list(brand_stats.items())[:top_n]):
+    for name, count in list(counts.items())[:top_n]:
         if max_count > 0:
             bar_length = int((count / max_count) * 15)  # 15 caractères max
             bar = "█" * bar_length
         else:
             bar = ""
         
-        chart += f"{brand}: {bar} ({count})\n"
+        chart += f"{name}: {bar} ({count})\n"
     
     return chart
 
+def create_price_histogram(ads: List[Dict[str, Any]], max_bars: int = 10) -> str:
+    """
+    Crée un histogramme des prix en format texte pour Telegram
+    """
+    return render_price_histogram(get_price_distribution(ads, max_bars))
+
+def create_brand_chart(ads: List[Dict[str, Any]], top_n: int = 10) -> str:
+    """
+    Crée un graphique des marques les plus populaires
+    """
+    return render_top_chart(f"🏷 <b>Top {top_n} des marques</b>", get_brand_statistics(ads), top_n,
+                            "❌ Aucune donnée de marque disponible")
+
 def create_location_chart(ads: List[Dict[str, Any]], top_n: int = 10) -> str:
     """
     Crée un graphique des localisations les plus populaires
     """
-    location_stats = get_location_statistics(ads)
-    
-    if not location_stats:
-        return "❌ Aucune donnée de localisation disponible"
-    
-    chart = f"📍 <b>Top {top_n} des localisations</b>\n\n"
-    
-    max_count = max(location_stats.values()) if location_stats else 0
-    
-    for i, (location, count) in enumerate(list(location_stats.items())[:top_n]):
-        if max_count > 0:
-            bar_length = int((count / max_count) * 15)  # 15 caractères max
-            bar = "█" * bar_length
-        else:
-            bar = ""
-        
-        chart += f"{location}: {bar} ({count})\n"
-    
-    return chart
+    return render_top_chart(f"📍 <b>Top {top_n} des localisations</b>", get_location_statistics(ads), top_n,
+                            "❌ Aucune donnée de localisation disponible")
 
 def create_summary_chart() -> str:
     """
-    Crée un résumé visuel complet des données
+    Crée un résumé visuel complet des données, à partir d'une seule agrégation
     """
-    ads = load_ads_data()
+    stats = get_summary_statistics()
     
-    if not ads:
+    if stats["total_ads"] == 0:
         return "❌ Aucune donnée disponible. Lancez d'abord /search"
     
     summary = f"📊 <b>Résumé des données</b>\n\n"
-    summary += f"📦 Total annonces: {len(ads)}\n\n"
+    summary += f"📦 Total annonces: {stats['total_ads']}\n\n"
     
     # Ajoute l'histogramme des prix
-    summary += create_price_histogram(ads) + "\n\n"
+    summary += render_price_histogram(stats["price_distribution"]) + "\n\n"
     
     # Ajoute le top des marques
-    summary += create_brand_chart(ads, 5) + "\n\n"
+    summary += render_top_chart("🏷 <b>Top 5 des marques</b>", stats["brand_stats"], 5,
+                                "❌ Aucune donnée de marque disponible") + "\n\n"
     
     # Ajoute le top des localisations
-    summary += create_location_chart(ads, 5)
+    summary += render_top_chart("📍 <b>Top 5 des localisations</b>", stats["location_stats"], 5,
+                                "❌ Aucune donnée de localisation disponible") + "\n\n"
+    
+    # Ajoute le top des catégories
+    summary += render_top_chart("📂 <b>Top 5 des catégories</b>", stats["category_stats"], 5,
+                                "❌ Aucune donnée de catégorie disponible")
     
     return summary
 
-def get_valid_prices(ads: List[Dict[str, Any]]) -> List[float]:
-    """
-    Extrait tous les prix valides (float) des annonces
-    """
-    prices = []
-    def extract_first_number(value):
-        if isinstance(value, (int, float)):
-            return float(value)
-        elif isinstance(value, list):
-            if value:
-                return extract_first_number(value[0])
-        elif isinstance(value, str):
-            try:
-                return float(value.replace(" ", "").replace(",", "."))
-            except (ValueError, TypeError):
-                pass
-        return None
-    from scrap.jobs.statistic import find_element_value
-    for ad in ads:
-        price_values = find_element_value(ad, "price")
-        if price_values:
-            for price_val in price_values if isinstance(price_values, list) else [price_values]:
-                price_num = extract_first_number(price_val)
-                if price_num is not None:
-                    prices.append(price_num)
-    return prices
-
 def plot_price_histogram(ads: List[Dict[str, Any]], bins: int = 10) -> Optional[io.BytesIO]:
     """
     Génère un histogramme des prix et retourne un buffer BytesIO (image PNG)
     """
-    prices = get_valid_prices(ads)
-    if not prices:
+    summary = summarize_prices(get_valid_prices(ads), bins=bins)
+    if summary["count"] == 0:
         return None
+    edges = summary["edges"]
     plt.figure(figsize=(8, 4))
-    plt.hist(prices, bins=bins, color='skyblue', edgecolor='black')
+    # Histogramme déjà calculé par summarize_prices : on ne dessine que les barres
+    plt.bar(edges[:-1], summary["counts"], width=np.diff(edges), align='edge',
+            color='skyblue', edgecolor='black')
     plt.title("Distribution des prix")
     plt.xlabel("Prix (€)")
     plt.ylabel("Nombre d'annonces")
@@ -151,17 +126,12 @@ def plot_location_histogram(ads: List[Dict[str, Any]], top_n: int = 10) -> Optio
     Génère un histogramme des villes et retourne un buffer BytesIO (image PNG)
     Utilise spécifiquement l'élément 'city'
     """
-    from scrap.jobs.statistic import find_element_value
-    
     city_counts = {}
     
-    for ad in ads:
+    for ad in as_ads(ads):
         # Utilise spécifiquement l'élément 'city'
-        cities = find_element_value(ad, "city")
-        if cities:
-            city = str(cities[0] if isinstance(cities, list) else cities).strip()
-            if city:
-                city_counts[city] = city_counts.get(city, 0) + 1
+        if ad.city:
+            city_counts[ad.city] = city_counts.get(ad.city, 0) + 1
     
     if not city_counts:
         return None
@@ -1,12 +1,13 @@
 import json
 import os
+from scrap.core.dataset import DATA_DIR
 from scrap.jobs.statistic import find_element_value, get_attribute_value
 
 def debug_price_extraction():
     """
     Debug pour comprendre pourquoi seulement 14 annonces sur 70 ont un prix
     """
-    data_dir = os.path.join("scrap", "tools", "scrap", "data")
+    data_dir = DATA_DIR
     total_ads = 0
     ads_with_price = 0
     ads_without_price = 0
@@ -1,68 +1,54 @@
 import json
 import os
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from scrap.jobs.statistic import get_attribute_value, find_element_value
+from scrap.core.models import Ad, parse_number
+from scrap.core.store import AdStore
+from scrap.core.dataset import dataset
 
 def load_ads_data() -> List[Dict[str, Any]]:
     """
     Charge toutes les données d'annonces depuis les fichiers ads_*.json
+    (cache partagé : seuls les fichiers modifiés sont relus, ne pas modifier la liste)
     """
-    data_dir = os.path.join("scrap", "tools", "scrap", "data")
-    all_ads = []
-    
-    if not os.path.exists(data_dir):
-        return all_ads
-        
-    for file in os.listdir(data_dir):
-        if file.startswith("ads_") and file.endswith(".json"):
-            file_path = os.path.join(data_dir, file)
-            try:
-                with open(file_path, encoding="utf-8") as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        all_ads.extend(data)
-                    elif isinstance(data, dict):
-                        all_ads.append(data)
-            except Exception as e:
-                print(f"Erreur lecture {file}: {e}")
-                continue
-    
-    return all_ads
+    return dataset.raw()
 
-def extract_price(ad: Dict[str, Any]) -> Optional[float]:
+def load_ads() -> List[Ad]:
     """
-    Extrait le prix d'une annonce en utilisant les fonctions existantes
+    Charge toutes les annonces sous forme typée (champs pré-extraits)
+    """
+    return dataset.ads()
+
+def load_store() -> AdStore:
+    """
+    Charge toutes les annonces dans un AdStore (colonnes NumPy)
+    """
+    return dataset.store()
+
+def extract_price(ad: Union[Ad, Dict[str, Any]]) -> Optional[float]:
     """
-    # Utilise la fonction existante find_element_value car price est un élément
+    Extrait le prix d'une annonce (typée ou brute)
+    """
+    if isinstance(ad, Ad):
+        return ad.price
+
+    # Annonce brute : price est un élément
     prices = find_element_value(ad, "price")
     if not prices:
         return None
     
-    # Gère les listes imbriquées et extrait la première valeur numérique
-    def extract_first_number(value):
-        if isinstance(value, (int, float)):
-            return float(value)
-        elif isinstance(value, list):
-            if value:
-                return extract_first_number(value[0])
-        elif isinstance(value, str):
-            try:
-                return float(value.replace(" ", "").replace(",", "."))
-            except (ValueError, TypeError):
-                pass
-        return None
-    
     # Essaie d'extraire un prix de la première valeur trouvée
     first_price = prices[0] if isinstance(prices, list) else prices
-    price_value = extract_first_number(first_price)
-    
-    return price_value
+    return parse_number(first_price)
 
-def extract_location(ad: Dict[str, Any]) -> Optional[str]:
+def extract_location(ad: Union[Ad, Dict[str, Any]]) -> Optional[str]:
     """
     Extrait la ville d'une annonce en utilisant uniquement l'élément 'city'.
     """
+    if isinstance(ad, Ad):
+        return ad.city
+
     cities = find_element_value(ad, "city")
     if cities:
         return str(cities[0]) if isinstance(cities, list) else str(cities)
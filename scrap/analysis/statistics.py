@@ -1,167 +1,136 @@
-import statistics
-from typing import List, Dict, Any, Optional, Tuple
-from scrap.jobs.statistic import get_attribute_value, find_element_value
-from .filters import load_ads_data
+import numpy as np
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple, Union
+from scrap.core.models import Ad, as_ads
+from scrap.core.store import AdStore
+from .filters import load_ads, load_store
 
-def get_price_statistics(ads: List[Dict[str, Any]]) -> Dict[str, float]:
+EMPTY_PRICE_STATS = {"count": 0, "min": 0, "max": 0, "mean": 0, "median": 0, "std": 0, "p25": 0, "p75": 0}
+
+def get_valid_prices(ads: List[Union[Ad, Dict[str, Any]]]) -> np.ndarray:
     """
-    Calcule les statistiques de prix pour une liste d'annonces
+    Extrait tous les prix valides des annonces (tableau float64)
     """
-    prices = []
-    
-    def extract_first_number(value):
-        if isinstance(value, (int, float)):
-            return float(value)
-        elif isinstance(value, list):
-            if value:
-                return extract_first_number(value[0])
-        elif isinstance(value, str):
-            try:
-                return float(value.replace(" ", "").replace(",", "."))
-            except (ValueError, TypeError):
-                pass
-        return None
-    
-    for ad in ads:
-        # Utilise la fonction existante pour extraire le prix (élément)
-        price_values = find_element_value(ad, "price")
-        if price_values:
-            for price_val in price_values if isinstance(price_values, list) else [price_values]:
-                price_num = extract_first_number(price_val)
-                if price_num is not None:
-                    prices.append(price_num)
-    
-    if not prices:
-        return {
-            "count": 0,
-            "min": 0,
-            "max": 0,
-            "mean": 0,
-            "median": 0
-        }
-    
+    return np.fromiter((ad.price for ad in as_ads(ads) if ad.price is not None), dtype=np.float64)
+
+def trim_outliers(prices: np.ndarray, factor: float = 1.5) -> np.ndarray:
+    """
+    Retire les prix hors de [Q1 - factor*IQR, Q3 + factor*IQR]
+    """
+    if prices.size < 4:
+        return prices
+    q1, q3 = np.percentile(prices, [25, 75])
+    iqr = q3 - q1
+    return prices[(prices >= q1 - factor * iqr) & (prices <= q3 + factor * iqr)]
+
+def summarize_prices(prices: np.ndarray, bins: int = 10, remove_outliers: bool = False) -> Dict[str, Any]:
+    """
+    Calcule tous les agrégats de prix sur un tableau float : statistiques
+    (count, min, max, mean, median, std, p25, p75) et histogramme (counts, edges).
+    Le dernier intervalle de l'histogramme inclut le prix maximum.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    prices = prices[~np.isnan(prices)]
+    total = int(prices.size)
+    if remove_outliers:
+        prices = trim_outliers(prices)
+
+    if prices.size == 0:
+        return {**EMPTY_PRICE_STATS, "outliers": total, "counts": np.zeros(0, dtype=np.int64),
+                "edges": np.zeros(0)}
+
+    p25, median, p75 = np.percentile(prices, [25, 50, 75])
+    counts, edges = np.histogram(prices, bins=bins)
     return {
-        "count": len(prices),
-        "min": min(prices),
-        "max": max(prices),
-        "mean": statistics.mean(prices),
-        "median": statistics.median(prices)
+        "count": int(prices.size),
+        "min": float(prices.min()),
+        "max": float(prices.max()),
+        "mean": float(prices.mean()),
+        "median": float(median),
+        "std": float(prices.std()),
+        "p25": float(p25),
+        "p75": float(p75),
+        "outliers": total - int(prices.size),
+        "counts": counts,
+        "edges": edges,
     }
 
-def get_price_distribution(ads: List[Dict[str, Any]], bins: int = 10) -> Dict[str, Any]:
+def price_stats_from_summary(summary: Dict[str, Any]) -> Dict[str, float]:
     """
-    Calcule la distribution des prix par fourchettes
+    Statistiques de prix (sans l'histogramme) d'un résumé summarize_prices
     """
-    prices = []
-    
-    def extract_first_number(value):
-        if isinstance(value, (int, float)):
-            return float(value)
-        elif isinstance(value, list):
-            if value:
-                return extract_first_number(value[0])
-        elif isinstance(value, str):
-            try:
-                return float(value.replace(" ", "").replace(",", "."))
-            except (ValueError, TypeError):
-                pass
-        return None
-    
-    for ad in ads:
-        # Utilise la fonction existante pour extraire le prix (élément)
-        price_values = find_element_value(ad, "price")
-        if price_values:
-            for price_val in price_values if isinstance(price_values, list) else [price_values]:
-                price_num = extract_first_number(price_val)
-                if price_num is not None:
-                    prices.append(price_num)
-    
-    if not prices:
+    return {key: summary[key] for key in EMPTY_PRICE_STATS}
+
+def price_distribution_from_summary(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Distribution par fourchettes (format de get_price_distribution) d'un résumé summarize_prices
+    """
+    if summary["count"] == 0:
         return {"ranges": [], "counts": []}
-    
-    min_price = min(prices)
-    max_price = max(prices)
-    bin_size = (max_price - min_price) / bins
-    
-    ranges = []
-    counts = []
-    
-    for i in range(bins):
-        start = min_price + i * bin_size
-        end = min_price + (i + 1) * bin_size
-        count = sum(1 for price in prices if start <= price < end)
-        
-        ranges.append(f"{start:.0f}-{end:.0f}€")
-        counts.append(count)
-    
+    edges = summary["edges"]
     return {
-        "ranges": ranges,
-        "counts": counts,
-        "total_ads": len(prices)
+        "ranges": [f"{start:.0f}-{end:.0f}€" for start, end in zip(edges[:-1], edges[1:])],
+        "counts": summary["counts"].tolist(),
+        "total_ads": summary["count"]
     }
 
-def get_brand_statistics(ads: List[Dict[str, Any]]) -> Dict[str, int]:
+def get_price_statistics(ads: List[Union[Ad, Dict[str, Any]]], remove_outliers: bool = False) -> Dict[str, float]:
+    """
+    Calcule les statistiques de prix pour une liste d'annonces
+    """
+    return price_stats_from_summary(summarize_prices(get_valid_prices(ads), remove_outliers=remove_outliers))
+
+def get_price_distribution(ads: List[Union[Ad, Dict[str, Any]]], bins: int = 10,
+                           remove_outliers: bool = False) -> Dict[str, Any]:
+    """
+    Calcule la distribution des prix par fourchettes
+    """
+    return price_distribution_from_summary(
+        summarize_prices(get_valid_prices(ads), bins=bins, remove_outliers=remove_outliers)
+    )
+
+def get_brand_statistics(ads: List[Union[Ad, Dict[str, Any]]]) -> Dict[str, int]:
     """
     Compte le nombre d'annonces par marque
     """
-    brand_counts = {}
-    
-    for ad in ads:
-        # Utilise la fonction existante pour extraire la marque
-        brands = get_attribute_value(ad, "brand")
-        if brands:
-            brand = str(brands[0] if isinstance(brands, list) else brands).strip()
-            if brand:
-                brand_counts[brand] = brand_counts.get(brand, 0) + 1
-    
-    return dict(sorted(brand_counts.items(), key=lambda x: x[1], reverse=True))
+    brand_counts = Counter(ad.brand for ad in as_ads(ads) if ad.brand)
+    return dict(brand_counts.most_common())
 
-def get_location_statistics(ads: List[Dict[str, Any]]) -> Dict[str, int]:
+def get_location_statistics(ads: List[Union[Ad, Dict[str, Any]]]) -> Dict[str, int]:
     """
-    Compte le nombre d'annonces par localisation
+    Compte le nombre d'annonces par localisation (ville)
     """
-    location_counts = {}
-    
-    for ad in ads:
-        # Essaie d'abord les attributs de localisation
-        location = None
-        for location_key in ["location", "city", "ville"]:
-            locations = get_attribute_value(ad, location_key)
-            if locations:
-                location = str(locations[0] if isinstance(locations, list) else locations).strip()
-                break
-        
-        # Si pas trouvé dans les attributs, essaie les éléments
-        if not location:
-            for location_key in ["location", "city", "ville"]:
-                locations = find_element_value(ad, location_key)
-                if locations:
-                    location = str(locations[0] if isinstance(locations, list) else locations).strip()
-                    break
-        
-        if location:
-            location_counts[location] = location_counts.get(location, 0) + 1
-    
-    return dict(sorted(location_counts.items(), key=lambda x: x[1], reverse=True))
+    location_counts = Counter(ad.city for ad in as_ads(ads) if ad.city)
+    return dict(location_counts.most_common())
 
-def get_summary_statistics() -> Dict[str, Any]:
+def summarize_store(store: AdStore, bins: int = 10) -> Dict[str, Any]:
     """
-    Génère un résumé complet des statistiques
+    Calcule en une passe sur les colonnes du store tous les agrégats des vues
+    de résumé : statistiques et distribution des prix, comptes par marque,
+    par ville et par catégorie
     """
-    ads = load_ads_data()
-    
-    if not ads:
+    if not len(store):
         return {
             "total_ads": 0,
             "price_stats": {},
+            "price_distribution": {"ranges": [], "counts": []},
             "brand_stats": {},
-            "location_stats": {}
+            "location_stats": {},
+            "category_stats": {}
         }
     
+    price_summary = summarize_prices(store.valid_prices(), bins=bins)
     return {
-        "total_ads": len(ads),
-        "price_stats": get_price_statistics(ads),
-        "price_distribution": get_price_distribution(ads),
-        "brand_stats": get_brand_statistics(ads),
-        "location_stats": get_location_statistics(ads)
-    } 
\ No newline at end of file
+        "total_ads": len(store),
+        "price_stats": price_stats_from_summary(price_summary),
+        "price_distribution": price_distribution_from_summary(price_summary),
+        "brand_stats": store.counts("brand"),
+        "location_stats": store.counts("city"),
+        "category_stats": store.counts("category")
+    }
+
+def get_summary_statistics(bins: int = 10) -> Dict[str, Any]:
+    """
+    Génère un résumé complet des statistiques
+    """
+    return summarize_store(load_store(), bins)
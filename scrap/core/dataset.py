@@ -0,0 +1,146 @@
+"""
+Cache process-wide du jeu de données scrapé (fichiers ads_*.json).
+
+Chaque fichier est identifié par sa date de modification et sa taille : seuls
+les fichiers nouveaux ou modifiés sont relus, les fichiers supprimés sont
+oubliés. Les vues dérivées (liste brute, annonces typées, AdStore) ne sont
+reconstruites que lorsque le contenu a changé.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from scrap.core.models import Ad, as_ads
+from scrap.core.store import AdStore
+
+logger = logging.getLogger(__name__)
+
+# Chemin absolu, rattaché au paquet : indépendant du répertoire de lancement
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "scrap", "data")
+
+
+class _CachedFile:
+    __slots__ = ("signature", "raw", "ads")
+
+    def __init__(self, signature: Tuple[int, int], raw: List[Dict[str, Any]]):
+        self.signature = signature
+        self.raw = raw
+        self.ads: Optional[List[Ad]] = None
+
+
+class DatasetCache:
+    """
+    Jeu de données chargé une fois puis tenu à jour d'après l'état des fichiers.
+    Les listes retournées sont partagées entre les appelants : ne pas les modifier.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+        self._files: Dict[str, _CachedFile] = {}
+        self._lock = threading.RLock()
+        self._raw: Optional[List[Dict[str, Any]]] = None
+        self._ads: Optional[List[Ad]] = None
+        self._store: Optional[AdStore] = None
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Signature (mtime_ns, taille) de chaque fichier ads_*.json présent"""
+        signatures = {}
+        if not os.path.exists(self.data_dir):
+            return signatures
+        with os.scandir(self.data_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith("ads_") and entry.name.endswith(".json") and entry.is_file():
+                    stat = entry.stat()
+                    signatures[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def _read(self, name: str) -> List[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.data_dir, name), encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            # Fichier illisible (ex : en cours d'écriture) : retenté dès qu'il change
+            logger.warning(f"Erreur lecture {name}: {e}")
+            return []
+        if isinstance(data, list):
+            return data
+        if isinstance(data, dict):
+            return [data]
+        return []
+
+    def refresh(self) -> bool:
+        """Relit les fichiers nouveaux ou modifiés ; retourne True si le jeu de données a changé"""
+        with self._lock:
+            signatures = self._scan()
+            changed = signatures.keys() != self._files.keys()
+
+            for name, signature in signatures.items():
+                cached = self._files.get(name)
+                if cached is None or cached.signature != signature:
+                    self._files[name] = _CachedFile(signature, self._read(name))
+                    changed = True
+
+            for name in self._files.keys() - signatures.keys():
+                del self._files[name]
+
+            if changed:
+                # On suit l'ordre du répertoire, comme l'ancien load_ads_data
+                self._files = {name: self._files[name] for name in signatures}
+                self._raw = None
+                self._ads = None
+                self._store = None
+            return changed
+
+    def raw(self) -> List[Dict[str, Any]]:
+        """Toutes les annonces brutes"""
+        with self._lock:
+            self.refresh()
+            if self._raw is None:
+                self._raw = [ad for cached in self._files.values() for ad in cached.raw]
+            return self._raw
+
+    def files(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Annonces brutes par nom de fichier"""
+        with self._lock:
+            self.refresh()
+            return {name: cached.raw for name, cached in self._files.items()}
+
+    def snapshot(self) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Tuple[int, int]]]:
+        """Annonces brutes et signature (mtime_ns, taille) de chaque fichier, lues ensemble"""
+        with self._lock:
+            self.refresh()
+            return ({name: cached.raw for name, cached in self._files.items()},
+                    {name: cached.signature for name, cached in self._files.items()})
+
+    def ads(self) -> List[Ad]:
+        """Toutes les annonces typées (seuls les fichiers modifiés sont reconvertis)"""
+        with self._lock:
+            self.refresh()
+            if self._ads is None:
+                for cached in self._files.values():
+                    if cached.ads is None:
+                        cached.ads = as_ads(cached.raw)
+                self._ads = [ad for cached in self._files.values() for ad in cached.ads]
+            return self._ads
+
+    def store(self) -> AdStore:
+        """AdStore des annonces, reconstruit uniquement après un changement"""
+        with self._lock:
+            ads = self.ads()
+            if self._store is None:
+                self._store = AdStore(ads)
+            return self._store
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+            self._raw = None
+            self._ads = None
+            self._store = None
+
+
+# Instance globale
+dataset = DatasetCache()
@@ -83,11 +83,20 @@ class DownloadServer:
                         'filepath': filepath,
                         'filename': os.path.basename(filepath)
                     })
+                elif format_type in ('parquet', 'feather'):
+                    export = getattr(self.exporter, f'export_to_{format_type}')
+                    filepath = export(export_data, filename)
+                    return jsonify({
+                        'success': True,
+                        'filepath': filepath,
+                        'filename': os.path.basename(filepath)
+                    })
                 elif format_type == 'all':
                     results = self.exporter.export_all_formats(export_data, filename)
                     return jsonify({
                         'success': True,
-                        'results': results
+                        'results': results,
+                        'timings': self.exporter.last_timings
                     })
                 else:
                     return jsonify({
@@ -429,6 +438,8 @@ class DownloadServer:
                         <option value="json">JSON</option>
                         <option value="csv">CSV</option>
                         <option value="excel">Excel</option>
+                        <option value="parquet">Parquet</option>
+                        <option value="feather">Feather (Arrow)</option>
                     </select>
                 </div>
                 
@@ -1,9 +1,14 @@
 import json
 import csv
+import gzip
 import pandas as pd
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, BinaryIO, Sequence
 import logging
 
 # Imports conditionnels pour Google Sheets
@@ -18,13 +23,180 @@ except ImportError:
     Credentials = None
     GoogleAuthError = None
 
+# Import conditionnel pour les exports Parquet et Arrow (Feather)
+try:
+    import pyarrow
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pyarrow = None
+
+# Import conditionnel pour l'écriture Excel rapide (sinon openpyxl en mode write_only)
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+    xlsxwriter = None
+
+# Import conditionnel pour la compression zstd des exports JSON
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+# Compressions possibles des exports JSON et suffixe de fichier associé
+JSON_COMPRESSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+# Taille des blocs écrits d'un coup dans le fichier (et donc dans le compresseur)
+JSON_WRITE_CHUNK = 1024 * 1024
+
+def open_compressed(filepath: str, compression: Optional[str] = None) -> BinaryIO:
+    """Ouvre un fichier en écriture binaire, compressé en gzip ou zstd si demandé"""
+    if compression not in JSON_COMPRESSIONS:
+        raise ValueError(f"Compression non supportée: {compression}")
+    if compression == "gzip":
+        return gzip.open(filepath, 'wb', compresslevel=6)
+    if compression == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise ImportError("zstandard n'est pas installé. Installez-le avec: pip install zstandard")
+        return zstandard.ZstdCompressor(level=6).stream_writer(open(filepath, 'wb'))
+    return open(filepath, 'wb')
+
+def write_json_stream(items: Iterable[Dict[str, Any]], fileobj: BinaryIO, ndjson: bool = False) -> int:
+    """
+    Écrit les annonces une par une en JSON compact : un tableau avec une annonce
+    par ligne, ou du NDJSON (une annonce JSON par ligne, sans tableau). Les
+    annonces peuvent venir d'un itérateur : la mémoire utilisée ne dépend pas
+    de leur nombre. Retourne le nombre d'annonces écrites.
+    """
+    count = 0
+    chunk: List[str] = []
+    size = 0
+    if not ndjson:
+        chunk.append("[")
+    for item in items:
+        line = json.dumps(item, ensure_ascii=False, separators=(',', ':'))
+        if ndjson:
+            line += "\n"
+        else:
+            line = ("\n" if count == 0 else ",\n") + line
+        chunk.append(line)
+        size += len(line)
+        count += 1
+        if size >= JSON_WRITE_CHUNK:
+            fileobj.write("".join(chunk).encode('utf-8'))
+            chunk.clear()
+            size = 0
+    if not ndjson:
+        chunk.append("\n]\n")
+    fileobj.write("".join(chunk).encode('utf-8'))
+    return count
+
+# Attributs extraits en colonnes (attributes_<clé>) lors de l'aplatissement
+FLATTEN_ATTRIBUTES = ('brand', 'model', 'regdate', 'mileage', 'fuel')
+
+def _attribute_columns(values: List[Any], keys: Iterable[str], prefix: str = "") -> Dict[str, List[Any]]:
+    """
+    Colonnes d'attributs : chaque liste d'attributs n'est parcourue qu'une fois
+    pour toutes les clés voulues (la première occurrence d'une clé l'emporte).
+    """
+    columns = {key: [None] * len(values) for key in keys}
+    for i, attributes in enumerate(values):
+        if not isinstance(attributes, list):
+            continue
+        seen = set()
+        for attr in attributes:
+            if not isinstance(attr, dict):
+                continue
+            key = attr.get('key')
+            column = columns.get(key)
+            if column is not None and key not in seen:
+                seen.add(key)
+                column[i] = attr.get('value')
+    return {f"{prefix}{key}": column for key, column in columns.items()}
+
+def _dict_columns(values: List[Any], prefix: str = "") -> Dict[str, List[Any]]:
+    """Une colonne par clé des dictionnaires, dans l'ordre de première apparition"""
+    empty: Dict[str, Any] = {}
+    dicts = [value if isinstance(value, dict) else empty for value in values]
+    keys: Dict[str, None] = {}
+    for value in dicts:
+        keys.update(dict.fromkeys(value))
+    return {f"{prefix}{key}": [value.get(key) for value in dicts] for key in keys}
+
+# Limites d'Excel : lignes par feuille (en-tête compris) et caractères par cellule
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_MAX_CELL_CHARS = 32_767
+# Les lignes sont converties et écrites par blocs : la mémoire ne dépend pas de la taille de l'export
+EXCEL_CHUNK_ROWS = 10_000
+# Caractères de contrôle refusés dans un classeur Excel
+_EXCEL_ILLEGAL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+def _excel_value(value: Any) -> Any:
+    """Valeur de cellule Excel : None pour les manquants, texte pour les listes et dictionnaires"""
+    if value is None or isinstance(value, (bool, int)):
+        return value
+    if isinstance(value, float):
+        return None if value != value else value
+    if isinstance(value, str):
+        return _EXCEL_ILLEGAL_CHARS.sub("", value[:EXCEL_MAX_CELL_CHARS])
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value, ensure_ascii=False)
+    elif value is pd.NA or value is pd.NaT:
+        return None
+    return _EXCEL_ILLEGAL_CHARS.sub("", str(value)[:EXCEL_MAX_CELL_CHARS])
+
+def _excel_rows(df: pd.DataFrame, start: int, stop: int) -> Iterable[tuple]:
+    """Lignes [start, stop) du DataFrame, converties bloc par bloc en valeurs de cellules"""
+    for chunk_start in range(start, stop, EXCEL_CHUNK_ROWS):
+        chunk = df.iloc[chunk_start:min(stop, chunk_start + EXCEL_CHUNK_ROWS)]
+        columns = []
+        for i in range(chunk.shape[1]):
+            series = chunk.iloc[:, i]
+            values = series.tolist()
+            if series.dtype.kind in 'iub':
+                columns.append(values)
+            elif series.dtype.kind == 'f':
+                columns.append([None if value != value else value for value in values])
+            else:
+                columns.append([_excel_value(value) for value in values])
+        yield from zip(*columns)
+
+def _excel_sheets(name: str, df: pd.DataFrame, max_rows: Optional[int] = None):
+    """
+    (nom de feuille, en-tête, lignes) pour un DataFrame : au-delà de la limite
+    d'Excel, les lignes suivantes vont dans "<nom> (2)", "<nom> (3)", ...
+    """
+    per_sheet = (max_rows or EXCEL_MAX_ROWS) - 1
+    total = len(df)
+    header = [str(col) for col in df.columns]
+    for part in range(max(1, -(-total // per_sheet))):
+        sheet_name = name if part == 0 else f"{name} ({part + 1})"
+        start = part * per_sheet
+        yield sheet_name[:31], header, _excel_rows(df, start, min(total, start + per_sheet))
+
+# Nombre de formats écrits en parallèle par export_all_formats
+EXPORT_WORKERS = 4
+
+@dataclass
+class ExportFrames:
+    """DataFrames communs aux exports tabulaires (CSV, Excel, Parquet, Feather), construits une seule fois"""
+    data: List[Dict[str, Any]]
+    flat: pd.DataFrame
+    simple: pd.DataFrame
+    stats: pd.DataFrame
+
 class DataExporter:
     """Classe pour exporter les données vers différents formats"""
     
     def __init__(self, output_dir: str = "exports"):
         self.output_dir = output_dir
+        # Durées du dernier export_all_formats, en secondes
+        self.last_timings: Dict[str, float] = {}
         self._ensure_output_dir()
         
     def _ensure_output_dir(self):
@@ -36,25 +208,46 @@ class DataExporter:
         """Retourne un timestamp pour les noms de fichiers"""
         return datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    def export_to_json(self, data: List[Dict[str, Any]], filename: Optional[str] = None) -> str:
-        """Exporte les données vers un fichier JSON"""
+    def export_to_json(self, data: Iterable[Dict[str, Any]], filename: Optional[str] = None,
+                       ndjson: bool = False, compression: Optional[str] = None) -> str:
+        """
+        Exporte les données vers un fichier JSON compact (ou NDJSON), écrit en
+        flux : `data` peut être un itérateur, par exemple AdStorage.iter_raw().
+        `compression` vaut None, "gzip" ou "zstd".
+        """
+        if compression not in JSON_COMPRESSIONS:
+            raise ValueError(f"Compression non supportée: {compression}")
+        suffix = JSON_COMPRESSIONS[compression]
         if filename is None:
-            filename = f"export_{self._get_timestamp()}.json"
+            filename = f"export_{self._get_timestamp()}.{'ndjson' if ndjson else 'json'}"
+        if not filename.endswith(suffix):
+            filename += suffix
         
         filepath = os.path.join(self.output_dir, filename)
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with open_compressed(filepath, compression) as f:
+                count = write_json_stream(data, f, ndjson=ndjson)
             
-            logger.info(f"Données exportées vers JSON: {filepath}")
+            logger.info(f"{count} annonces exportées vers JSON: {filepath}")
             return filepath
         except Exception as e:
             logger.error(f"Erreur lors de l'export JSON: {e}")
             raise
     
-    def export_to_csv(self, data: List[Dict[str, Any]], filename: Optional[str] = None) -> str:
-        """Exporte les données vers un fichier CSV"""
+    def build_frames(self, data: List[Dict[str, Any]]) -> ExportFrames:
+        """Aplatit les données et calcule les statistiques une fois pour tous les formats"""
+        df = pd.DataFrame(data)
+        return ExportFrames(
+            data=data,
+            flat=self._flatten_dataframe(df),
+            simple=self._simplify_dataframe(df),
+            stats=self._create_stats_dataframe(data)
+        )
+    
+    def export_to_csv(self, data: List[Dict[str, Any]], filename: Optional[str] = None,
+                      frames: Optional[ExportFrames] = None) -> str:
+        """Exporte les données vers un fichier CSV (à partir de `frames` s'ils sont déjà construits)"""
         if filename is None:
             filename = f"export_{self._get_timestamp()}.csv"
         
@@ -65,13 +258,10 @@ class DataExporter:
                 logger.warning("Aucune donnée à exporter")
                 return filepath
                 
-            # Convertir en DataFrame pandas pour une meilleure gestion
-            df = pd.DataFrame(data)
+            if frames is None:
+                frames = self.build_frames(data)
             
-            # Aplatir les colonnes complexes (comme 'images', 'attributes')
-            df_flat = self._flatten_dataframe(df)
-            
-            df_flat.to_csv(filepath, index=False, encoding='utf-8')
+            frames.flat.to_csv(filepath, index=False, encoding='utf-8')
             
             logger.info(f"Données exportées vers CSV: {filepath}")
             return filepath
@@ -79,8 +269,9 @@ class DataExporter:
             logger.error(f"Erreur lors de l'export CSV: {e}")
             raise
     
-    def export_to_excel(self, data: List[Dict[str, Any]], filename: Optional[str] = None) -> str:
-        """Exporte les données vers un fichier Excel"""
+    def export_to_excel(self, data: List[Dict[str, Any]], filename: Optional[str] = None,
+                        frames: Optional[ExportFrames] = None) -> str:
+        """Exporte les données vers un fichier Excel (à partir de `frames` s'ils sont déjà construits)"""
         if filename is None:
             filename = f"export_{self._get_timestamp()}.xlsx"
         
@@ -91,29 +282,61 @@ class DataExporter:
                 logger.warning("Aucune donnée à exporter")
                 return filepath
                 
-            # Convertir en DataFrame pandas
-            df = pd.DataFrame(data)
+            if frames is None:
+                frames = self.build_frames(data)
             
-            # Aplatir les colonnes complexes
-            df_flat = self._flatten_dataframe(df)
+            self._write_excel(frames, filepath)
             
-            # Créer un writer Excel
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-                # Feuille principale avec données aplaties
-                df_flat.to_excel(writer, sheet_name='Données', index=False)
+            logger.info(f"Données exportées vers Excel: {filepath}")
+            return filepath
+        except Exception as e:
+            logger.error(f"Erreur lors de l'export Excel: {e}")
+            raise
+    
+    def export_to_parquet(self, data: List[Dict[str, Any]], filename: Optional[str] = None,
+                          compression: str = "zstd", frames: Optional[ExportFrames] = None) -> str:
+        """Exporte les données aplaties vers un fichier Parquet (colonnes typées et compressées)"""
+        if filename is None:
+            filename = f"export_{self._get_timestamp()}.parquet"
+        
+        filepath = os.path.join(self.output_dir, filename)
+        
+        try:
+            if not data:
+                logger.warning("Aucune donnée à exporter")
+                return filepath
                 
-                # Feuille avec données originales (si pas trop complexes)
-                df_simple = self._simplify_dataframe(df)
-                df_simple.to_excel(writer, sheet_name='Données_Originales', index=False)
+            flat = frames.flat if frames is not None else self._flatten_dataframe(pd.DataFrame(data))
+            df_flat = self._arrow_frame(flat)
+            df_flat.to_parquet(filepath, engine='pyarrow', compression=compression, index=False)
+            
+            logger.info(f"Données exportées vers Parquet: {filepath}")
+            return filepath
+        except Exception as e:
+            logger.error(f"Erreur lors de l'export Parquet: {e}")
+            raise
+    
+    def export_to_feather(self, data: List[Dict[str, Any]], filename: Optional[str] = None,
+                          compression: str = "zstd", frames: Optional[ExportFrames] = None) -> str:
+        """Exporte les données aplaties vers un fichier Arrow IPC (Feather v2), lisible sans décodage"""
+        if filename is None:
+            filename = f"export_{self._get_timestamp()}.feather"
+        
+        filepath = os.path.join(self.output_dir, filename)
+        
+        try:
+            if not data:
+                logger.warning("Aucune donnée à exporter")
+                return filepath
                 
-                # Feuille de statistiques
-                stats_df = self._create_stats_dataframe(data)
-                stats_df.to_excel(writer, sheet_name='Statistiques', index=False)
+            flat = frames.flat if frames is not None else self._flatten_dataframe(pd.DataFrame(data))
+            df_flat = self._arrow_frame(flat)
+            df_flat.to_feather(filepath, compression=compression)
             
-            logger.info(f"Données exportées vers Excel: {filepath}")
+            logger.info(f"Données exportées vers Feather: {filepath}")
             return filepath
         except Exception as e:
-            logger.error(f"Erreur lors de l'export Excel: {e}")
+            logger.error(f"Erreur lors de l'export Feather: {e}")
             raise
     
     def export_to_google_sheets(self, data: List[Dict[str, Any]], 
@@ -184,49 +407,107 @@ class DataExporter:
             raise
     
     def _flatten_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Aplatit un DataFrame avec des colonnes complexes"""
-        df_flat = df.copy()
+        """
+        Aplatit un DataFrame avec des colonnes complexes, en un seul passage par colonne :
+        - attributes (liste de {key, value}) : une colonne par attribut de FLATTEN_ATTRIBUTES
+        - images : nombre d'images et miniature
+        - autres dictionnaires : une colonne par clé (comme pd.json_normalize, sur un niveau)
+        - listes : nombre d'éléments et premier élément
+        Les colonnes aplaties remplacent la colonne d'origine, à sa place.
+        """
+        columns: Dict[str, Any] = {}
+        for col in df.columns:
+            series = df[col]
+            if series.dtype != object:
+                columns[col] = series
+                continue
+            values = series.tolist()
+            has_list = any(isinstance(value, list) for value in values)
+            has_dict = not has_list and any(isinstance(value, dict) for value in values)
+            
+            if col == 'attributes' and has_list:
+                columns.update(_attribute_columns(values, FLATTEN_ATTRIBUTES, prefix=f"{col}_"))
+            elif has_list:
+                # Colonne de liste - nombre d'éléments et premier élément (une valeur isolée est gardée telle quelle)
+                columns[f"{col}_count"] = [len(value) if isinstance(value, list) else 0 for value in values]
+                columns[f"{col}_first"] = [(value[0] if value else None) if isinstance(value, list) else value
+                                           for value in values]
+            elif has_dict and col == 'images':
+                columns[f"{col}_nb_images"] = [value.get('nb_images', 0) if isinstance(value, dict) else 0
+                                               for value in values]
+                columns[f"{col}_thumb_url"] = [value.get('thumb_url', '') if isinstance(value, dict) else ''
+                                               for value in values]
+            elif has_dict:
+                columns.update(_dict_columns(values, prefix=f"{col}_"))
+            else:
+                columns[col] = series
         
-        # Traiter les colonnes complexes
+        return pd.DataFrame(columns, index=df.index)
+    
+    def _arrow_frame(self, df_flat: pd.DataFrame) -> pd.DataFrame:
+        """
+        DataFrame aplati convertible en table Arrow : une colonne Arrow n'a qu'un
+        type, les colonnes aux valeurs de types mélangés (ex : nombres et textes)
+        sont converties en texte. `df_flat` n'est pas modifié (il peut être
+        partagé avec d'autres exports en cours).
+        """
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow n'est pas installé. Installez-le avec: pip install pyarrow")
+        converted = {}
         for col in df_flat.columns:
-            if df_flat[col].dtype == 'object':
-                # Vérifier si c'est une liste ou un dict
-                sample_value = df_flat[col].dropna().iloc[0] if not df_flat[col].dropna().empty else None
-                
-                if isinstance(sample_value, list):
-                    # Colonne de liste - prendre le premier élément ou la longueur
-                    df_flat[f"{col}_count"] = df_flat[col].apply(lambda x: len(x) if isinstance(x, list) else 0)
-                    df_flat[f"{col}_first"] = df_flat[col].apply(lambda x: x[0] if isinstance(x, list) and len(x) > 0 else None)
-                    df_flat = df_flat.drop(columns=[col])
-                
-                elif isinstance(sample_value, dict):
-                    # Colonne de dictionnaire - extraire les clés principales
-                    if col == 'images':
-                        df_flat[f"{col}_nb_images"] = df_flat[col].apply(
-                            lambda x: x.get('nb_images', 0) if isinstance(x, dict) else 0
-                        )
-                        df_flat[f"{col}_thumb_url"] = df_flat[col].apply(
-                            lambda x: x.get('thumb_url', '') if isinstance(x, dict) else ''
-                        )
-                        df_flat = df_flat.drop(columns=[col])
-                    
-                    elif col == 'attributes':
-                        # Extraire les attributs importants
-                        df_flat[f"{col}_brand"] = df_flat[col].apply(
-                            lambda x: self._extract_attribute_value(x, 'brand') if isinstance(x, list) else None
-                        )
-                        df_flat[f"{col}_model"] = df_flat[col].apply(
-                            lambda x: self._extract_attribute_value(x, 'model') if isinstance(x, list) else None
-                        )
-                        df_flat[f"{col}_mileage"] = df_flat[col].apply(
-                            lambda x: self._extract_attribute_value(x, 'mileage') if isinstance(x, list) else None
-                        )
-                        df_flat[f"{col}_fuel"] = df_flat[col].apply(
-                            lambda x: self._extract_attribute_value(x, 'fuel') if isinstance(x, list) else None
-                        )
-                        df_flat = df_flat.drop(columns=[col])
+            if df_flat[col].dtype != object:
+                continue
+            kind = pd.api.types.infer_dtype(df_flat[col], skipna=True)
+            if kind.startswith('mixed') or kind in ('unknown-array', 'empty'):
+                converted[col] = [None if value is None or value != value else str(value) for value in df_flat[col]]
+        return df_flat.assign(**converted) if converted else df_flat
+    
+    def _arrow_dataframe(self, data: List[Dict[str, Any]]) -> pd.DataFrame:
+        """DataFrame aplati et convertible en table Arrow, construit depuis les données brutes"""
+        return self._arrow_frame(self._flatten_dataframe(pd.DataFrame(data)))
+    
+    def _write_excel(self, frames: ExportFrames, filepath: str):
+        """
+        Écrit les trois feuilles du classeur Excel en flux : xlsxwriter en mode
+        constant_memory (ou openpyxl en write_only s'il n'est pas installé), les
+        lignes étant écrites au fur et à mesure sans garder le classeur en mémoire.
+        Une feuille qui dépasse la limite d'Excel est continuée sur une suivante.
+        """
+        sheets = [
+            # Feuille principale avec données aplaties
+            *_excel_sheets('Données', frames.flat),
+            # Feuille avec données originales (si pas trop complexes)
+            *_excel_sheets('Données_Originales', frames.simple),
+            # Feuille de statistiques
+            *_excel_sheets('Statistiques', frames.stats),
+        ]
+        
+        if XLSXWRITER_AVAILABLE:
+            workbook = xlsxwriter.Workbook(filepath, {
+                'constant_memory': True,
+                # Les textes des annonces sont écrits tels quels (ni formule, ni lien)
+                'strings_to_formulas': False,
+                'strings_to_urls': False,
+            })
+            try:
+                bold = workbook.add_format({'bold': True})
+                for sheet_name, header, rows in sheets:
+                    worksheet = workbook.add_worksheet(sheet_name)
+                    worksheet.write_row(0, 0, header, bold)
+                    for row_number, row in enumerate(rows, start=1):
+                        worksheet.write_row(row_number, 0, row)
+            finally:
+                workbook.close()
+            return
         
-        return df_flat
+        from openpyxl import Workbook
+        workbook = Workbook(write_only=True)
+        for sheet_name, header, rows in sheets:
+            worksheet = workbook.create_sheet(sheet_name)
+            worksheet.append(header)
+            for row in rows:
+                worksheet.append(row)
+        workbook.save(filepath)
     
     def _simplify_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """Simplifie un DataFrame en gardant les colonnes principales"""
@@ -240,16 +521,6 @@ class DataExporter:
         
         return df[simple_cols]
     
-    def _extract_attribute_value(self, attributes: List[Dict], key: str) -> Optional[str]:
-        """Extrait une valeur d'attribut spécifique"""
-        if not isinstance(attributes, list):
-            return None
-        
-        for attr in attributes:
-            if isinstance(attr, dict) and attr.get('key') == key:
-                return attr.get('value')
-        return None
-    
     def _create_stats_dataframe(self, data: List[Dict[str, Any]]) -> pd.DataFrame:
         """Crée un DataFrame de statistiques"""
         if not data:
@@ -285,33 +556,105 @@ class DataExporter:
         
         return pd.DataFrame(stats)
     
+    def default_formats(self) -> List[str]:
+        """Formats écrits par export_all_formats quand aucun n'est précisé"""
+        formats = ['json', 'csv', 'excel']
+        if PYARROW_AVAILABLE:
+            formats.append('parquet')
+        return formats
+    
     def export_all_formats(self, data: List[Dict[str, Any]], 
-                          base_filename: Optional[str] = None) -> Dict[str, str]:
-        """Exporte les données vers tous les formats disponibles"""
+                          base_filename: Optional[str] = None,
+                          formats: Optional[Sequence[str]] = None,
+                          max_workers: int = EXPORT_WORKERS) -> Dict[str, str]:
+        """
+        Exporte les données vers plusieurs formats (par défaut default_formats()).
+        Les DataFrames aplatis et les statistiques sont construits une seule fois,
+        puis les formats sont écrits en parallèle. Les durées (secondes) par
+        format, et de la préparation ("frames"), sont dans self.last_timings.
+        """
         if base_filename is None:
             base_filename = f"export_{self._get_timestamp()}"
+        if formats is None:
+            formats = self.default_formats()
         
-        results = {}
+        writers = {
+            'json': lambda frames: self.export_to_json(data, f"{base_filename}.json"),
+            'csv': lambda frames: self.export_to_csv(data, f"{base_filename}.csv", frames=frames),
+            'excel': lambda frames: self.export_to_excel(data, f"{base_filename}.xlsx", frames=frames),
+            'parquet': lambda frames: self.export_to_parquet(data, f"{base_filename}.parquet", frames=frames),
+            'feather': lambda frames: self.export_to_feather(data, f"{base_filename}.feather", frames=frames),
+        }
+        unknown = [fmt for fmt in formats if fmt not in writers]
+        if unknown:
+            raise ValueError(f"Formats non supportés: {', '.join(unknown)}")
         
-        try:
-            # Export JSON
-            results['json'] = self.export_to_json(data, f"{base_filename}.json")
-        except Exception as e:
-            logger.error(f"Erreur export JSON: {e}")
-            results['json'] = None
+        self.last_timings = {}
+        frames = None
+        if data and any(fmt != 'json' for fmt in formats):
+            start = time.perf_counter()
+            frames = self.build_frames(data)
+            self.last_timings['frames'] = time.perf_counter() - start
         
-        try:
-            # Export CSV
-            results['csv'] = self.export_to_csv(data, f"{base_filename}.csv")
-        except Exception as e:
-            logger.error(f"Erreur export CSV: {e}")
-            results['csv'] = None
+        def run(fmt: str):
+            start = time.perf_counter()
+            path = writers[fmt](frames)
+            return path, time.perf_counter() - start
         
-        try:
-            # Export Excel
-            results['excel'] = self.export_to_excel(data, f"{base_filename}.xlsx")
-        except Exception as e:
-            logger.error(f"Erreur export Excel: {e}")
-            results['excel'] = None
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(formats)))) as pool:
+            futures = {fmt: pool.submit(run, fmt) for fmt in formats}
+            for fmt, future in futures.items():
+                try:
+                    results[fmt], self.last_timings[fmt] = future.result()
+                except Exception as e:
+                    logger.error(f"Erreur export {fmt.upper()}: {e}")
+                    results[fmt] = None
         
+        logger.info("Durées d'export : " + ", ".join(
+            f"{name} {seconds:.2f}s" for name, seconds in self.last_timings.items()
+        ))
         return results
+
+if __name__ == "__main__":
+    # Benchmark : aplatissement et exports CSV / Excel d'annonces synthétiques
+    import random
+    import tempfile
+
+    cities = ["Paris", "Lyon", "Marseille", "Toulouse", "Nice", "Nantes", "Lille", "Rennes"]
+    brands = ["Renault", "Peugeot", "Citroën", "Land Rover", "Volkswagen", "Toyota"]
+
+    def make_ad(rng: random.Random, i: int) -> Dict[str, Any]:
+        return {
+            "list_id": i,
+            "subject": f"Annonce {i}",
+            "url": f"https://www.leboncoin.fr/ad/voitures/{i}",
+            "category_name": "Voitures",
+            "price": [rng.randint(500, 40_000)],
+            "images": {"thumb_url": f"https://img/{i}.jpg", "nb_images": rng.randint(0, 10)},
+            "attributes": [
+                {"key": "brand", "value": rng.choice(brands)},
+                {"key": "model", "value": "Modèle"},
+                {"key": "regdate", "value": str(rng.randint(1995, 2024))},
+                {"key": "mileage", "value": str(rng.randint(0, 250_000))},
+                {"key": "fuel", "value": "1", "value_label": "Essence"},
+            ],
+            "location": {"city": rng.choice(cities), "zipcode": "75001"},
+        }
+
+    def timed(func):
+        start = time.perf_counter()
+        result = func()
+        return result, (time.perf_counter() - start) * 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        exporter = DataExporter(tmp)
+        for size in (10_000, 100_000):
+            rng = random.Random(size)
+            data = [make_ad(rng, i) for i in range(size)]
+            df, frame_ms = timed(lambda: pd.DataFrame(data))
+            flat, flatten_ms = timed(lambda: exporter._flatten_dataframe(df))
+            _, csv_ms = timed(lambda: exporter.export_to_csv(data, "bench.csv"))
+            _, excel_ms = timed(lambda: exporter.export_to_excel(data, "bench.xlsx"))
+            print(f"{size:>7} annonces | DataFrame {frame_ms:8.1f} ms | aplatissement {flatten_ms:8.1f} ms "
+                  f"({len(flat.columns)} colonnes) | CSV {csv_ms:9.1f} ms | Excel {excel_ms:9.1f} ms")
@@ -0,0 +1,106 @@
+"""
+Modèle typé d'une annonce.
+
+Les champs utilisés par les filtres et statistiques sont extraits une seule
+fois, à l'ingestion, depuis le JSON brut de l'annonce : les analyses lisent
+ensuite des attributs en O(1) au lieu de reparcourir le dictionnaire.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from scrap.jobs.statistic import find_element_value, get_attribute_value
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """Convertit une valeur (nombre, liste, chaîne "12 000,5") en float, ou None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, list):
+        return parse_number(value[0]) if value else None
+    if isinstance(value, str):
+        try:
+            return float(value.replace(" ", "").replace(",", "."))
+        except ValueError:
+            return None
+    return None
+
+
+def _clean_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return _clean_text(value[0]) if value else None
+    text = str(value).strip()
+    return text or None
+
+
+@dataclass(slots=True)
+class Ad:
+    """Annonce avec ses champs principaux pré-extraits"""
+    list_id: Optional[int] = None
+    subject: Optional[str] = None
+    url: Optional[str] = None
+    category: Optional[str] = None
+    price: Optional[float] = None
+    city: Optional[str] = None
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    mileage: Optional[float] = None
+    fuel: Optional[str] = None
+    year: Optional[float] = None
+    date: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "Ad":
+        """Construit l'annonce depuis son JSON brut (tel que renvoyé par le parser)"""
+        attributes: Dict[str, Any] = {}
+        labels: Dict[str, Any] = {}
+        raw_attributes = raw.get("attributes")
+        if isinstance(raw_attributes, list):
+            for attr in raw_attributes:
+                if isinstance(attr, dict) and "key" in attr:
+                    # Comme get_attribute_value, la première occurrence l'emporte
+                    attributes.setdefault(attr["key"], attr.get("value"))
+                    labels.setdefault(attr["key"], attr.get("value_label"))
+
+        def element(name: str) -> Any:
+            # La valeur de premier niveau est celle que find_element_value renvoie en premier
+            if name in raw:
+                return raw[name]
+            values = find_element_value(raw, name)
+            return values[0] if values else None
+
+        def attribute(name: str) -> Any:
+            if name in attributes or isinstance(raw_attributes, list):
+                return attributes.get(name)
+            values = get_attribute_value(raw, name)
+            return values[0] if values else None
+
+        location = raw.get("location")
+        city = location.get("city") if isinstance(location, dict) else None
+
+        return cls(
+            list_id=raw.get("list_id"),
+            subject=raw.get("subject"),
+            url=raw.get("url"),
+            category=_clean_text(raw.get("category_name")),
+            price=parse_number(element("price")),
+            city=_clean_text(city if city is not None else element("city")),
+            brand=_clean_text(attribute("brand")),
+            model=_clean_text(attribute("model")),
+            mileage=parse_number(attribute("mileage")),
+            fuel=_clean_text(labels.get("fuel") or attribute("fuel")),
+            year=parse_number(attribute("regdate")),
+            date=raw.get("first_publication_date"),
+            attributes=attributes,
+        )
+
+
+def as_ads(items: Iterable[Any]) -> List[Ad]:
+    """Convertit une liste d'annonces brutes (ou déjà typées) en liste d'Ad"""
+    return [item if isinstance(item, Ad) else Ad.from_raw(item)
+            for item in items if isinstance(item, (Ad, dict))]
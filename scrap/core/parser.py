@@ -0,0 +1,176 @@
+"""
+Extraction du tableau "ads" embarqué dans les pages de résultats.
+
+La page contient le payload Next.js (`<script id="__NEXT_DATA__">`) : on le
+décode en une seule passe avec json.JSONDecoder.raw_decode, directement depuis
+sa position dans le HTML, sans découper la chaîne ni compter les crochets.
+"""
+
+import json
+import logging
+import os
+import re
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+NEXT_DATA_PATTERN = re.compile(r'<script[^>]*\bid=["\']__NEXT_DATA__["\'][^>]*>')
+ADS_KEY_PATTERN = re.compile(r'"ads"\s*:\s*\[')
+DESCRIPTION_PATTERN = re.compile(r'"description"\s*:\s*("(?:[^"\\]|\\.)*")', re.DOTALL)
+WHITESPACE_PATTERN = re.compile(r'\s*')
+
+_decoder = json.JSONDecoder()
+
+
+def extract_next_data(html: str) -> Optional[Any]:
+    """Décode le payload __NEXT_DATA__ de la page, ou None s'il est absent ou invalide"""
+    match = NEXT_DATA_PATTERN.search(html)
+    if not match:
+        return None
+    start = WHITESPACE_PATTERN.match(html, match.end()).end()
+    try:
+        data, _ = _decoder.raw_decode(html, start)
+    except json.JSONDecodeError as e:
+        logger.warning(f"Payload __NEXT_DATA__ invalide : {e}")
+        return None
+    return data
+
+
+def find_ads(data: Any) -> Optional[List[Dict[str, Any]]]:
+    """Parcours en largeur : retourne la liste "ads" la moins profonde du JSON"""
+    queue = deque([data])
+    while queue:
+        node = queue.popleft()
+        if isinstance(node, dict):
+            ads = node.get("ads")
+            if isinstance(ads, list):
+                return ads
+            queue.extend(v for v in node.values() if isinstance(v, (dict, list)))
+        elif isinstance(node, list):
+            queue.extend(v for v in node if isinstance(v, (dict, list)))
+    return None
+
+
+def extract_ads(html: str) -> List[Dict[str, Any]]:
+    """
+    Retourne les annonces de la page (liste vide si aucun tableau "ads").
+    Lève json.JSONDecodeError si le tableau trouvé est mal formé.
+    """
+    data = extract_next_data(html)
+    if data is not None:
+        ads = find_ads(data)
+        if ads is not None:
+            return ads
+
+    # Repli : page sans __NEXT_DATA__, on décode le tableau à partir de la clé "ads"
+    match = ADS_KEY_PATTERN.search(html)
+    if not match:
+        return []
+    ads, _ = _decoder.raw_decode(html, match.end() - 1)
+    return ads
+
+
+def extract_description(html: str) -> Optional[str]:
+    """
+    Description d'une page d'annonce : champ "body" de l'annonce du payload
+    __NEXT_DATA__, sinon premier champ "description" (JSON-LD). Les chaînes
+    sont décodées comme du JSON, accents et échappements compris.
+    """
+    data = extract_next_data(html)
+    if data is not None:
+        queue = deque([data])
+        while queue:
+            node = queue.popleft()
+            if isinstance(node, dict):
+                ad = node.get("ad")
+                if isinstance(ad, dict) and isinstance(ad.get("body"), str):
+                    return ad["body"]
+                queue.extend(v for v in node.values() if isinstance(v, (dict, list)))
+            elif isinstance(node, list):
+                queue.extend(v for v in node if isinstance(v, (dict, list)))
+
+    match = DESCRIPTION_PATTERN.search(html)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except json.JSONDecodeError:
+        return None
+
+
+def save_ads(html: str, output_path: str) -> int:
+    """
+    Extrait les annonces de la page et les sauvegarde en JSON.
+    Retourne le nombre d'annonces sauvegardées (0 en cas d'échec).
+    """
+    try:
+        ads = extract_ads(html)
+    except json.JSONDecodeError as e:
+        logger.error(f"Tableau 'ads' mal formé : {e}")
+        return 0
+
+    if not ads:
+        logger.warning("Clé 'ads' non trouvée.")
+        return 0
+
+    return write_ads(ads, output_path)
+
+
+def write_ads(ads: List[Dict[str, Any]], output_path: str) -> int:
+    """Sauvegarde des annonces déjà extraites en JSON ; retourne leur nombre"""
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(ads, f, indent=2, ensure_ascii=False)
+
+    logger.info(f"{len(ads)} annonces sauvegardées dans {output_path}")
+    return len(ads)
+
+
+if __name__ == "__main__":
+    # Benchmark contre l'ancienne extraction (boucle caractère par caractère)
+    import tempfile
+    import time
+    from scrap.tests.test_http_client import extraire_ads_et_sauvegarder
+
+    def build_page(nb_ads: int) -> str:
+        ads = [{
+            "list_id": i,
+            "subject": f"Annonce {i}",
+            "body": "Très bon état, révision faite. " * 60,
+            "price": [10000 + i],
+            "location": {"city": "Paris", "zipcode": "75001"},
+            "attributes": [{"key": "brand", "value": "Renault"}, {"key": "mileage", "value": str(i * 100)}],
+        } for i in range(nb_ads)]
+        payload = {"props": {"pageProps": {"searchData": {"total": nb_ads, "ads": ads}}}}
+        padding = "<div class='x'>" + "contenu " * 50_000 + "</div>"
+        return (f"<html><head></head><body>{padding}"
+                f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(payload)}</script>'
+                f"</body></html>")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "ads.json")
+        for nb_ads in (35, 500, 2000):
+            html = build_page(nb_ads)
+            size_mb = len(html) / 1_000_000
+
+            start = time.perf_counter()
+            legacy_count = extraire_ads_et_sauvegarder(html, output)
+            legacy = time.perf_counter() - start
+
+            start = time.perf_counter()
+            count = save_ads(html, output)
+            new = time.perf_counter() - start
+
+            start = time.perf_counter()
+            extract_ads(html)
+            extract_only = time.perf_counter() - start
+
+            print(f"{size_mb:6.1f} Mo, {nb_ads} annonces : ancien {legacy * 1000:8.1f} ms ({legacy_count}) | "
+                  f"nouveau {new * 1000:8.1f} ms ({count}) | extraction seule {extract_only * 1000:6.1f} ms")
+
+        # Crochets dans les chaînes JSON : l'ancienne version se trompe, pas la nouvelle
+        tricky = '<script id="__NEXT_DATA__" type="application/json">{"ads": [{"subject": "Clio [bon état"}]}</script>'
+        print("ancien :", extraire_ads_et_sauvegarder(tricky, output), "| nouveau :", len(extract_ads(tricky)))
@@ -0,0 +1,353 @@
+"""
+Stockage persistant des annonces dans SQLite (mode WAL).
+
+Chaque annonce est une ligne de la table `ads`, indexée par list_id, avec les
+champs de l'Ad en colonnes indexables et le JSON brut conservé à côté. Les
+recherches sont enregistrées dans `searches` et reliées à leurs annonces via
+`search_ads`, ce qui permet à plusieurs recherches de coexister.
+
+Une empreinte du contenu (prix + titre) est stockée avec chaque annonce : le
+scraping incrémental s'en sert pour ne réécrire que les annonces nouvelles ou
+modifiées.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from scrap.core.models import Ad
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.path.join("scrap", "data", "ads.db")
+# Annonces lues par aller-retour dans iter_raw
+ITER_PAGE_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ads (
+    list_id INTEGER PRIMARY KEY,
+    subject TEXT,
+    url TEXT,
+    category TEXT,
+    price REAL,
+    city TEXT,
+    brand TEXT,
+    model TEXT,
+    mileage REAL,
+    fuel TEXT,
+    year REAL,
+    date TEXT,
+    content_hash TEXT,
+    raw TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ads_price ON ads(price);
+CREATE INDEX IF NOT EXISTS idx_ads_city ON ads(city);
+CREATE INDEX IF NOT EXISTS idx_ads_brand ON ads(brand);
+CREATE INDEX IF NOT EXISTS idx_ads_date ON ads(date);
+
+CREATE TABLE IF NOT EXISTS searches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    last_run TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS search_ads (
+    search_id INTEGER NOT NULL REFERENCES searches(id) ON DELETE CASCADE,
+    list_id INTEGER NOT NULL REFERENCES ads(list_id) ON DELETE CASCADE,
+    PRIMARY KEY (search_id, list_id)
+);
+CREATE INDEX IF NOT EXISTS idx_search_ads_list ON search_ads(list_id);
+
+CREATE TABLE IF NOT EXISTS descriptions (
+    list_id INTEGER PRIMARY KEY,
+    description TEXT,
+    fetched_at TEXT NOT NULL
+);
+"""
+
+AD_COLUMNS = ("list_id", "subject", "url", "category", "price", "city", "brand",
+              "model", "mileage", "fuel", "year", "date")
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def content_hash(ad: Ad) -> str:
+    """Empreinte des champs suivis pour détecter une modification (prix et titre)"""
+    payload = json.dumps([ad.price, ad.subject], ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class AdStorage:
+    """Accès à la base SQLite des annonces (une connexion partagée, écritures sérialisées)"""
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Ajoute les colonnes apparues après la création d'une base existante"""
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(ads)")}
+        if "content_hash" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE ads ADD COLUMN content_hash TEXT")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # --- Écriture ---
+
+    def register_search(self, url: str) -> int:
+        """Enregistre (ou retrouve) la recherche pour cette URL et retourne son id"""
+        now = _now()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO searches (url, created_at, last_run) VALUES (?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET last_run = excluded.last_run",
+                (url, now, now)
+            )
+            row = self.conn.execute("SELECT id FROM searches WHERE url = ?", (url,)).fetchone()
+        return row["id"]
+
+    def save_ads(self, raw_ads: Sequence[Dict[str, Any]], search_id: Optional[int] = None) -> int:
+        """
+        Insère ou met à jour les annonces (clé list_id) et les rattache à la
+        recherche. Retourne le nombre d'annonces enregistrées.
+        """
+        now = _now()
+        rows = []
+        for raw in raw_ads:
+            if not isinstance(raw, dict) or raw.get("list_id") is None:
+                continue
+            ad = Ad.from_raw(raw)
+            rows.append(tuple(getattr(ad, column) for column in AD_COLUMNS)
+                        + (content_hash(ad), json.dumps(raw, ensure_ascii=False), now, now))
+        if not rows:
+            return 0
+
+        columns = AD_COLUMNS + ("content_hash", "raw", "first_seen", "last_seen")
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column not in ("list_id", "first_seen"))
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT INTO ads ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT(list_id) DO UPDATE SET {updates}",
+                rows
+            )
+            if search_id is not None:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO search_ads (search_id, list_id) VALUES (?, ?)",
+                    [(search_id, row[0]) for row in rows]
+                )
+        return len(rows)
+
+    def touch(self, list_ids: Sequence[int], search_id: Optional[int] = None):
+        """Marque des annonces déjà connues et inchangées comme revues (sans réécrire leur JSON)"""
+        if not list_ids:
+            return
+        now = _now()
+        with self._lock, self.conn:
+            self.conn.executemany("UPDATE ads SET last_seen = ? WHERE list_id = ?",
+                                  [(now, list_id) for list_id in list_ids])
+            if search_id is not None:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO search_ads (search_id, list_id) VALUES (?, ?)",
+                    [(search_id, list_id) for list_id in list_ids]
+                )
+
+    def save_description(self, list_id: int, description: Optional[str]):
+        """Enregistre la description d'une annonce (None : page récupérée mais sans description)"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO descriptions (list_id, description, fetched_at) VALUES (?, ?, ?)",
+                (list_id, description, _now())
+            )
+
+    # --- Lecture ---
+
+    def descriptions(self, list_ids: Sequence[int]) -> Dict[int, Optional[str]]:
+        """Descriptions déjà récupérées parmi list_ids (par paquets, limite de variables SQLite)"""
+        result: Dict[int, Optional[str]] = {}
+        list_ids = list(list_ids)
+        with self._lock:
+            for start in range(0, len(list_ids), 500):
+                chunk = list_ids[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT list_id, description FROM descriptions WHERE list_id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                result.update((row[0], row[1]) for row in rows)
+        return result
+
+    def search_ad_ids(self, url: str, list_ids: Sequence[int]) -> Set[int]:
+        """Annonces parmi list_ids rattachées à la recherche de cette URL (vide si elle est inconnue)"""
+        result: Set[int] = set()
+        list_ids = list(list_ids)
+        with self._lock:
+            row = self.conn.execute("SELECT id FROM searches WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return result
+            for start in range(0, len(list_ids), 500):
+                chunk = list_ids[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT list_id FROM search_ads WHERE search_id = ? AND list_id IN ({', '.join('?' * len(chunk))})",
+                    [row[0], *chunk]
+                ).fetchall()
+                result.update(r[0] for r in rows)
+        return result
+
+    def known_hashes(self, list_ids: Sequence[int]) -> Dict[int, Optional[str]]:
+        """Empreinte enregistrée de chaque annonce déjà connue parmi list_ids"""
+        if not list_ids:
+            return {}
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT list_id, content_hash FROM ads WHERE list_id IN ({', '.join('?' * len(list_ids))})",
+                list(list_ids)
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def diff_ads(self, raw_ads: Sequence[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[int]]:
+        """
+        Sépare les annonces d'une page en (nouvelles, modifiées, list_id des
+        inchangées) d'après les empreintes enregistrées.
+        """
+        candidates = [raw for raw in raw_ads if isinstance(raw, dict) and raw.get("list_id") is not None]
+        known = self.known_hashes([raw["list_id"] for raw in candidates])
+        new, changed, unchanged = [], [], []
+        for raw in candidates:
+            list_id = raw["list_id"]
+            if list_id not in known:
+                new.append(raw)
+            elif known[list_id] != content_hash(Ad.from_raw(raw)):
+                changed.append(raw)
+            else:
+                unchanged.append(list_id)
+        return new, changed, unchanged
+
+    def _distinct_matching(self, column: str, predicate) -> List[str]:
+        """Valeurs distinctes de la colonne (lues sur son index) qui vérifient le prédicat"""
+        rows = self.conn.execute(f"SELECT DISTINCT {column} FROM ads WHERE {column} IS NOT NULL").fetchall()
+        return [row[0] for row in rows if predicate(row[0])]
+
+    def _where(self, min_price: Optional[float] = None, max_price: Optional[float] = None,
+               city: Optional[str] = None, brand: Optional[str] = None,
+               search_id: Optional[int] = None) -> Tuple[str, List[Any]]:
+        """
+        Clause WHERE des filtres, avec les mêmes règles que /filter. Les
+        correspondances partielles de ville et de marque sont résolues sur les
+        valeurs distinctes puis passées en IN (...) pour utiliser les index.
+        """
+        clauses, params = [], []
+        if min_price is not None:
+            clauses.append("price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append("price <= ?")
+            params.append(max_price)
+        if city:
+            city_lower = city.lower()
+            cities = self._distinct_matching("city", lambda value: city_lower in value.lower())
+            clauses.append(f"city IN ({', '.join('?' * len(cities))})")
+            params.extend(cities)
+        if brand:
+            brand_lower = brand.lower()
+            brands = self._distinct_matching(
+                "brand", lambda value: brand_lower in value.lower() or value.lower() in brand_lower
+            )
+            clauses.append(f"brand IN ({', '.join('?' * len(brands))})")
+            params.extend(brands)
+        if search_id is not None:
+            clauses.append("list_id IN (SELECT list_id FROM search_ads WHERE search_id = ?)")
+            params.append(search_id)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count(self, **filters) -> int:
+        with self._lock:
+            where, params = self._where(**filters)
+            return self.conn.execute(f"SELECT COUNT(*) FROM ads{where}", params).fetchone()[0]
+
+    def price_stats(self, **filters) -> Dict[str, float]:
+        """Statistiques de prix calculées par SQLite (count, min, max, mean)"""
+        with self._lock:
+            where, params = self._where(**filters)
+            where += (" AND" if where else " WHERE") + " price IS NOT NULL"
+            row = self.conn.execute(
+                f"SELECT COUNT(price), MIN(price), MAX(price), AVG(price) FROM ads{where}", params
+            ).fetchone()
+        return {"count": row[0], "min": row[1] or 0, "max": row[2] or 0, "mean": row[3] or 0}
+
+    def query(self, limit: Optional[int] = None, order_by: str = "price", **filters) -> List[Ad]:
+        """Annonces filtrées, construites depuis les colonnes (sans relire le JSON brut)"""
+        if order_by not in AD_COLUMNS:
+            raise ValueError(f"Colonne de tri inconnue : {order_by}")
+        with self._lock:
+            where, params = self._where(**filters)
+            sql = f"SELECT {', '.join(AD_COLUMNS)} FROM ads{where} ORDER BY {order_by}"
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(limit)
+            rows = self.conn.execute(sql, params).fetchall()
+        return [Ad(**dict(row)) for row in rows]
+
+    def iter_raw(self, **filters) -> Iterator[Dict[str, Any]]:
+        """Itère sur le JSON brut des annonces sans tout charger en mémoire"""
+        with self._lock:
+            where, params = self._where(**filters)
+        where += (" AND" if where else " WHERE") + " list_id > ?"
+        last_id = -1
+        while True:
+            # Une page par passage sous le verrou : le curseur de la connexion
+            # partagée n'est jamais laissé ouvert pendant que l'appelant consomme
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT list_id, raw FROM ads{where} ORDER BY list_id LIMIT ?",
+                    params + [last_id, ITER_PAGE_SIZE]
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield json.loads(row[1])
+            last_id = rows[-1][0]
+
+    def searches(self) -> List[Dict[str, Any]]:
+        """Recherches enregistrées avec leur nombre d'annonces"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT s.id, s.url, s.created_at, s.last_run, COUNT(sa.list_id) AS ads "
+                "FROM searches s LEFT JOIN search_ads sa ON sa.search_id = s.id "
+                "GROUP BY s.id ORDER BY s.last_run DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+_storage: Optional[AdStorage] = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> AdStorage:
+    """Instance partagée, ouverte au premier appel"""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = AdStorage()
+        return _storage
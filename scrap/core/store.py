@@ -0,0 +1,156 @@
+"""
+Stockage en colonnes des annonces en mémoire.
+
+Les champs numériques (prix, kilométrage, année) sont des tableaux NumPy de
+float (NaN si absent) et les champs texte (ville, marque, carburant,
+catégorie) sont encodés en codes entiers vers un vocabulaire. Les filtres
+deviennent des masques booléens et les statistiques des réductions de
+tableaux, sans reparcourir les annonces.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scrap.core.models import Ad
+
+NUMERIC_COLUMNS = ("price", "mileage", "year")
+CATEGORICAL_COLUMNS = ("city", "brand", "fuel", "category")
+MISSING_CODE = -1
+
+
+def _encode(values: Iterable[Optional[str]]) -> Tuple[np.ndarray, List[str]]:
+    """Encode une colonne texte en (codes int32, vocabulaire) ; None -> MISSING_CODE"""
+    vocabulary: List[str] = []
+    index: Dict[str, int] = {}
+    codes = []
+    for value in values:
+        if value is None:
+            codes.append(MISSING_CODE)
+            continue
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(vocabulary)
+            vocabulary.append(value)
+        codes.append(code)
+    return np.array(codes, dtype=np.int32), vocabulary
+
+
+def _numeric_column(ads: Sequence[Ad], column: str) -> np.ndarray:
+    """Colonne numérique en float64, NaN pour les valeurs absentes"""
+    values = (getattr(ad, column) for ad in ads)
+    return np.fromiter((np.nan if value is None else value for value in values),
+                       dtype=np.float64, count=len(ads))
+
+
+class AdStore:
+    """Annonces stockées colonne par colonne"""
+
+    def __init__(self, ads: Sequence[Ad]):
+        self.ads = list(ads)
+        self.numeric: Dict[str, np.ndarray] = {
+            column: _numeric_column(self.ads, column) for column in NUMERIC_COLUMNS
+        }
+        self.codes: Dict[str, np.ndarray] = {}
+        self.vocabularies: Dict[str, List[str]] = {}
+        for column in CATEGORICAL_COLUMNS:
+            codes, vocabulary = _encode(getattr(ad, column) for ad in self.ads)
+            self.codes[column] = codes
+            self.vocabularies[column] = vocabulary
+
+    def __len__(self) -> int:
+        return len(self.ads)
+
+    @property
+    def price(self) -> np.ndarray:
+        return self.numeric["price"]
+
+    def _matching_codes(self, column: str, predicate) -> np.ndarray:
+        """Codes du vocabulaire de la colonne dont la valeur vérifie le prédicat"""
+        return np.array([code for code, value in enumerate(self.vocabularies[column]) if predicate(value)],
+                        dtype=np.int32)
+
+    def mask(self, min_price: Optional[float] = None, max_price: Optional[float] = None,
+             city: Optional[str] = None, brand: Optional[str] = None) -> np.ndarray:
+        """
+        Masque booléen des annonces correspondant aux critères (mêmes règles que
+        filter_by_price, filter_by_location et le filtre de marque de /filter)
+        """
+        mask = np.ones(len(self), dtype=bool)
+
+        if min_price is not None or max_price is not None:
+            price = self.price
+            mask &= ~np.isnan(price)
+            if min_price is not None:
+                mask &= price >= min_price
+            if max_price is not None:
+                mask &= price <= max_price
+
+        if city:
+            city_lower = city.lower()
+            codes = self._matching_codes("city", lambda value: city_lower in value.lower())
+            mask &= np.isin(self.codes["city"], codes)
+
+        if brand:
+            brand_lower = brand.lower()
+            codes = self._matching_codes(
+                "brand", lambda value: brand_lower in value.lower() or value.lower() in brand_lower
+            )
+            mask &= np.isin(self.codes["brand"], codes)
+
+        return mask
+
+    def select(self, mask: np.ndarray) -> List[Ad]:
+        """Annonces sélectionnées par un masque"""
+        return [self.ads[i] for i in np.flatnonzero(mask)]
+
+    def valid_prices(self) -> np.ndarray:
+        price = self.price
+        return price[~np.isnan(price)]
+
+    def counts(self, column: str) -> Dict[str, int]:
+        """Nombre d'annonces par valeur d'une colonne texte, par ordre décroissant"""
+        codes = self.codes[column]
+        vocabulary = self.vocabularies[column]
+        counts = np.bincount(codes[codes != MISSING_CODE], minlength=len(vocabulary))
+        # Tri stable : à égalité, l'ordre d'apparition est conservé
+        order = np.argsort(-counts, kind="stable")
+        return {vocabulary[code]: int(counts[code]) for code in order if counts[code] > 0}
+
+
+if __name__ == "__main__":
+    # Benchmark : filtres et statistiques en listes Python vs en colonnes
+    import random
+    import time
+    from scrap.analysis.filters import filter_by_location, filter_by_price
+    from scrap.analysis.statistics import get_brand_statistics, get_price_statistics, summarize_prices
+
+    cities = ["Paris", "Lyon", "Marseille", "Toulouse", "Nice", "Nantes", "Lille", "Rennes"]
+    brands = ["Renault", "Peugeot", "Citroën", "Land Rover", "Volkswagen", "Toyota"]
+
+    def timed(func):
+        start = time.perf_counter()
+        result = func()
+        return result, (time.perf_counter() - start) * 1000
+
+    for size in (10_000, 100_000, 1_000_000):
+        rng = random.Random(size)
+        ads = [Ad(price=float(rng.randint(500, 40_000)), city=rng.choice(cities), brand=rng.choice(brands),
+                  mileage=float(rng.randint(0, 250_000)), year=float(rng.randint(1995, 2024)))
+               for _ in range(size)]
+
+        store, build_ms = timed(lambda: AdStore(ads))
+
+        def list_filter():
+            return filter_by_location(filter_by_price(ads, 5000, 15000), ["paris"])
+
+        listed, list_filter_ms = timed(list_filter)
+        masked, store_filter_ms = timed(lambda: store.select(store.mask(5000, 15000, city="paris")))
+        assert len(listed) == len(masked)
+
+        _, list_stats_ms = timed(lambda: (get_price_statistics(ads), get_brand_statistics(ads)))
+        _, store_stats_ms = timed(lambda: (summarize_prices(store.valid_prices()), store.counts("brand")))
+
+        print(f"{size:>9} annonces | construction {build_ms:8.1f} ms | "
+              f"/filter {list_filter_ms:8.1f} -> {store_filter_ms:6.1f} ms | "
+              f"/stats {list_stats_ms:8.1f} -> {store_stats_ms:6.1f} ms")
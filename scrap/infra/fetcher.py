@@ -0,0 +1,214 @@
+# scrap/infra/fetcher.py
+
+import asyncio
+import logging
+import random
+import time
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from curl_cffi import requests
+
+from scrap.infra.http_client import async_session_pool, cookie_store, response_spool
+from scrap.infra.proxy_pool import ProxyPool
+from scrap.infra.response_cache import ResponseCache
+from scrap.infra.retry import (OK, PROXY_FAULTS, RATE_LIMITED, RateLimiter, RequestFailed, RetryPolicy,
+                               classify_error, classify_response, parse_retry_after, rate_limiter)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MIN_DELAY = 5
+DEFAULT_MAX_DELAY = 10
+
+
+class HostBudget:
+    """
+    Budget de politesse par hôte : deux requêtes vers le même hôte via la même
+    identité (proxy ou connexion directe) sont espacées d'un délai aléatoire
+    entre min_delay et max_delay. Chaque proxy a son propre budget, le débit
+    total augmente donc avec le nombre de proxies disponibles.
+    """
+
+    def __init__(self, min_delay: float = DEFAULT_MIN_DELAY, max_delay: float = DEFAULT_MAX_DELAY):
+        if min_delay > max_delay or min_delay < 0:
+            raise ValueError("min and max must be positive")
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._next_slot: Dict[Tuple[str, Optional[str]], float] = {}
+        self._lock = asyncio.Lock()
+
+    async def wait_turn(self, host: str, identities: Sequence[Optional[str]]) -> Optional[str]:
+        """
+        Réserve le prochain créneau libre pour cet hôte parmi les identités
+        données, attend ce créneau et retourne l'identité choisie.
+        """
+        async with self._lock:
+            now = time.monotonic()
+            # Identité dont le créneau se libère le plus tôt
+            identity = min(identities, key=lambda i: self._next_slot.get((host, i), now))
+            slot = max(now, self._next_slot.get((host, identity), now))
+            self._next_slot[(host, identity)] = slot + random.uniform(self.min_delay, self.max_delay)
+
+        wait = slot - now
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return identity
+
+
+class AsyncFetcher:
+    """
+    Moteur de téléchargement asynchrone basé sur l'AsyncSession de curl_cffi.
+    Le nombre de requêtes simultanées est borné par `concurrency` et chaque
+    hôte est ménagé via un HostBudget par proxy. Avec un ProxyPool, chaque
+    requête choisit parmi les meilleurs proxies disponibles et le résultat
+    (latence ou échec) est remonté au pool. Les erreurs temporaires sont
+    retentées selon la RetryPolicy, sous le débit par domaine du RateLimiter.
+    """
+
+    def __init__(self, proxies: Optional[List[str]] = None,
+                 concurrency: int = DEFAULT_CONCURRENCY,
+                 min_delay: float = DEFAULT_MIN_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY,
+                 timeout: int = 15,
+                 pool: Optional[ProxyPool] = None,
+                 policy: Optional[RetryPolicy] = None,
+                 limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = None):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.proxies = list(proxies or [])
+        self.pool = pool
+        self.policy = policy or RetryPolicy()
+        self.limiter = limiter or rate_limiter
+        # Cache disque optionnel : une réponse fraîche évite la requête
+        self.cache = cache
+        # Nombre de tentatives par catégorie de résultat
+        self.errors: Counter = Counter()
+        # Échec définitif de chaque URL restée inaccessible (pour fetch_all)
+        self.failures: Dict[str, RequestFailed] = {}
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.budget = HostBudget(min_delay, max_delay)
+        self.logger = logging.getLogger("AsyncFetcher")
+        self._semaphore = asyncio.Semaphore(concurrency)
+        # Vrai tant que le pool n'a aucun proxy disponible (connexion directe)
+        self._direct_fallback = False
+        self.session = None
+
+    async def __aenter__(self):
+        # Session partagée et longue durée : pas de nouvelle poignée TLS à chaque job
+        self.session = async_session_pool.session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.session = None
+        if self.pool is not None:
+            self.pool.save_scores()
+
+    def _identities(self, exclude: Sequence[Optional[str]] = ()) -> List[Optional[str]]:
+        """
+        Proxies candidats pour la prochaine requête (None = connexion directe),
+        hors ceux déjà en échec pour cette URL quand il en reste d'autres.
+        """
+        if self.pool is not None:
+            candidates = self.pool.candidates()
+            if not candidates and not self._direct_fallback:
+                # Pool vide ou tous les proxies en pause : un avertissement par épisode
+                self.logger.warning("Aucun proxy disponible dans le pool : requêtes en connexion directe")
+            elif candidates and self._direct_fallback:
+                self.logger.info("Proxies de nouveau disponibles : fin de la connexion directe")
+            self._direct_fallback = not candidates
+        else:
+            candidates = self.proxies
+        fresh = [proxy for proxy in candidates if proxy not in exclude]
+        return fresh or candidates or [None]
+
+    async def _attempt(self, url: str, host: str, proxy_exclude: Sequence[Optional[str]], params, headers):
+        """Une tentative : retourne (proxy, catégorie, statut, texte, Retry-After)"""
+        async with self._semaphore:
+            await self.limiter.acquire_async(host)
+            proxy = await self.budget.wait_turn(host, self._identities(proxy_exclude))
+            start = time.monotonic()
+            try:
+                response = await self.session.get(url, params=params, headers=headers, proxy=proxy,
+                                                  timeout=self.timeout)
+            except requests.RequestsError as e:
+                self.logger.warning(f"Erreur GET {url} (proxy={proxy}) : {e}")
+                kind = classify_error(e)
+                # Timeout ou connexion refusée : le cas le plus fréquent de proxy mort
+                if self.pool is not None and kind in PROXY_FAULTS:
+                    self.pool.report_failure(proxy)
+                return proxy, kind, None, None, None
+            latency = time.monotonic() - start
+            kind = classify_response(response.status_code, response.text)
+            if self.pool is not None:
+                if kind in PROXY_FAULTS:
+                    self.pool.report_failure(proxy)
+                else:
+                    self.pool.report_success(proxy, latency)
+            return (proxy, kind, response.status_code, response.text,
+                    parse_retry_after(response.headers.get("Retry-After")))
+
+    async def get(self, url: str, params=None, headers=None) -> Optional[str]:
+        """Comme fetch, mais retourne None si la page reste inaccessible"""
+        try:
+            return await self.fetch(url, params, headers)
+        except RequestFailed as e:
+            self.failures[url] = e
+            return None
+
+    async def fetch(self, url: str, params=None, headers=None) -> str:
+        """
+        Télécharge une page en respectant la concurrence, le débit du domaine
+        et le budget de l'hôte. Les erreurs temporaires sont retentées avec
+        backoff, via un autre proxy ; lève RequestFailed (avec la catégorie
+        de la dernière erreur) si la page reste inaccessible.
+        """
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.lookup, url, params)
+            if cached is not None and cached.fresh:
+                return cached.text
+
+        host = urlsplit(url).netloc
+        tried: List[Optional[str]] = []
+        for attempt in range(1, self.policy.max_attempts + 1):
+            proxy, kind, status, text, retry_after = await self._attempt(url, host, tried, params, headers)
+            self.errors[kind] += 1
+            if kind == OK:
+                cookie_store.update(self.session.cookies.jar)
+                if response_spool.enabled:
+                    await asyncio.to_thread(response_spool.capture, url, text)
+                if self.cache is not None:
+                    await asyncio.to_thread(self.cache.store, url, text, None, None, params)
+                return text
+
+            tried.append(proxy)
+            if not self.policy.should_retry(kind, attempt):
+                self.logger.error(f"Échec GET {url} : {kind} (HTTP {status}) après {attempt} tentative(s)")
+                raise RequestFailed(url, kind, status, attempt)
+            if kind == RATE_LIMITED:
+                # Le domaine entier ralentit, pas seulement cette requête
+                self.limiter.pause(host, retry_after or self.policy.delay(attempt))
+            delay = self.policy.delay(attempt, retry_after)
+            self.logger.info(f"GET {url} : {kind} (HTTP {status}), tentative {attempt + 1} dans {delay:.1f}s")
+            # Attente hors sémaphore : les autres pages continuent pendant le backoff
+            await asyncio.sleep(delay)
+        # Inatteignable : should_retry est faux à la dernière tentative
+        raise RequestFailed(url, kind, status, self.policy.max_attempts)
+
+    async def fetch_all(self, urls: Sequence[str],
+                        on_result: Optional[Callable[[int, str, Optional[str]], Awaitable[None]]] = None
+                        ) -> List[Optional[str]]:
+        """
+        Télécharge toutes les URLs en parallèle. `on_result(index, url, html)`
+        est appelé dès qu'une page est terminée (html vaut None en cas d'échec,
+        la cause est alors dans `failures[url]`). Les résultats sont retournés
+        dans l'ordre des URLs.
+        """
+        async def run(index: int, url: str) -> Optional[str]:
+            html = await self.get(url)
+            if on_result is not None:
+                await on_result(index, url, html)
+            return html
+
+        return await asyncio.gather(*(run(i, url) for i, url in enumerate(urls)))
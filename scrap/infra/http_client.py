@@ -1,78 +1,389 @@
 from curl_cffi import requests
+import asyncio
 import random
 import logging
 import json
 import os
+import atexit
+import itertools
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from scrap.infra.response_cache import get_response_cache
+from scrap.infra.retry import (OK, PROXY_FAULTS, RATE_LIMITED, RequestFailed, RetryPolicy, classify_error,
+                               classify_response, parse_retry_after, rate_limiter)
 
 COOKIES_PATH = "scrap/data/cookies.json"
+IMPERSONATE = "chrome110"
+DEFAULT_TIMEOUT = 15
+# Nombre maximal de sessions gardées ouvertes (une par proxy/identité)
+MAX_SESSIONS = 16
+# Requêtes simultanées de la session asynchrone partagée
+ASYNC_MAX_CLIENTS = 16
+# Délai de regroupement des écritures de cookies (secondes)
+COOKIE_FLUSH_DELAY = 30
+# Capture des réponses brutes, désactivée par défaut (SCRAP_DEBUG_CAPTURE=1 pour l'activer)
+DEBUG_CAPTURE = os.environ.get("SCRAP_DEBUG_CAPTURE", "").lower() in ("1", "true", "yes")
+SPOOL_DIR = "scrap/data/debug"
+SPOOL_MAX_FILES = 50
+SPOOL_MAX_BYTES = 50 * 1024 * 1024
 
-class HttpClient:
-    def __init__(self, proxies=None, timeout=15):
-        self.session = requests.Session(
-            impersonate="chrome110",
-            timeout=timeout
-        )
+
+def read_cookies(logger=None):
+    """Lit les cookies sauvegardés (dictionnaire vide si absent ou illisible)"""
+    logger = logger or logging.getLogger("HttpClient")
+    if not os.path.exists(COOKIES_PATH):
+        return {}
+    try:
+        with open(COOKIES_PATH, "r", encoding="utf-8") as f:
+            cookies = json.load(f)
+        logger.info("Cookies chargés depuis le fichier.")
+        return cookies
+    except Exception as e:
+        logger.warning(f"Erreur chargement cookies: {e}")
+        return {}
+
+
+class CookieStore:
+    """
+    Cookies partagés en mémoire, chargés une fois depuis COOKIES_PATH. Les
+    changements sont écrits sur disque en différé (au plus une écriture par
+    COOKIE_FLUSH_DELAY secondes, depuis un thread minuteur) et à l'arrêt :
+    aucune écriture dans le chemin des requêtes.
+    """
+
+    def __init__(self, path=COOKIES_PATH, flush_delay=COOKIE_FLUSH_DELAY):
+        self.path = path
+        self.flush_delay = flush_delay
         self.logger = logging.getLogger("HttpClient")
-        self.proxies = proxies or []
+        self._cookies = None
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.Lock()
 
-        self._load_cookies()
+    def cookies(self):
+        """Copie des cookies courants (lus sur disque au premier appel)"""
+        with self._lock:
+            if self._cookies is None:
+                self._cookies = read_cookies(self.logger)
+            return dict(self._cookies)
 
-    def _load_cookies(self):
-        if os.path.exists(COOKIES_PATH):
-            try:
-                with open(COOKIES_PATH, "r", encoding="utf-8") as f:
-                    cookies = json.load(f)
-                    for name, value in cookies.items():
-                        self.session.cookies.set(name, value)
-                self.logger.info("Cookies chargés depuis le fichier.")
-            except Exception as e:
-                self.logger.warning(f"Erreur chargement cookies: {e}")
-
-    def _save_cookies(self):
+    def update(self, jar):
+        """Intègre les cookies d'une session ; programme une écriture s'ils ont changé"""
+        try:
+            current = {c.name: c.value for c in jar}
+        except Exception as e:
+            self.logger.warning(f"Cookies illisibles: {e}")
+            return
+        with self._lock:
+            if self._cookies is None:
+                self._cookies = read_cookies(self.logger)
+            if all(self._cookies.get(name) == value for name, value in current.items()):
+                return
+            self._cookies.update(current)
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Écrit les cookies s'ils ont changé depuis la dernière écriture"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            cookies = dict(self._cookies)
+            self._dirty = False
         try:
-            cookies = {c.name: c.value for c in self.session.cookies.jar}
-            with open(COOKIES_PATH, "w", encoding="utf-8") as f:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
                 json.dump(cookies, f, indent=2)
+            os.replace(tmp_path, self.path)
             self.logger.info("Cookies sauvegardés.")
         except Exception as e:
             self.logger.warning(f"Erreur sauvegarde cookies: {e}")
 
+
+class ResponseSpool:
+    """
+    Capture de débogage des réponses brutes : un fichier par requête dans
+    SPOOL_DIR, les plus anciens supprimés au-delà de `max_files` fichiers ou
+    `max_bytes` octets. Inactive sauf si `enabled` (SCRAP_DEBUG_CAPTURE=1).
+    """
+
+    def __init__(self, directory=SPOOL_DIR, enabled=DEBUG_CAPTURE,
+                 max_files=SPOOL_MAX_FILES, max_bytes=SPOOL_MAX_BYTES):
+        self.directory = directory
+        self.enabled = enabled
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger("HttpClient")
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def capture(self, url, text):
+        if not self.enabled:
+            return None
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", url.split("://", 1)[-1])[:80].strip("_")
+        name = f"{time.strftime('%Y%m%d_%H%M%S')}_{next(self._counter):05d}_{slug}.html"
+        path = os.path.join(self.directory, name)
+        try:
+            with self._lock:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                self._enforce_bounds()
+            self.logger.info(f"Réponse capturée dans {path}")
+            return path
+        except OSError as e:
+            self.logger.warning(f"Erreur capture réponse: {e}")
+            return None
+
+    def _enforce_bounds(self):
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.is_file() and entry.name.endswith(".html")),
+            key=lambda entry: entry.name
+        )
+        total = sum(entry.stat().st_size for entry in entries)
+        while entries and (len(entries) > self.max_files or total > self.max_bytes):
+            oldest = entries.pop(0)
+            total -= oldest.stat().st_size
+            os.remove(oldest.path)
+
+
+# Instances globales
+cookie_store = CookieStore()
+response_spool = ResponseSpool()
+# Dernière chance d'écrire les cookies si l'arrêt n'est pas propre
+atexit.register(cookie_store.flush)
+
+
+class SessionPool:
+    """
+    Sessions curl_cffi longue durée partagées par tous les jobs, une par
+    identité (proxy ou connexion directe) : les connexions restent ouvertes
+    (keep-alive, HTTP/2 négocié par l'empreinte chrome quand le serveur le
+    permet) d'une requête et d'un job à l'autre. Au-delà de `max_sessions`,
+    la session la moins récemment utilisée est fermée.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSIONS, timeout=DEFAULT_TIMEOUT):
+        self.max_sessions = max_sessions
+        self.timeout = timeout
+        self.logger = logging.getLogger("SessionPool")
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def session(self, proxy=None):
+        """Session dédiée à cette identité, créée (cookies chargés) au premier emprunt"""
+        with self._lock:
+            session = self._sessions.get(proxy)
+            if session is not None:
+                self._sessions.move_to_end(proxy)
+                self.reused += 1
+                return session
+
+            session = requests.Session(impersonate=IMPERSONATE, timeout=self.timeout)
+            for name, value in cookie_store.cookies().items():
+                session.cookies.set(name, value)
+            self._sessions[proxy] = session
+            self.created += 1
+
+            if len(self._sessions) > self.max_sessions:
+                _, oldest = self._sessions.popitem(last=False)
+                oldest.close()
+                self.evicted += 1
+            return session
+
+    def stats(self):
+        """Sessions ouvertes et taux de réutilisation (emprunts servis par une session déjà ouverte)"""
+        with self._lock:
+            borrowed = self.created + self.reused
+            return {
+                "sessions": len(self._sessions),
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+                "reuse_rate": self.reused / borrowed if borrowed else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+class AsyncSessionPool:
+    """
+    Une AsyncSession partagée par boucle asyncio : son multi-handle curl garde
+    un cache de connexions commun à toutes les requêtes et à tous les proxies,
+    les jobs successifs du bot réutilisent donc les connexions déjà ouvertes.
+    """
+
+    def __init__(self, max_clients=ASYNC_MAX_CLIENTS, timeout=DEFAULT_TIMEOUT):
+        self.max_clients = max_clients
+        self.timeout = timeout
+        self.logger = logging.getLogger("SessionPool")
+        # Une AsyncSession est liée à sa boucle (asyncio.run en crée une nouvelle à chaque appel)
+        self._sessions = weakref.WeakKeyDictionary()
+        self.created = 0
+        self.reused = 0
+
+    def session(self):
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is not None:
+            self.reused += 1
+            return session
+        session = requests.AsyncSession(impersonate=IMPERSONATE, timeout=self.timeout,
+                                        max_clients=self.max_clients)
+        for name, value in cookie_store.cookies().items():
+            session.cookies.set(name, value)
+        self._sessions[loop] = session
+        self.created += 1
+        return session
+
+    def stats(self):
+        borrowed = self.created + self.reused
+        return {
+            "sessions": len(self._sessions),
+            "created": self.created,
+            "reused": self.reused,
+            "reuse_rate": self.reused / borrowed if borrowed else 0.0,
+        }
+
+    async def close(self):
+        """Ferme la session de la boucle courante"""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+
+# Instances globales
+session_pool = SessionPool()
+async_session_pool = AsyncSessionPool()
+
+
+class HttpClient:
+    def __init__(self, proxies=None, timeout=DEFAULT_TIMEOUT, pool=None, policy=None, use_cache=True):
+        self.pool = pool or session_pool
+        self.policy = policy or RetryPolicy()
+        # Cache disque des GET (durées de vie par motif d'URL, voir response_cache.CACHE_RULES)
+        self.cache = get_response_cache() if use_cache else None
+        self.timeout = timeout
+        self.logger = logging.getLogger("HttpClient")
+        self.proxies = proxies or []
+
+    @property
+    def session(self):
+        """Session partagée de la connexion directe"""
+        return self.pool.session(None)
+
+    def _save_cookies(self, session=None):
+        """Reporte les cookies de la session dans le CookieStore (écriture différée)"""
+        session = session or self.session
+        cookie_store.update(session.cookies.jar)
+
     def get_random_proxy(self):
         if not self.proxies:
             return None
         return random.choice(self.proxies)
 
     def get(self, url, params=None, headers=None ,proxy=None):
-        if not proxy:
-            proxy = self.get_random_proxy()
-            print ("pas de random proxy")
+        """Comme fetch, mais retourne None si la page reste inaccessible"""
         try:
-            response = self.session.get(url, params=params, headers=headers, proxy=proxy)
-            response.raise_for_status()
-            self._save_cookies()
+            return self.fetch(url, params, headers, proxy)
+        except RequestFailed:
+            return None
 
-            # Crée le dossier si besoin
-            fetch_path = "scrap/data/fetch.html"
-            os.makedirs(os.path.dirname(fetch_path), exist_ok=True)
+    def fetch(self, url, params=None, headers=None, proxy=None):
+        """
+        GET avec la politique de nouvelles tentatives : backoff, Retry-After,
+        débit par domaine et changement de proxy après une erreur qui lui est
+        imputable. Lève RequestFailed si la page reste inaccessible.
 
-            # Écrit le contenu HTML dans le fichier (écrase l'ancien)
-            with open(fetch_path, "w", encoding="utf-8") as f:
-                f.write(response.text)
+        Une réponse encore fraîche dans le cache est servie sans requête ; une
+        réponse expirée munie d'un ETag/Last-Modified est revalidée (304).
+        """
+        cached = self.cache.lookup(url, params) if self.cache is not None else None
+        if cached is not None:
+            if cached.fresh:
+                return cached.text
+            headers = {**cached.conditional_headers(), **(headers or {})}
 
-            self.logger.info(f"✅ Contenu sauvegardé dans {fetch_path}")
-            return response.text
+        if not proxy:
+            proxy = self.get_random_proxy()
+        host = urlsplit(url).netloc
+        tried = []
+        for attempt in range(1, self.policy.max_attempts + 1):
+            rate_limiter.acquire(host)
+            session = self.pool.session(proxy)
+            retry_after = status = None
+            try:
+                response = session.get(url, params=params, headers=headers, proxy=proxy,
+                                       timeout=self.timeout)
+                status = response.status_code
+                if status == 304 and cached is not None:
+                    self.cache.mark_revalidated(url, params)
+                    return cached.text
+                kind = classify_response(status, response.text)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            except requests.RequestsError as e:
+                self.logger.warning(f"Erreur GET {url} : {e}")
+                kind = classify_error(e)
 
-        except requests.RequestsError as e:
-            self.logger.error(f"Erreur GET {url} : {e}")
-            return None
+            if kind == OK:
+                self._save_cookies(session)
+                response_spool.capture(url, response.text)
+                if self.cache is not None:
+                    self.cache.store(url, response.text, response.headers.get("ETag"),
+                                     response.headers.get("Last-Modified"), params)
+                return response.text
+
+            if not self.policy.should_retry(kind, attempt):
+                self.logger.error(f"Échec GET {url} : {kind} (HTTP {status}) après {attempt} tentative(s)")
+                raise RequestFailed(url, kind, status, attempt)
+            if kind == RATE_LIMITED:
+                rate_limiter.pause(host, retry_after or self.policy.delay(attempt))
+            if kind in PROXY_FAULTS:
+                tried.append(proxy)
+                proxy = self._next_proxy(tried)
+            delay = self.policy.delay(attempt, retry_after)
+            self.logger.info(f"GET {url} : {kind} (HTTP {status}), tentative {attempt + 1} dans {delay:.1f}s")
+            time.sleep(delay)
+        # Inatteignable : should_retry est faux à la dernière tentative
+        raise RequestFailed(url, kind, status, self.policy.max_attempts)
+
+    def _next_proxy(self, tried):
+        """Proxy pas encore essayé pour cette requête (ou n'importe lequel s'ils l'ont tous été)"""
+        fresh = [p for p in self.proxies if p not in tried]
+        if fresh:
+            return random.choice(fresh)
+        return self.get_random_proxy()
 
     def post(self, url, data=None, json=None, headers=None):
+        # Pas de nouvelle tentative automatique : un POST n'est pas forcément idempotent
         proxy = self.get_random_proxy()
+        session = self.pool.session(proxy)
         try:
-            response = self.session.post(url, data=data, json=json, headers=headers, proxy=proxy)
+            rate_limiter.acquire(urlsplit(url).netloc)
+            response = session.post(url, data=data, json=json, headers=headers, proxy=proxy,
+                                    timeout=self.timeout)
             response.raise_for_status()
-            self._save_cookies()
+            self._save_cookies(session)
             return response.text
-        except requests.RequestError as e:
+        except requests.RequestsError as e:
             self.logger.error(f"Erreur POST {url} : {e}")
             return None
@@ -1,48 +1,359 @@
 # scrap/infra/proxy_pool.py
 
+"""
+Pool de proxies avec score de santé.
+
+Pour chaque proxy on suit la latence (moyenne mobile exponentielle), le taux
+de succès (idem) et le dernier échec. Un proxy en échec est mis en pause
+pendant une durée croissante avec ses échecs consécutifs au lieu d'être
+blacklisté pour toujours. La sélection tire deux proxies au hasard et garde
+le meilleur (« power of two choices ») : O(1) par appel, et le trafic va
+naturellement vers les proxies rapides et fiables. Les scores sont persistés
+dans scrap/data/proxy_scores.json.
+
+Le ProxyReplenisher surveille le nombre de proxies disponibles et, sous le
+seuil bas, relance en tâche de fond la récupération et la validation : les
+nouveaux proxies rejoignent le pool partagé au fil de l'eau, sans
+interrompre les scrapings en cours.
+"""
+
+import asyncio
 import json
-import random
+import logging
 import os
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, List, Optional
+
 from scrap.tools.fetch_free_proxies import fetch_proxies
-from scrap.tools.test_proxy import generater_proxy_json
+from scrap.tools.test_proxy import ProxyCheck, generater_proxy_json, generater_proxy_json_async
+
+PROXY_VALIDATED_PATH = "scrap/config/proxies_validated.json"
+PROXY_SCORES_PATH = "scrap/data/proxy_scores.json"
+
+# Poids de la dernière mesure dans les moyennes mobiles
+EWMA_ALPHA = 0.3
+# Latence supposée d'un proxy jamais mesuré (secondes)
+DEFAULT_LATENCY = 2.0
+# Pause après un échec : BASE_COOLDOWN * 2^(échecs consécutifs - 1), plafonnée
+BASE_COOLDOWN = 30
+MAX_COOLDOWN = 3600
+# Nombre de tirages avant de se rabattre sur un parcours complet
+SAMPLE_ATTEMPTS = 8
+# Sauvegarde des scores tous les N signalements
+SAVE_EVERY = 20
+# Réapprovisionnement : seuil bas de proxies disponibles, période de
+# vérification et délai minimal entre deux rafraîchissements (secondes)
+LOW_WATER_MARK = 10
+CHECK_INTERVAL = 30
+MIN_REFRESH_INTERVAL = 10 * 60
+# Un proxy qui échoue autant de fois d'affilée est retiré au rafraîchissement suivant
+DROP_AFTER_FAILURES = 5
+
+logger = logging.getLogger("ProxyPool")
+
+
+@dataclass
+class ProxyStats:
+    """Santé d'un proxy"""
+    latency: Optional[float] = None
+    success_rate: float = 1.0
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    last_failure: Optional[float] = None
+    cooldown_until: float = 0.0
+
+    @property
+    def score(self) -> float:
+        """Plus c'est haut, mieux c'est : fiabilité divisée par la latence"""
+        return self.success_rate / (self.latency or DEFAULT_LATENCY)
+
+    def is_available(self, now: float) -> bool:
+        return self.cooldown_until <= now
 
-PROXY_VALIDATED_PATH = "../tests/proxies_validated.json"
 
 class ProxyPool:
-    def __init__(self):
+    def __init__(self, scores_path: str = PROXY_SCORES_PATH):
+        self.scores_path = scores_path
+        self._lock = threading.RLock()
+        self.stats: Dict[str, ProxyStats] = {}
+        self._pending_reports = 0
         self._load_validated_proxies()
-        self.blacklist = set()
+        self._load_scores()
 
     def _load_validated_proxies(self):
+        try:
+            with open(PROXY_VALIDATED_PATH, "r", encoding="utf-8") as f:
+                proxies = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Proxies validés illisibles ({PROXY_VALIDATED_PATH}) : {e}")
+            proxies = []
 
-
-        with open(PROXY_VALIDATED_PATH, "r", encoding="utf-8") as f:
-            self.proxies = json.load(f)
+        with self._lock:
+            # Liste pour le tirage aléatoire en O(1), dictionnaire pour les scores
+            self.proxies = list(dict.fromkeys(proxies))
+            for proxy in self.proxies:
+                self.stats.setdefault(proxy, ProxyStats())
 
         if not self.proxies:
-            raise ValueError("[ProxyPool] Aucun proxy valide chargé.")
+            # Pool vide : connexion directe en attendant le réapprovisionnement
+            logger.warning("[ProxyPool] Aucun proxy valide chargé.")
+
+    def save_proxies(self):
+        """Réécrit la liste des proxies validés avec le contenu actuel du pool"""
+        with self._lock:
+            proxies = list(self.proxies)
+        try:
+            tmp_path = PROXY_VALIDATED_PATH + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(proxies, f, indent=4)
+            os.replace(tmp_path, PROXY_VALIDATED_PATH)
+        except OSError as e:
+            logger.warning(f"Erreur sauvegarde proxies validés: {e}")
+
+    # --- Persistance des scores ---
+
+    def _load_scores(self):
+        if not os.path.exists(self.scores_path):
+            return
+        try:
+            with open(self.scores_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Erreur chargement scores proxies: {e}")
+            return
+        known = {f.name for f in fields(ProxyStats)}
+        with self._lock:
+            for proxy, values in data.items():
+                # Seuls les proxies encore validés sont repris
+                if proxy in self.stats:
+                    self.stats[proxy] = ProxyStats(**{k: v for k, v in values.items() if k in known})
+
+    def save_scores(self):
+        with self._lock:
+            data = {proxy: asdict(stats) for proxy, stats in self.stats.items()}
+            self._pending_reports = 0
+        try:
+            os.makedirs(os.path.dirname(self.scores_path), exist_ok=True)
+            tmp_path = self.scores_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.scores_path)
+        except OSError as e:
+            logger.warning(f"Erreur sauvegarde scores proxies: {e}")
+
+    def _count_report(self):
+        self._pending_reports += 1
+        if self._pending_reports >= SAVE_EVERY:
+            self.save_scores()
+
+    # --- Sélection ---
 
-    def get_random_proxy(self ):
-        valid_proxies = [p for p in self.proxies if p not in self.blacklist]
-        if not valid_proxies:
-            return None
-        return random.choice(valid_proxies)
+    def candidates(self, k: int = 2) -> List[str]:
+        """
+        Jusqu'à k proxies disponibles tirés au hasard, du meilleur au moins bon
+        score. Liste vide si tous les proxies sont en pause.
+        """
+        now = time.time()
+        with self._lock:
+            picked = {}
+            if not self.proxies:
+                return []
+            for _ in range(SAMPLE_ATTEMPTS):
+                proxy = random.choice(self.proxies)
+                if self.stats[proxy].is_available(now):
+                    picked[proxy] = self.stats[proxy].score
+                    if len(picked) >= k:
+                        break
+            if not picked:
+                # Rare : la plupart des proxies sont en pause, on parcourt tout
+                available = [p for p in self.proxies if self.stats[p].is_available(now)]
+                picked = {p: self.stats[p].score for p in random.sample(available, min(k, len(available)))}
+        return sorted(picked, key=picked.get, reverse=True)
+
+    def get_random_proxy(self):
+        """Meilleur de deux proxies disponibles tirés au hasard (None si aucun)"""
+        candidates = self.candidates(2)
+        return candidates[0] if candidates else None
 
     def get_first_proxy(self):
-            return self.proxies[0]
+            return self.proxies[0] if self.proxies else None
 
     def round_proxy(self):
-        self.proxies=self.proxies[1:] + self.proxies[:1]
+        with self._lock:
+            self.proxies = self.proxies[1:] + self.proxies[:1]
 
     def extract_proxy(self):
         fetch_proxies()
         generater_proxy_json()
         self._load_validated_proxies()
 
+    async def extract_proxy_async(self) -> int:
+        """
+        Récupère et valide de nouveaux proxies sans bloquer la boucle asyncio :
+        chaque proxy validé rejoint le pool dès qu'il passe. Retourne le nombre
+        de proxies validés.
+        """
+        async def on_valid(check: ProxyCheck):
+            self.add_proxy(check.proxy, check.latency)
+
+        await asyncio.to_thread(fetch_proxies)
+        checks = await generater_proxy_json_async(on_valid=on_valid, save=False)
+        self.prune()
+        # Le fichier reflète le pool complet (anciens proxies sains + nouveaux)
+        await asyncio.to_thread(self.save_proxies)
+        return len(checks)
+
+    def prune(self, max_failures: int = DROP_AFTER_FAILURES) -> int:
+        """Retire les proxies en échec répété ; retourne le nombre de proxies retirés"""
+        with self._lock:
+            kept = [p for p in self.proxies if self.stats[p].consecutive_failures < max_failures]
+            removed = len(self.proxies) - len(kept)
+            for proxy in set(self.proxies) - set(kept):
+                del self.stats[proxy]
+            # Nouvelle liste : les tirages en cours gardent une vue cohérente de l'ancienne
+            self.proxies = kept
+        return removed
+
+    def add_proxy(self, proxy: str, latency: Optional[float] = None):
+        """Ajoute (ou réhabilite) un proxy validé, avec sa latence mesurée"""
+        with self._lock:
+            stats = self.stats.get(proxy)
+            if stats is None:
+                self.stats[proxy] = ProxyStats(latency=latency)
+                self.proxies.append(proxy)
+            else:
+                # Revalidé : fin de pause, la nouvelle mesure entre dans la moyenne
+                stats.cooldown_until = 0.0
+                stats.consecutive_failures = 0
+                if latency is not None:
+                    stats.latency = latency if stats.latency is None else \
+                        EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * stats.latency
+
+    # --- Retour d'expérience ---
 
+    def report_success(self, proxy: Optional[str], latency: float):
+        with self._lock:
+            stats = self.stats.get(proxy)
+            if stats is None:
+                return
+            stats.latency = latency if stats.latency is None else \
+                EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * stats.latency
+            stats.success_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * stats.success_rate
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.cooldown_until = 0.0
+            self._count_report()
 
-    def blacklist_proxy(self, proxy):
-        self.blacklist.add(proxy)
+    def report_failure(self, proxy: Optional[str]):
+        """Échec : baisse du taux de succès et pause exponentielle du proxy"""
+        with self._lock:
+            stats = self.stats.get(proxy)
+            if stats is None:
+                return
+            now = time.time()
+            stats.success_rate = (1 - EWMA_ALPHA) * stats.success_rate
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.last_failure = now
+            cooldown = min(MAX_COOLDOWN, BASE_COOLDOWN * 2 ** (stats.consecutive_failures - 1))
+            stats.cooldown_until = now + cooldown
+            logger.info(f"Proxy {proxy} en pause {cooldown}s ({stats.consecutive_failures} échecs consécutifs)")
+            self._count_report()
+
+    def blacklist_proxy(self, proxy, duration: float = MAX_COOLDOWN):
+        """Met le proxy en pause pour `duration` secondes (plus de blacklist définitive)"""
+        with self._lock:
+            stats = self.stats.get(proxy)
+            if stats is not None:
+                stats.cooldown_until = time.time() + duration
+
+    @property
+    def blacklist(self):
+        """Proxies actuellement en pause"""
+        now = time.time()
+        with self._lock:
+            return {p for p in self.proxies if not self.stats[p].is_available(now)}
 
     def count_available(self):
-        return len([p for p in self.proxies if p not in self.blacklist])
+        now = time.time()
+        with self._lock:
+            return sum(1 for p in self.proxies if self.stats[p].is_available(now))
+
+
+class ProxyReplenisher:
+    """
+    Tâche de fond qui réapprovisionne le pool quand le nombre de proxies
+    disponibles passe sous `low_water`, au plus une fois par
+    `min_refresh_interval` secondes.
+    """
+
+    def __init__(self, pool: ProxyPool, low_water: int = LOW_WATER_MARK,
+                 check_interval: float = CHECK_INTERVAL,
+                 min_refresh_interval: float = MIN_REFRESH_INTERVAL):
+        self.pool = pool
+        self.low_water = low_water
+        self.check_interval = check_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.last_refresh: Optional[float] = None
+        self.refreshing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Démarre la surveillance (à appeler depuis la boucle asyncio du bot)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.pool.save_scores()
+
+    def needs_refresh(self) -> bool:
+        if self.pool.count_available() >= self.low_water:
+            return False
+        return self.last_refresh is None or time.monotonic() - self.last_refresh >= self.min_refresh_interval
+
+    async def refresh(self) -> int:
+        """Récupère et valide de nouveaux proxies ; retourne le nombre de proxies validés"""
+        self.refreshing = True
+        self.last_refresh = time.monotonic()
+        try:
+            logger.info(f"Réapprovisionnement du pool ({self.pool.count_available()} proxies disponibles)")
+            validated = await self.pool.extract_proxy_async()
+            logger.info(f"{validated} proxies validés, {self.pool.count_available()} disponibles")
+            return validated
+        finally:
+            self.refreshing = False
+
+    async def _loop(self):
+        while True:
+            try:
+                if self.needs_refresh():
+                    await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erreur lors du réapprovisionnement des proxies")
+            await asyncio.sleep(self.check_interval)
+
+
+_pool: Optional[ProxyPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_proxy_pool() -> ProxyPool:
+    """Pool partagé par les scrapings et le réapprovisionnement, chargé au premier appel"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProxyPool()
+        return _pool
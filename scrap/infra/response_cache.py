@@ -0,0 +1,241 @@
+# scrap/infra/response_cache.py
+
+"""
+Cache disque des réponses HTTP (GET).
+
+Les corps de réponse sont stockés compressés (zlib) dans des fichiers nommés
+par leur empreinte SHA-256 : deux URLs au contenu identique partagent le même
+blob. Un index SQLite associe chaque URL à son blob, à ses en-têtes de
+validation (ETag, Last-Modified) et à sa date d'expiration, calculée selon la
+durée de vie du premier motif d'URL correspondant (CACHE_RULES). Une entrée
+expirée mais validable est revalidée par une requête conditionnelle : un 304
+prolonge l'entrée sans retélécharger la page.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Pattern, Tuple
+from urllib.parse import urlencode
+
+logger = logging.getLogger("ResponseCache")
+
+CACHE_DIR = os.path.join("scrap", "data", "cache")
+# (motif d'URL, durée de vie en secondes) : la première règle qui correspond s'applique
+CACHE_RULES: List[Tuple[str, int]] = [
+    (r"/ad/", 24 * 3600),                     # pages d'annonce (descriptions)
+    (r"free-proxy-list\.net", 10 * 60),       # liste de proxies gratuits
+]
+# Sans règle : pas de fraîcheur, l'entrée ne sert qu'à la revalidation (si ETag/Last-Modified)
+DEFAULT_TTL = 0
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    blob TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_blob ON responses(blob);
+CREATE INDEX IF NOT EXISTS idx_responses_fetched ON responses(fetched_at);
+"""
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """En-têtes de revalidation (vide si la réponse n'en permet pas)"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def cache_key(url: str, params=None) -> str:
+    if params:
+        url = f"{url}{'&' if '?' in url else '?'}{urlencode(sorted(dict(params).items()))}"
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, directory: str = CACHE_DIR, rules: Optional[List[Tuple[str, int]]] = None,
+                 default_ttl: int = DEFAULT_TTL, max_bytes: int = MAX_CACHE_BYTES):
+        self.directory = directory
+        self.blob_dir = os.path.join(directory, "blobs")
+        self.rules: List[Tuple[Pattern, int]] = [(re.compile(pattern), ttl)
+                                                 for pattern, ttl in (CACHE_RULES if rules is None else rules)]
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.stores = 0
+        self._lock = threading.RLock()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def ttl_for(self, url: str) -> int:
+        for pattern, ttl in self.rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    # --- Lecture ---
+
+    def lookup(self, url: str, params=None) -> Optional[CachedResponse]:
+        """Entrée en cache pour l'URL (fraîche ou à revalider), ou None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT blob, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                (cache_key(url, params),)
+            ).fetchone()
+        if row is None:
+            self._count(hit=False)
+            return None
+        digest, etag, last_modified, expires_at = row
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                text = zlib.decompress(f.read()).decode("utf-8")
+        except (OSError, zlib.error, UnicodeDecodeError) as e:
+            logger.warning(f"Blob de cache illisible pour {url} : {e}")
+            self._count(hit=False)
+            return None
+        entry = CachedResponse(url, text, etag, last_modified, expires_at)
+        self._count(hit=entry.fresh)
+        return entry
+
+    def _count(self, hit: bool):
+        # Compteurs partagés entre les threads de to_thread : mis à jour sous le verrou
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # --- Écriture ---
+
+    def store(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None,
+              params=None) -> bool:
+        """Met la réponse en cache si elle peut resservir (durée de vie ou validateur)"""
+        ttl = self.ttl_for(url)
+        if ttl <= 0 and not (etag or last_modified):
+            return False
+        body = text.encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(body, 6))
+            os.replace(tmp_path, path)
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, blob, size, etag, last_modified, fetched_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (cache_key(url, params), url, digest, os.path.getsize(path), etag, last_modified, now, now + ttl)
+            )
+            self.stores += 1
+            if self.stores % 100 == 0:
+                self.prune()
+        return True
+
+    def mark_revalidated(self, url: str, params=None):
+        """Le serveur a répondu 304 : l'entrée repart pour une durée de vie complète"""
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE responses SET fetched_at = ?, expires_at = ? WHERE key = ?",
+                (now, now + self.ttl_for(url), cache_key(url, params))
+            )
+            self.revalidated += 1
+
+    def prune(self) -> int:
+        """Supprime les entrées les plus anciennes au-delà de max_bytes ; retourne le nombre supprimé"""
+        with self._lock, self.conn:
+            total = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT blob, size FROM responses)"
+            ).fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            removed = 0
+            rows = self.conn.execute("SELECT key, blob, size FROM responses ORDER BY fetched_at").fetchall()
+            for key, digest, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                removed += 1
+                still_used = self.conn.execute("SELECT 1 FROM responses WHERE blob = ? LIMIT 1", (digest,)).fetchone()
+                if not still_used:
+                    total -= size
+                    try:
+                        os.remove(self._blob_path(digest))
+                    except OSError:
+                        pass
+            return removed
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries, size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            hits, misses, revalidated = self.hits, self.misses, self.revalidated
+        lookups = hits + misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "hits": hits,
+            "misses": misses,
+            "revalidated": revalidated,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM responses")
+        for root, _, files in os.walk(self.blob_dir):
+            for name in files:
+                os.remove(os.path.join(root, name))
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Cache partagé, ouvert au premier appel"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
@@ -0,0 +1,176 @@
+# scrap/infra/retry.py
+
+"""
+Politique de requêtes : classification des erreurs, nouvelles tentatives avec
+backoff exponentiel (jitter complet), prise en compte de Retry-After et
+limitation de débit par domaine (seau à jetons).
+
+Utilisée par HttpClient (synchrone) et AsyncFetcher (asynchrone) : une page en
+échec est retentée via un autre proxy au lieu d'être silencieusement perdue.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from curl_cffi.requests import exceptions
+
+# Catégories d'erreurs
+OK = "ok"
+TIMEOUT = "timeout"
+BLOCKED = "bloqué"            # 403 ou page anti-bot
+RATE_LIMITED = "limité"       # 429
+SERVER = "serveur"            # 5xx
+PROXY = "proxy"               # connexion / proxy en échec
+CLIENT = "client"             # autre 4xx : inutile de réessayer
+
+RETRYABLE = {TIMEOUT, BLOCKED, RATE_LIMITED, SERVER, PROXY}
+# Erreurs imputables au proxy utilisé : on en change à la tentative suivante
+PROXY_FAULTS = {TIMEOUT, BLOCKED, RATE_LIMITED, PROXY}
+
+# Marqueurs des pages de challenge anti-bot (DataDome sur leboncoin)
+ANTI_BOT_MARKERS = ("captcha-delivery.com", "geo.captcha-delivery", "datadome")
+
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BASE_DELAY = 2.0
+DEFAULT_MAX_DELAY = 60.0
+# Débit par domaine : jetons par seconde et rafale maximale
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 3
+
+
+class RequestFailed(Exception):
+    """Échec définitif d'une requête après application de la politique"""
+
+    def __init__(self, url: str, kind: str, status: Optional[int] = None, attempts: int = 1):
+        self.url = url
+        self.kind = kind
+        self.status = status
+        self.attempts = attempts
+        detail = f"HTTP {status}" if status else kind
+        super().__init__(f"{url} : {detail} après {attempts} tentative(s)")
+
+
+def classify_error(error: Exception) -> str:
+    if isinstance(error, exceptions.Timeout):
+        return TIMEOUT
+    if isinstance(error, (exceptions.ProxyError, exceptions.ConnectionError, exceptions.SSLError)):
+        return PROXY
+    # URL invalide, trop de redirections, erreur de décodage... : réessayer n'y changerait rien
+    return CLIENT
+
+
+def classify_response(status: int, text: str = "") -> str:
+    if status == 429:
+        return RATE_LIMITED
+    if status == 403:
+        return BLOCKED
+    if status == 407:
+        return PROXY
+    if status >= 500:
+        return SERVER
+    if status >= 400:
+        return CLIENT
+    # Challenge anti-bot servi avec un 200 : court, et contenant un marqueur connu
+    if len(text) < 50_000:
+        lowered = text.lower()
+        if any(marker in lowered for marker in ANTI_BOT_MARKERS):
+            return BLOCKED
+    return OK
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After en secondes (nombre de secondes ou date HTTP), ou None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Nombre de tentatives et délais entre elles"""
+
+    def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS, base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, kind: str, attempt: int) -> bool:
+        return kind in RETRYABLE and attempt < self.max_attempts
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Backoff exponentiel à jitter complet ; Retry-After prime s'il est plus long"""
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            return max(backoff, min(retry_after, self.max_delay))
+        return backoff
+
+
+class TokenBucket:
+    """Seau à jetons : `rate` requêtes par seconde en moyenne, rafales de `burst`"""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def reserve(self) -> float:
+        """Prend un jeton et retourne l'attente nécessaire avant de l'utiliser"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        return max(wait, self.paused_until - now)
+
+
+class RateLimiter:
+    """Un seau à jetons par domaine, utilisable depuis des threads ou la boucle asyncio"""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, host: str) -> float:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return bucket.reserve()
+
+    def acquire(self, host: str):
+        wait = self._reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, host: str):
+        wait = self._reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, host: str, seconds: float):
+        """Suspend le domaine (ex : 429 avec Retry-After)"""
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            bucket.paused_until = max(bucket.paused_until, time.monotonic() + seconds)
+
+
+# Instance globale : le débit par domaine est partagé par tous les clients
+rate_limiter = RateLimiter()
@@ -1,60 +1,363 @@
-### setup pour recuper les token avec playwirght puis on les passer a curl cffi pour passer les etape ou le js est obligatoir
-### dans se cas precis playwright ne sera pas necessair curlcffi suffit amplament mais dans de futur contexte cela sera tres utile
+"""
+Planificateur asyncio des recherches récurrentes.
 
+Chaque recherche planifiée est relancée à intervalle fixe ou selon une
+expression cron (5 champs : minute heure jour mois jour_semaine), avec un
+décalage aléatoire (jitter) pour étaler la charge sur le pool de proxies. Les
+exécutions passent par le job_manager (visibles dans /jobs, au plus
+MAX_CONCURRENT_JOBS à la fois) ; une recherche dont le run précédent n'est pas
+terminé est sautée plutôt que doublée. Les planifications et leurs prochaines
+exécutions sont persistées dans scrap/data/schedules.json.
+"""
 
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set
 
+from scrap.jobs.executor import Job, job_manager
+from scrap.jobs.fetch_ads import FetchReport, fetch_ads_async
 
-import os, json, time, random
-from playwright.sync_api import sync_playwright
-from curl_cffi import requests
+logger = logging.getLogger(__name__)
 
+SCHEDULES_PATH = os.path.join("scrap", "data", "schedules.json")
+# Réveil maximal de la boucle, même sans échéance proche
+MAX_SLEEP = 60
+MIN_INTERVAL = 5 * 60
 
-def human_delay(a=1.2, b=2.5):
-    time.sleep(random.uniform(a, b))
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
 
 
-# Dossier temporaire pour le profil utilisateur
-temp_profile = r"D:\temp_playwright_profile"
-os.makedirs(temp_profile, exist_ok=True)
+def parse_duration(text: str) -> int:
+    """Convertit "90s", "30m", "2h", "1d" (ou un nombre de minutes) en secondes"""
+    text = text.strip().lower()
+    if not text:
+        raise ValueError("Durée vide")
+    unit = DURATION_UNITS.get(text[-1])
+    number = text[:-1] if unit else text
+    try:
+        value = float(number)
+    except ValueError:
+        raise ValueError(f"Durée invalide : {text}")
+    if value < 0:
+        raise ValueError(f"Durée négative : {text}")
+    return int(value * (unit or 60))
 
-# URL cible (page après login)
-target_url = "https://www.leboncoin.fr/"
 
-# Étape 1 : Se connecter avec Playwright
-with sync_playwright() as p:
-    browser = p.chromium.launch_persistent_context(
-        user_data_dir=temp_profile,
-        channel="chrome",
-        headless=False,
-        args=[
-            "--start-maximized",
-            "--disable-blink-features=AutomationControlled",
-            "--disable-infobars",
-            "--disable-features=IsolateOrigins,site-per-process"
-        ],
-    )
+def format_duration(seconds: int) -> str:
+    for suffix, unit in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= unit and seconds % unit == 0:
+            return f"{seconds // unit}{suffix}"
+    return f"{seconds}s"
 
-    page = browser.new_page()
-    page.goto("https://www.leboncoin.fr/")
 
-    input("➡️ Connecte-toi manuellement puis appuie sur Entrée ici...")
+class CronExpression:
+    """
+    Expression cron à 5 champs. Chaque champ accepte *, une valeur, une plage
+    a-b, un pas (*/n, a-b/n) et des listes séparées par des virgules. Jour de
+    la semaine : 0 ou 7 = dimanche. Comme cron, si le jour du mois et le jour
+    de la semaine sont tous deux restreints, l'un ou l'autre suffit.
+    """
 
-    # Étape 2 : Récupérer les cookies
-    cookies = browser.cookies()
-    print("✅ Cookies récupérés")
+    FIELDS = (("minute", 0, 59), ("heure", 0, 23), ("jour", 1, 31), ("mois", 1, 12), ("jour_semaine", 0, 7))
 
-    browser.close()
+    def __init__(self, expression: str):
+        self.expression = " ".join(expression.split())
+        parts = self.expression.split(" ")
+        if len(parts) != 5:
+            raise ValueError(f"Expression cron invalide (5 champs attendus) : {expression}")
+        sets = [self._parse_field(part, name, low, high) for part, (name, low, high) in zip(parts, self.FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = sets
+        # 7 et 0 désignent tous deux le dimanche
+        self.weekdays = {day % 7 for day in weekdays}
+        self.days_restricted = parts[2] != "*"
+        self.weekdays_restricted = parts[4] != "*"
 
-# Étape 3 : Transformer les cookies pour curl_cffi
-session = requests.Session()
-cookie_dict = {cookie["name"]: cookie["value"] for cookie in cookies}
-session.cookies.update(cookie_dict)
+    @staticmethod
+    def _parse_field(part: str, name: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for item in part.split(","):
+            step = 1
+            if "/" in item:
+                item, step_text = item.split("/", 1)
+                if not step_text.isdigit() or int(step_text) == 0:
+                    raise ValueError(f"Pas invalide pour le champ {name} : {part}")
+                step = int(step_text)
+            if item == "*":
+                start, end = low, high
+            elif "-" in item:
+                start_text, end_text = item.split("-", 1)
+                if not (start_text.isdigit() and end_text.isdigit()):
+                    raise ValueError(f"Plage invalide pour le champ {name} : {part}")
+                start, end = int(start_text), int(end_text)
+            elif item.isdigit():
+                start = int(item)
+                end = high if step > 1 else start
+            else:
+                raise ValueError(f"Valeur invalide pour le champ {name} : {part}")
+            if start < low or end > high or start > end:
+                raise ValueError(f"Valeur hors limites pour le champ {name} ({low}-{high}) : {part}")
+            values.update(range(start, end + 1, step))
+        return values
 
-# Étape 4 : Utiliser curl_cffi pour scraper une page avec les cookies
-res = session.get(
-    "https://www.leboncoin.fr/ad/voitures/2997258439",  # Exemple d'URL protégée
-    impersonate="chrome120"  # Très utile contre les protections
-)
+    def _day_matches(self, moment: datetime) -> bool:
+        in_month = moment.day in self.days
+        # weekday() : lundi = 0 ; cron : dimanche = 0
+        in_week = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return in_month or in_week
+        return in_month and in_week
 
-print("✅ Status:", res.status_code)
-print("✅ Contenu partiel:", res.json())
+    def next_after(self, moment: datetime) -> datetime:
+        """Première échéance strictement postérieure à `moment` (à la minute près)"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Au-delà de quelques années, l'expression ne peut plus correspondre (ex : 31 février)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                # Premier jour du mois suivant
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"L'expression cron ne correspond à aucune date : {self.expression}")
+
+
+@dataclass
+class ScheduledSearch:
+    """Une recherche récurrente et l'état de sa planification"""
+    id: int
+    url: str
+    pages: int
+    interval: Optional[int] = None
+    cron: Optional[str] = None
+    jitter: int = 0
+    incremental: bool = True
+    owner: Optional[int] = None
+    next_run: Optional[str] = None
+    last_run: Optional[str] = None
+    last_status: Optional[str] = None
+
+    @property
+    def rule(self) -> str:
+        if self.cron:
+            return f"cron {self.cron}"
+        return f"toutes les {format_duration(self.interval)}"
+
+    def compute_next_run(self, after: datetime) -> datetime:
+        if self.cron:
+            base = CronExpression(self.cron).next_after(after)
+        else:
+            base = after + timedelta(seconds=self.interval)
+        return base + timedelta(seconds=random.uniform(0, self.jitter)) if self.jitter else base
+
+
+Runner = Callable[[ScheduledSearch, Job], Awaitable[FetchReport]]
+Notifier = Callable[[int, str], Awaitable[None]]
+
+
+class Scheduler:
+    """
+    Boucle asyncio qui lance les recherches planifiées à échéance. Une seule
+    exécution par recherche à la fois ; la concurrence globale est celle du
+    job_manager, pour ne pas provoquer de rafales sur le pool de proxies.
+    """
+
+    def __init__(self, path: str = SCHEDULES_PATH, runner: Optional[Runner] = None,
+                 notify: Optional[Notifier] = None):
+        self.path = path
+        self.runner = runner or self._run_search
+        self.notify = notify
+        self._lock = threading.RLock()
+        self._schedules: Dict[int, ScheduledSearch] = {}
+        self._running: Dict[int, Job] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._load()
+
+    # --- Persistance ---
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Erreur lecture des planifications {self.path} : {e}")
+            return
+        known = {f.name for f in fields(ScheduledSearch)}
+        for item in data:
+            schedule = ScheduledSearch(**{key: value for key, value in item.items() if key in known})
+            self._schedules[schedule.id] = schedule
+
+    def _save(self):
+        with self._lock:
+            data = [asdict(schedule) for schedule in self._schedules.values()]
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    # --- Gestion des planifications ---
+
+    def add(self, url: str, pages: int, interval: Optional[int] = None, cron: Optional[str] = None,
+            jitter: int = 0, incremental: bool = True, owner: Optional[int] = None) -> ScheduledSearch:
+        """Ajoute une recherche récurrente (intervalle en secondes ou expression cron)"""
+        if (interval is None) == (cron is None):
+            raise ValueError("Indiquer soit un intervalle, soit une expression cron")
+        if cron is not None:
+            cron = CronExpression(cron).expression
+        elif interval < MIN_INTERVAL:
+            raise ValueError(f"Intervalle minimal : {format_duration(MIN_INTERVAL)}")
+        if pages < 1:
+            raise ValueError("Le nombre de pages doit être positif")
+
+        with self._lock:
+            schedule = ScheduledSearch(
+                id=max(self._schedules, default=0) + 1, url=url, pages=pages, interval=interval,
+                cron=cron, jitter=jitter, incremental=incremental, owner=owner
+            )
+            schedule.next_run = schedule.compute_next_run(datetime.now()).isoformat(timespec="seconds")
+            self._schedules[schedule.id] = schedule
+            self._save()
+        self._wake()
+        return schedule
+
+    def remove(self, schedule_id: int) -> bool:
+        with self._lock:
+            if self._schedules.pop(schedule_id, None) is None:
+                return False
+            self._save()
+        self._wake()
+        return True
+
+    def get(self, schedule_id: int) -> Optional[ScheduledSearch]:
+        return self._schedules.get(schedule_id)
+
+    def list(self) -> List[ScheduledSearch]:
+        with self._lock:
+            return sorted(self._schedules.values(), key=lambda schedule: schedule.next_run or "")
+
+    def is_running(self, schedule_id: int) -> bool:
+        job = self._running.get(schedule_id)
+        return job is not None and job.is_active
+
+    # --- Boucle ---
+
+    def start(self):
+        """Démarre la boucle (à appeler depuis la boucle asyncio du bot)"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _loop(self):
+        while True:
+            try:
+                self._run_due(datetime.now())
+            except Exception:
+                logger.exception("Erreur dans la boucle du planificateur")
+            delay = self._seconds_until_next(datetime.now())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _seconds_until_next(self, now: datetime) -> float:
+        upcoming = [datetime.fromisoformat(schedule.next_run) for schedule in self._schedules.values()
+                    if schedule.next_run]
+        if not upcoming:
+            return MAX_SLEEP
+        return min(MAX_SLEEP, max(0.0, (min(upcoming) - now).total_seconds()))
+
+    def _run_due(self, now: datetime):
+        changed = False
+        with self._lock:
+            for schedule in list(self._schedules.values()):
+                if schedule.next_run and datetime.fromisoformat(schedule.next_run) > now:
+                    continue
+                changed = True
+                # Prochaine échéance calculée depuis maintenant : pas de rattrapage en rafale après un arrêt
+                schedule.next_run = schedule.compute_next_run(now).isoformat(timespec="seconds")
+                if self.is_running(schedule.id):
+                    logger.info(f"Recherche planifiée #{schedule.id} encore en cours : exécution sautée")
+                    schedule.last_status = "sautée (exécution précédente en cours)"
+                    continue
+                self._submit(schedule)
+            if changed:
+                self._save()
+
+    def _submit(self, schedule: ScheduledSearch):
+        async def run(job: Job):
+            schedule.last_run = datetime.now().isoformat(timespec="seconds")
+            try:
+                report = await self.runner(schedule, job)
+            except Exception as e:
+                schedule.last_status = f"échec : {e}"
+                self._save()
+                await self._notify(schedule, f"❌ Recherche planifiée #{schedule.id} en échec : {e}")
+                raise
+            schedule.last_status = (f"{report.pages} pages, {report.new} nouvelles, "
+                                    f"{report.changed} modifiées")
+            self._save()
+            if report.new or report.changed:
+                await self._notify(schedule, f"🕒 Recherche planifiée #{schedule.id} : {schedule.last_status}\n{schedule.url}")
+            return report.ads
+
+        mode = ", incrémental" if schedule.incremental else ""
+        self._running[schedule.id] = job_manager.submit(
+            f"planifié #{schedule.id} {schedule.url} ({schedule.pages} pages{mode})",
+            run, owner=schedule.owner, total=schedule.pages
+        )
+
+    async def _notify(self, schedule: ScheduledSearch, text: str):
+        if self.notify is None or schedule.owner is None:
+            return
+        try:
+            await self.notify(schedule.owner, text)
+        except Exception as e:
+            logger.warning(f"Notification de la recherche planifiée #{schedule.id} impossible : {e}")
+
+    @staticmethod
+    async def _run_search(schedule: ScheduledSearch, job: Job) -> FetchReport:
+        async def on_page(page_number: int, count: int):
+            job.advance()
+
+        # Résultats en base uniquement (rattachés à la recherche, voir /history) :
+        # le jeu de données courant (ads_*.json) reste celui du dernier /search
+        return await fetch_ads_async(schedule.url, schedule.pages, on_page=on_page,
+                                     incremental=schedule.incremental, write_files=False)
+
+
+# Instance globale
+scheduler = Scheduler()
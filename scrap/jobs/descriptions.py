@@ -0,0 +1,148 @@
+"""
+Enrichissement en masse des annonces du jeu de données courant avec leur
+description.
+
+Les pages d'annonce sont téléchargées en parallèle par l'AsyncFetcher (pool de
+proxies, nouvelles tentatives, cache disque). Chaque description est
+enregistrée en base dès sa récupération : un job interrompu reprend là où il
+s'était arrêté. À la fin (ou à l'interruption), les descriptions sont
+recopiées dans les fichiers ads_*.json, champ "description", pour que
+l'analyse et l'export n'aient pas à les retélécharger.
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from scrap.core.dataset import dataset
+from scrap.core.parser import extract_description, write_ads
+from scrap.core.storage import get_storage
+from scrap.infra.fetcher import AsyncFetcher, DEFAULT_CONCURRENCY
+from scrap.infra.proxy_pool import get_proxy_pool
+from scrap.infra.response_cache import get_response_cache
+
+logger = logging.getLogger(__name__)
+
+DESCRIPTION_FIELD = "description"
+
+
+@dataclass
+class DescriptionReport:
+    """Bilan d'un enrichissement"""
+    total: int = 0
+    already_known: int = 0
+    fetched: int = 0
+    missing: int = 0
+    failed: int = 0
+    files_updated: int = 0
+
+
+def _pending_ads(files: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Annonces du jeu de données avec une URL, une seule fois par list_id"""
+    seen = set()
+    ads = []
+    for raw_ads in files.values():
+        for ad in raw_ads:
+            if not isinstance(ad, dict) or not ad.get("url") or ad.get("list_id") is None:
+                continue
+            if ad["list_id"] in seen:
+                continue
+            seen.add(ad["list_id"])
+            ads.append(ad)
+    return ads
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    """Signature (mtime_ns, taille) du fichier, None s'il n'existe plus"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _write_back(files: Dict[str, List[Dict[str, Any]]], signatures: Dict[str, Tuple[int, int]],
+                descriptions: Dict[int, Optional[str]], data_dir: str) -> int:
+    """
+    Recopie les descriptions dans les fichiers concernés ; retourne le nombre
+    de fichiers réécrits. Un fichier modifié ou supprimé depuis la lecture
+    (nouvelle recherche pendant le job) est laissé tel quel : le réécrire
+    depuis l'ancienne copie effacerait ses nouvelles annonces.
+    """
+    updated = 0
+    for name, raw_ads in files.items():
+        path = os.path.join(data_dir, name)
+        changed = False
+        enriched = []
+        for ad in raw_ads:
+            if isinstance(ad, dict):
+                description = descriptions.get(ad.get("list_id"))
+                if description is not None and ad.get(DESCRIPTION_FIELD) != description:
+                    # Copie : les listes du DatasetCache sont partagées et ne doivent pas être modifiées
+                    ad = {**ad, DESCRIPTION_FIELD: description}
+                    changed = True
+            enriched.append(ad)
+        if not changed:
+            continue
+        if _signature(path) != signatures.get(name):
+            logger.info(f"{name} a changé depuis la lecture, descriptions non recopiées")
+            continue
+        write_ads(enriched, path)
+        updated += 1
+    return updated
+
+
+async def enrich_descriptions(concurrency: int = DEFAULT_CONCURRENCY, on_progress=None,
+                              limit: Optional[int] = None) -> DescriptionReport:
+    """
+    Récupère la description de toutes les annonces du jeu de données qui n'en
+    ont pas encore. `on_progress(traitées, à_traiter)` est attendu après
+    chaque annonce. `limit` borne le nombre de pages téléchargées.
+    """
+    files, signatures = await asyncio.to_thread(dataset.snapshot)
+    ads = _pending_ads(files)
+    report = DescriptionReport(total=len(ads))
+    storage = get_storage()
+
+    known = await asyncio.to_thread(storage.descriptions, [ad["list_id"] for ad in ads])
+    descriptions: Dict[int, Optional[str]] = {list_id: text for list_id, text in known.items() if text is not None}
+    for ad in ads:
+        if ad.get(DESCRIPTION_FIELD) is not None and ad["list_id"] not in descriptions:
+            descriptions[ad["list_id"]] = ad[DESCRIPTION_FIELD]
+    todo = [ad for ad in ads if ad["list_id"] not in descriptions and ad["list_id"] not in known]
+    report.already_known = len(ads) - len(todo)
+    if limit is not None:
+        todo = todo[:limit]
+
+    done = 0
+
+    async def on_result(index: int, url: str, html: Optional[str]):
+        nonlocal done
+        ad = todo[index]
+        if html is None:
+            # Échec réseau : pas d'enregistrement, l'annonce sera retentée au prochain job
+            report.failed += 1
+        else:
+            description = extract_description(html)
+            await asyncio.to_thread(storage.save_description, ad["list_id"], description)
+            if description is None:
+                report.missing += 1
+            else:
+                descriptions[ad["list_id"]] = description
+                report.fetched += 1
+        done += 1
+        if on_progress is not None:
+            await on_progress(done, len(todo))
+
+    try:
+        if todo:
+            async with AsyncFetcher(concurrency=concurrency, pool=get_proxy_pool(),
+                                    cache=get_response_cache()) as fetcher:
+                await fetcher.fetch_all([ad["url"] for ad in todo], on_result)
+    finally:
+        # Même en cas d'annulation : ce qui a été récupéré rejoint les fichiers
+        report.files_updated = await asyncio.to_thread(_write_back, files, signatures, descriptions,
+                                                         dataset.data_dir)
+    return report
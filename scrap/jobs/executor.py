@@ -0,0 +1,117 @@
+"""
+Exécuteur de jobs asynchrones : les traitements longs (scraping, ...) tournent
+en tâches asyncio en dehors des handlers du bot, qui rendent la main dès la
+soumission avec un identifiant de job.
+"""
+
+import asyncio
+import itertools
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_JOBS = 1
+HISTORY_SIZE = 20
+
+PENDING = "en attente"
+RUNNING = "en cours"
+DONE = "terminé"
+FAILED = "échec"
+CANCELLED = "annulé"
+
+
+@dataclass
+class Job:
+    """Un traitement soumis à l'exécuteur et son état d'avancement"""
+    id: int
+    name: str
+    owner: Optional[int] = None
+    total: Optional[int] = None
+    done: int = 0
+    status: str = PENDING
+    result: Any = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def advance(self, step: int = 1):
+        self.done += step
+
+    @property
+    def progress(self) -> str:
+        if self.total:
+            return f"{self.done}/{self.total}"
+        return str(self.done)
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in (PENDING, RUNNING)
+
+
+class JobManager:
+    """
+    Lance les jobs en tâches asyncio, au plus `max_concurrent` à la fois
+    (les suivants attendent leur tour), et garde l'historique des derniers jobs.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_JOBS, history_size: int = HISTORY_SIZE):
+        self._ids = itertools.count(1)
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._active: Dict[int, Job] = {}
+        self._history: Deque[Job] = deque(maxlen=history_size)
+
+    def submit(self, name: str, func: Callable[[Job], Awaitable[Any]],
+               owner: Optional[int] = None, total: Optional[int] = None) -> Job:
+        """
+        Soumet `func(job)` et retourne immédiatement le Job créé.
+        Doit être appelé depuis la boucle asyncio (handler du bot).
+        """
+        job = Job(id=next(self._ids), name=name, owner=owner, total=total)
+        self._active[job.id] = job
+        job.task = asyncio.create_task(self._run(job, func))
+        return job
+
+    async def _run(self, job: Job, func: Callable[[Job], Awaitable[Any]]):
+        try:
+            async with self._semaphore:
+                job.status = RUNNING
+                job.started_at = datetime.now()
+                job.result = await func(job)
+                job.status = DONE
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+        except Exception as e:
+            logger.exception(f"Job #{job.id} ({job.name}) en échec")
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now()
+            self._active.pop(job.id, None)
+            self._history.append(job)
+
+    def get(self, job_id: int) -> Optional[Job]:
+        if job_id in self._active:
+            return self._active[job_id]
+        return next((job for job in self._history if job.id == job_id), None)
+
+    def cancel(self, job_id: int) -> bool:
+        job = self._active.get(job_id)
+        if job is None or job.task is None:
+            return False
+        return job.task.cancel()
+
+    def active_jobs(self) -> List[Job]:
+        return list(self._active.values())
+
+    def recent_jobs(self) -> List[Job]:
+        return list(reversed(self._history))
+
+
+# Instance globale
+job_manager = JobManager()
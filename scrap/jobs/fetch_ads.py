@@ -1,45 +1,157 @@
-from scrap.infra.http_client import HttpClient
-from scrap.tests.test_http_client import extraire_ads_et_sauvegarder
-from time import sleep
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from scrap.infra.http_client import HttpClient, async_session_pool
+from scrap.infra.fetcher import AsyncFetcher, DEFAULT_CONCURRENCY
+from scrap.infra.proxy_pool import get_proxy_pool
+from scrap.core.dataset import DATA_DIR, dataset
+from scrap.core.parser import extract_ads, extract_description, write_ads
+from scrap.core.storage import get_storage
+from scrap.infra.retry import RequestFailed
 
-from scrap.tools.sleep_between import sleep_between
 from scrap.tools.replace_page_number import remplacer_page
 
+logger = logging.getLogger(__name__)
 
-def fetch_ads(url: str, nbr_page: int):
-    client = HttpClient()
-    total_ads = 0
-    for i in range(nbr_page):
-        sleep_between(5, 10)
-        url = remplacer_page(url, i + 1)
-        html = client.get(url)
-        if html is None:
-            continue
-        count = extraire_ads_et_sauvegarder(html, f"scrap/tools/scrap/data/ads_{i + 1}.json")
-        if count:
-            total_ads += count
-    return total_ads
+@dataclass
+class FetchReport:
+    """Bilan d'une recherche : pages téléchargées et annonces trouvées/enregistrées"""
+    pages: int = 0
+    ads: int = 0
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    # Pages restées inaccessibles malgré les nouvelles tentatives, avec la catégorie de l'erreur
+    failed_pages: Dict[int, str] = field(default_factory=dict)
+    # Page (1-indexée) entièrement connue qui a arrêté la pagination incrémentale
+    stopped_at: Optional[int] = None
+
+
+async def fetch_ads_async(url: str, nbr_page: int, concurrency: int = DEFAULT_CONCURRENCY, proxies=None,
+                          on_page=None, incremental: bool = False, write_files: bool = True) -> FetchReport:
+    """
+    Télécharge les nbr_page pages de résultats en parallèle (au plus
+    `concurrency` à la fois, délai de politesse par hôte et par proxy).
+    `on_page(numero_page, nb_annonces)` est attendu à chaque page terminée.
+    Les annonces sont enregistrées dans la base SQLite, rattachées à la
+    recherche, et écrites dans ads_<page>.json (jeu de données courant) sauf
+    si `write_files` est faux.
+
+    En mode incrémental, seules les annonces nouvelles ou modifiées (prix ou
+    titre) sont réécrites en base, et la pagination s'arrête dès qu'une page
+    ne contient que des annonces déjà connues et inchangées : les pages sont
+    alors demandées par vagues de `concurrency`, les suivantes ne sont pas
+    téléchargées. Les fichiers ads_<page>.json non réécrits sont conservés :
+    ils viennent de la même recherche et leurs annonces sont toujours en
+    ligne, seule la pagination s'est décalée.
+    """
+    # Sans liste explicite, les proxies sont choisis par le pool partagé selon
+    # leur santé (connexion directe tant que le pool est vide)
+    pool = get_proxy_pool() if proxies is None else None
+
+    storage = get_storage()
+    search_id = await asyncio.to_thread(storage.register_search, url)
+
+    report = FetchReport()
+    urls = [remplacer_page(url, i + 1) for i in range(nbr_page)]
+
+    async def store_page(page_number: int, ads) -> bool:
+        """Enregistre la page ; retourne True si elle ne contenait que des annonces connues et inchangées"""
+        if not incremental:
+            await asyncio.to_thread(storage.save_ads, ads, search_id)
+            report.new += len(ads)
+            return False
+        new, changed, unchanged = await asyncio.to_thread(storage.diff_ads, ads)
+        await asyncio.to_thread(storage.save_ads, new + changed, search_id)
+        await asyncio.to_thread(storage.touch, unchanged, search_id)
+        report.new += len(new)
+        report.changed += len(changed)
+        report.unchanged += len(unchanged)
+        logger.info(f"Page {page_number} : {len(new)} nouvelles, {len(changed)} modifiées, {len(unchanged)} inchangées")
+        return not new and not changed
+
+    async def on_result(index, page_url, html):
+        count = 0
+        page_number = index + 1
+        if html is not None:
+            try:
+                ads = extract_ads(html)
+            except json.JSONDecodeError as e:
+                logger.error(f"Tableau 'ads' mal formé (page {page_number}) : {e}")
+                ads = []
+            if ads:
+                if write_files:
+                    count = write_ads(ads, os.path.join(DATA_DIR, f"ads_{page_number}.json"))
+                else:
+                    count = len(ads)
+                report.ads += count
+                if await store_page(page_number, ads):
+                    if report.stopped_at is None or page_number < report.stopped_at:
+                        report.stopped_at = page_number
+            else:
+                logger.warning(f"Clé 'ads' non trouvée (page {page_number}).")
+        else:
+            failure = fetcher.failures.get(page_url)
+            report.failed_pages[page_number] = failure.kind if failure is not None else "inconnue"
+        report.pages += 1
+        if on_page is not None:
+            await on_page(page_number, count)
+
+    async with AsyncFetcher(proxies=proxies, concurrency=concurrency, pool=pool) as fetcher:
+        if not incremental:
+            await fetcher.fetch_all(urls, on_result)
+        else:
+            for offset in range(0, len(urls), concurrency):
+                wave = urls[offset:offset + concurrency]
+                await fetcher.fetch_all(wave, lambda i, page_url, html: on_result(offset + i, page_url, html))
+                if report.stopped_at is not None:
+                    logger.info(f"Page {report.stopped_at} déjà connue : arrêt de la pagination")
+                    break
+    return report
+
+
+def dataset_matches_search(url: str) -> bool:
+    """
+    Vrai si le jeu de données courant est vide ou ne contient que des annonces
+    de la recherche `url` : condition pour le compléter en mode incrémental
+    sans mélanger deux recherches.
+    """
+    list_ids = [ad["list_id"] for ad in dataset.raw()
+                if isinstance(ad, dict) and ad.get("list_id") is not None]
+    if not list_ids:
+        return True
+    linked = get_storage().search_ad_ids(url, list_ids)
+    return len(linked) == len(set(list_ids))
+
+
+def fetch_ads(url: str, nbr_page: int, incremental: bool = False) -> int:
+    async def run():
+        try:
+            return await fetch_ads_async(url, nbr_page, incremental=incremental)
+        finally:
+            # La boucle disparaît avec asyncio.run : on ferme sa session partagée
+            await async_session_pool.close()
+
+    return asyncio.run(run()).ads
 
 
 def fetch_description_ads(url:str):
+    """
+    Description d'une annonce à partir de son URL (page servie par le cache
+    disque si elle a été récupérée récemment). Lève ValueError si la page est
+    inaccessible ou sans description.
+    """
     client = HttpClient()
-    texte = client.get(url)
-    import re
-
-    # Regex pour capturer la chaîne entre "description": " et le guillemet fermant correspondant,
-    # en gérant le fait que la description peut contenir des retours à la ligne, accents, ponctuations, etc.
-    pattern = r'"description"\s*:\s*"((?:[^"\\]|\\.)*)"'
-
-    match = re.search(pattern, texte, re.DOTALL)
-    if match:
-        description = match.group(1)
-        # Optionnel : déséchapper les éventuels caractères échappés JSON
-        import codecs
-        description = codecs.decode(description, 'unicode_escape')
-        print(description)
-        return description
-    else:
-        print("Description non trouvée")
-        raise print("pas de description trouver")
-
-#fetch_description_ads("https://www.leboncoin.fr/ad/voitures/2997258439")
+    try:
+        texte = client.fetch(url)
+    except RequestFailed as e:
+        raise ValueError(f"page de l'annonce inaccessible ({e.kind})") from e
+
+    description = extract_description(texte)
+    if description is None:
+        raise ValueError("pas de description trouvée")
+    return description
@@ -1,5 +1,7 @@
 import json
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
 # Exemple de données (pour test)
@@ -20,27 +22,88 @@ data = [
     }
 ]
 
+INDEX_CACHE_SIZE = 10_000
+
+
+class _KeyIndex:
+    """
+    Index d'une annonce construit en un seul parcours : pour chaque clé
+    d'élément et chaque clé d'attribut, la liste de ses valeurs dans l'ordre
+    où find_element_value / get_attribute_value les renverraient.
+    """
+    __slots__ = ("data", "elements", "attributes")
+
+    def __init__(self, data):
+        # On garde une référence : l'id ne peut pas être réutilisé tant que l'index est en cache
+        self.data = data
+        self.elements = {}
+        self.attributes = {}
+        self._walk(data)
+
+    def _walk(self, node):
+        if isinstance(node, dict):
+            # Valeurs du nœud d'abord, puis celles des descendants dans l'ordre
+            for key, value in node.items():
+                self.elements.setdefault(key, []).append(value)
+            if "attributes" in node and isinstance(node["attributes"], list):
+                for attr in node["attributes"]:
+                    if isinstance(attr, dict):
+                        self.attributes.setdefault(attr.get("key"), []).append(attr.get("value"))
+            for value in node.values():
+                self._walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                self._walk(item)
+
+
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def _get_index(data):
+    """Index de l'annonce, construit au premier accès puis gardé en cache LRU"""
+    key = id(data)
+    with _index_lock:
+        index = _index_cache.get(key)
+        if index is not None and index.data is data:
+            _index_cache.move_to_end(key)
+            return index
+    index = _KeyIndex(data)
+    with _index_lock:
+        _index_cache[key] = index
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def clear_index_cache():
+    """Vide le cache d'index (à appeler si des annonces indexées ont été modifiées)"""
+    with _index_lock:
+        _index_cache.clear()
+
+
+def _lookup(data, table, key):
+    """Valeurs de la clé dans la table ('elements' ou 'attributes') de chaque annonce"""
+    if isinstance(data, dict):
+        values = getattr(_get_index(data), table).get(key)
+        return values if values is not None else []
+    if isinstance(data, list):
+        results = []
+        for item in data:
+            results.extend(_lookup(item, table, key))
+        return results
+    return []
+
+
 def get_attribute_value(data, attribute_key, index=None):
     """
     Récupère les valeurs des attributs dont 'key' == attribute_key.
     Si index est None, renvoie la liste complète.
     Si un index est fourni, renvoie la valeur à cet index ou None.
+    La liste renvoyée peut être partagée avec le cache d'index : ne pas la modifier.
     """
-    results = []
-    if isinstance(data, dict):
-        if "attributes" in data and isinstance(data["attributes"], list):
-            for attr in data["attributes"]:
-                if attr.get("key") == attribute_key:
-                    results.append(attr.get("value"))
-        for v in data.values():
-            sub = get_attribute_value(v, attribute_key)
-            if isinstance(sub, list):
-                results.extend(sub)
-    elif isinstance(data, list):
-        for item in data:
-            sub = get_attribute_value(item, attribute_key)
-            if isinstance(sub, list):
-                results.extend(sub)
+    results = _lookup(data, "attributes", attribute_key)
     if index is None:
         return results
     else:
@@ -51,20 +114,9 @@ def find_element_value(data, element_name, index=None):
     Récupère les valeurs de la clé element_name dans tout le JSON.
     Si index est None, renvoie la liste complète.
     Si un index est fourni, renvoie la valeur à cet index ou None.
+    La liste renvoyée peut être partagée avec le cache d'index : ne pas la modifier.
     """
-    results = []
-    if isinstance(data, dict):
-        if element_name in data:
-            results.append(data[element_name])
-        for v in data.values():
-            sub = find_element_value(v, element_name)
-            if isinstance(sub, list):
-                results.extend(sub)
-    elif isinstance(data, list):
-        for item in data:
-            sub = find_element_value(item, element_name)
-            if isinstance(sub, list):
-                results.extend(sub)
+    results = _lookup(data, "elements", element_name)
     if index is None:
         return results
     else:
@@ -83,46 +135,45 @@ def get_all_values(name, mode):
     """
     Récupère toutes les valeurs numériques d'un attribut ou élément dans tous les fichiers de scrap/tools/scrap/data.
     """
-    data_dir = os.path.join('scrap', 'tools', 'scrap', 'data')
+    # Import local : scrap.core.dataset dépend lui-même de ce module
+    from scrap.core.dataset import dataset
+
     values = []
-    for file in os.listdir(data_dir):
-        if file.startswith('ads_') and file.endswith('.json'):
-            file_path = os.path.join(data_dir, file)
-            print(f"Lecture du fichier : {file_path}")
-            with open(file_path, encoding='utf-8') as f:
-                data = json.load(f)
-            if mode == 'attribute':
-                vals = get_attribute_value(data, name)
-            elif mode == 'element':
-                vals = find_element_value(data, name)
-            else:
-                continue
-            print(f"Valeurs extraites pour {name} ({mode}) : {vals}")
-            if vals is None:
-                continue
-            for v in vals:
-                # Si la valeur est une liste, on traite chaque élément
-                if isinstance(v, list):
-                    for item in v:
-                        try:
-                            if isinstance(item, str):
-                                item = item.replace(',', '.').replace(' ', '')
-                            num = float(item)
-                            print(f"Valeur retenue (liste) : {num}")
-                            values.append(num)
-                        except (ValueError, TypeError):
-                            print(f"Valeur ignorée (liste, non numérique) : {item}")
-                            continue
-                else:
+    # Les annonces du cache restent les mêmes objets d'un appel à l'autre : leurs index sont réutilisés
+    for file, data in dataset.files().items():
+        print(f"Lecture du fichier : {file}")
+        if mode == 'attribute':
+            vals = get_attribute_value(data, name)
+        elif mode == 'element':
+            vals = find_element_value(data, name)
+        else:
+            continue
+        print(f"Valeurs extraites pour {name} ({mode}) : {vals}")
+        if vals is None:
+            continue
+        for v in vals:
+            # Si la valeur est une liste, on traite chaque élément
+            if isinstance(v, list):
+                for item in v:
                     try:
-                        if isinstance(v, str):
-                            v = v.replace(',', '.').replace(' ', '')
-                        num = float(v)
-                        print(f"Valeur retenue : {num}")
+                        if isinstance(item, str):
+                            item = item.replace(',', '.').replace(' ', '')
+                        num = float(item)
+                        print(f"Valeur retenue (liste) : {num}")
                         values.append(num)
                     except (ValueError, TypeError):
-                        print(f"Valeur ignorée (non numérique) : {v}")
+                        print(f"Valeur ignorée (liste, non numérique) : {item}")
                         continue
+            else:
+                try:
+                    if isinstance(v, str):
+                        v = v.replace(',', '.').replace(' ', '')
+                    num = float(v)
+                    print(f"Valeur retenue : {num}")
+                    values.append(num)
+                except (ValueError, TypeError):
+                    print(f"Valeur ignorée (non numérique) : {v}")
+                    continue
     print(f"Valeurs finales retenues pour {name} ({mode}) : {values}")
     return values
 
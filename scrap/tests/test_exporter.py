@@ -0,0 +1,74 @@
+import os
+import tempfile
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from scrap.core import exporter
+from scrap.core.exporter import DataExporter, ExportFrames, _excel_sheets
+
+
+def _frames(nb_rows: int) -> ExportFrames:
+    flat = pd.DataFrame({"list_id": range(nb_rows), "subject": [f"Annonce {i}" for i in range(nb_rows)],
+                         "price": [1000.0 + i for i in range(nb_rows)]})
+    simple = flat[["list_id", "subject"]]
+    stats = pd.DataFrame({"Métrique": ["Nombre d'annonces"], "Valeur": [nb_rows]})
+    return ExportFrames(data=[], flat=flat, simple=simple, stats=stats)
+
+
+def test_excel_sheets_split():
+    df = _frames(7).flat
+    # 4 lignes par feuille dont l'en-tête : 3 annonces par feuille
+    sheets = [(name, header, list(rows)) for name, header, rows in _excel_sheets("Données", df, max_rows=4)]
+    assert [name for name, _, _ in sheets] == ["Données", "Données (2)", "Données (3)"]
+    assert [len(rows) for _, _, rows in sheets] == [3, 3, 1]
+    assert all(header == ["list_id", "subject", "price"] for _, header, _ in sheets)
+    assert [row[0] for _, _, rows in sheets for row in rows] == list(range(7))
+    # Sous la limite (ou DataFrame vide) : une seule feuille, avec son en-tête
+    assert [name for name, _, _ in _excel_sheets("Données", df, max_rows=100)] == ["Données"]
+    empty = list(_excel_sheets("Statistiques", df.iloc[0:0]))
+    assert [(name, header, list(rows)) for name, header, rows in empty] == \
+        [("Statistiques", ["list_id", "subject", "price"], [])]
+
+
+def _check_split_workbook(xlsxwriter_available: bool):
+    saved = exporter.EXCEL_MAX_ROWS, exporter.XLSXWRITER_AVAILABLE
+    exporter.EXCEL_MAX_ROWS = 4
+    exporter.XLSXWRITER_AVAILABLE = xlsxwriter_available
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "export.xlsx")
+            DataExporter(directory)._write_excel(_frames(7), filepath)
+            workbook = load_workbook(filepath, read_only=True)
+            sheets = {name: [list(row) for row in workbook[name].iter_rows(values_only=True)]
+                      for name in workbook.sheetnames}
+            workbook.close()
+    finally:
+        exporter.EXCEL_MAX_ROWS, exporter.XLSXWRITER_AVAILABLE = saved
+
+    assert list(sheets) == ["Données", "Données (2)", "Données (3)",
+                            "Données_Originales", "Données_Originales (2)", "Données_Originales (3)",
+                            "Statistiques"]
+    for name in ("Données", "Données (2)", "Données (3)"):
+        assert sheets[name][0] == ["list_id", "subject", "price"]
+    for name in ("Données_Originales", "Données_Originales (2)", "Données_Originales (3)"):
+        assert sheets[name][0] == ["list_id", "subject"]
+    assert [len(sheets[name]) - 1 for name in ("Données", "Données (2)", "Données (3)")] == [3, 3, 1]
+    assert sheets["Données (2)"][1] == [3, "Annonce 3", 1003]
+    assert sheets["Données (3)"][1] == [6, "Annonce 6", 1006]
+    assert sheets["Statistiques"] == [["Métrique", "Valeur"], ["Nombre d'annonces", 7]]
+
+
+def test_write_excel_split_xlsxwriter():
+    _check_split_workbook(xlsxwriter_available=True)
+
+
+def test_write_excel_split_openpyxl():
+    _check_split_workbook(xlsxwriter_available=False)
+
+
+if __name__ == "__main__":
+    test_excel_sheets_split()
+    test_write_excel_split_xlsxwriter()
+    test_write_excel_split_openpyxl()
+    print("✅ Découpage des feuilles Excel OK")
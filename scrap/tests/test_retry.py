@@ -0,0 +1,78 @@
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+from curl_cffi.requests import exceptions
+
+from scrap.infra.retry import (BLOCKED, CLIENT, OK, PROXY, RATE_LIMITED, RETRYABLE, SERVER, TIMEOUT,
+                               RetryPolicy, TokenBucket, classify_error, classify_response, parse_retry_after)
+
+
+def test_classify_error():
+    assert classify_error(exceptions.Timeout("lent")) == TIMEOUT
+    assert classify_error(exceptions.ReadTimeout("lent")) == TIMEOUT
+    assert classify_error(exceptions.ProxyError("proxy")) == PROXY
+    assert classify_error(exceptions.ConnectionError("refusé")) == PROXY
+    assert classify_error(exceptions.SSLError("tls")) == PROXY
+    # Erreurs qu'une nouvelle tentative ne corrigerait pas
+    assert classify_error(exceptions.InvalidURL("url")) == CLIENT
+    assert classify_error(exceptions.TooManyRedirects("boucle")) == CLIENT
+    assert classify_error(exceptions.RequestException("autre")) == CLIENT
+    assert CLIENT not in RETRYABLE
+
+
+def test_classify_response():
+    assert classify_response(200, "<html>annonces</html>") == OK
+    assert classify_response(429) == RATE_LIMITED
+    assert classify_response(403) == BLOCKED
+    assert classify_response(407) == PROXY
+    assert classify_response(503) == SERVER
+    assert classify_response(404) == CLIENT
+    # Challenge anti-bot servi avec un 200
+    assert classify_response(200, '<script src="https://geo.captcha-delivery.com/c.js">') == BLOCKED
+    # Une vraie page longue qui mentionne le marqueur n'est pas un challenge
+    assert classify_response(200, "datadome" + "x" * 60_000) == OK
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(" 5 ") == 5.0
+    assert parse_retry_after("demain") is None
+    future = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 <= parse_retry_after(future) <= 60
+    past = format_datetime(datetime.now(timezone.utc) - timedelta(seconds=60), usegmt=True)
+    assert parse_retry_after(past) == 0.0
+
+
+def test_retry_policy_delay():
+    policy = RetryPolicy(max_attempts=3, base_delay=2.0, max_delay=10.0)
+    for attempt in range(1, 6):
+        assert 0 <= policy.delay(attempt) <= min(10.0, 2.0 * 2 ** (attempt - 1))
+    # Retry-After prime, borné par max_delay
+    assert policy.delay(1, retry_after=7) >= 7
+    assert policy.delay(1, retry_after=3600) == 10.0
+    assert policy.should_retry(TIMEOUT, 2)
+    assert not policy.should_retry(TIMEOUT, 3)
+    assert not policy.should_retry(CLIENT, 1)
+
+
+def test_token_bucket_reserve():
+    bucket = TokenBucket(rate=1.0, burst=2)
+    # La rafale passe sans attente, la requête suivante attend un jeton
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert 0.9 <= bucket.reserve() <= 1.0
+    assert 1.9 <= bucket.reserve() <= 2.0
+    paused = TokenBucket(rate=100.0, burst=5)
+    paused.paused_until = paused.updated + 30
+    assert 29 <= paused.reserve() <= 30
+
+
+if __name__ == "__main__":
+    test_classify_error()
+    test_classify_response()
+    test_parse_retry_after()
+    test_retry_policy_delay()
+    test_token_bucket_reserve()
+    print("✅ Politique de requêtes OK")
@@ -0,0 +1,46 @@
+# scrap/tools/proxy_judge.py
+
+"""
+Endpoint "juge" local pour la validation des proxies, compatible avec la
+réponse de httpbin.org/get : {"origin": <ip vue>, "headers": {...}}.
+
+    python -m scrap.tools.proxy_judge 8899
+    PROXY_JUDGE_URL=http://<ip publique>:8899/get python -m scrap.tools.test_proxy
+
+Le juge doit être joignable depuis les proxies (IP publique, port ouvert).
+"""
+
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8899
+
+
+class JudgeHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({
+            "origin": self.client_address[0],
+            "headers": dict(self.headers.items()),
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_judge(host: str = "0.0.0.0", port: int = DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), JudgeHandler)
+    print(f"⚖️ Juge de proxies sur http://{host}:{port}/get")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve_judge(port=int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT)
@@ -1,5 +1,31 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
 from curl_cffi import requests
-from typing import List
+
+# Endpoint "juge" : renvoie l'IP vue et les en-têtes reçus (format httpbin /get).
+# Peut pointer vers un juge local : python -m scrap.tools.proxy_judge
+JUDGE_URL = os.environ.get("PROXY_JUDGE_URL", "https://httpbin.org/get")
+VALIDATION_CONCURRENCY = 50
+VALIDATION_TIMEOUT = 10
+
+# En-têtes ajoutés par les proxies qui se déclarent comme tels
+PROXY_HEADERS = {"via", "x-forwarded-for", "x-real-ip", "forwarded", "proxy-connection", "x-proxy-id"}
+
+TRANSPARENT = "transparent"
+ANONYMOUS = "anonyme"
+ELITE = "élite"
+
+
+@dataclass
+class ProxyCheck:
+    """Proxy validé, avec sa latence mesurée et son niveau d'anonymat"""
+    proxy: str
+    latency: float
+    anonymity: str
 
 def tester_proxies(proxies: List[str], url: str = "https://httpbin.org/ip") -> List[str]:
     proxies_valides = []
@@ -25,7 +51,67 @@ def tester_proxies(proxies: List[str], url: str = "https://httpbin.org/ip") -> L
 
     return proxies_valides
 
-import json
+def _anonymity(payload: dict, real_ip: Optional[str]) -> str:
+    """Transparent si notre IP fuit, anonyme si le proxy se signale, élite sinon"""
+    headers = {k.lower(): str(v) for k, v in (payload.get("headers") or {}).items()}
+    seen = str(payload.get("origin", "")) + " " + " ".join(headers.values())
+    if real_ip and real_ip in seen:
+        return TRANSPARENT
+    if PROXY_HEADERS & headers.keys():
+        return ANONYMOUS
+    return ELITE
+
+
+async def valider_proxies_async(proxies: List[str], url: str = JUDGE_URL,
+                                concurrency: int = VALIDATION_CONCURRENCY,
+                                timeout: float = VALIDATION_TIMEOUT,
+                                on_valid: Optional[Callable[[ProxyCheck], Awaitable[None]]] = None
+                                ) -> List[ProxyCheck]:
+    """
+    Teste les proxies en parallèle (au plus `concurrency` à la fois) contre
+    l'endpoint juge. Les proxies transparents (qui transmettent notre IP) sont
+    rejetés. `on_valid(check)` est attendu dès qu'un proxy passe, sans
+    attendre la fin de la validation. Retourne les proxies valides, du plus
+    rapide au plus lent.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    valid: List[ProxyCheck] = []
+
+    async with requests.AsyncSession(impersonate="chrome110", timeout=timeout,
+                                     max_clients=concurrency) as session:
+        # IP réelle (sans proxy) pour détecter les proxies transparents
+        try:
+            real_ip = (await session.get(url)).json().get("origin")
+        except Exception as e:
+            print(f"⚠️ IP réelle inconnue, anonymat non vérifié : {e}")
+            real_ip = None
+
+        async def check(proxy: str):
+            async with semaphore:
+                start = time.monotonic()
+                try:
+                    response = await session.get(url, proxy=proxy)
+                    latency = time.monotonic() - start
+                    payload = response.json() if response.status_code == 200 else None
+                except Exception as e:
+                    print(f"❌ Erreur avec le proxy {proxy} : {e}")
+                    return
+            if not isinstance(payload, dict):
+                print(f"❌ Proxy invalide (status {response.status_code}) : {proxy}")
+                return
+            result = ProxyCheck(proxy, latency, _anonymity(payload, real_ip))
+            if result.anonymity == TRANSPARENT:
+                # Notre IP fuit : inutile contre le blocage, le proxy est écarté
+                print(f"❌ Proxy transparent : {proxy}")
+                return
+            print(f"✅ Proxy valide : {proxy} → {latency:.2f}s, {result.anonymity}")
+            valid.append(result)
+            if on_valid is not None:
+                await on_valid(result)
+
+        await asyncio.gather(*(check(proxy) for proxy in dict.fromkeys(proxies)))
+
+    return sorted(valid, key=lambda result: result.latency)
 
 def charger_proxies_json_avance(chemin_fichier: str) -> list[dict]:
     """
@@ -45,12 +131,19 @@ def charger_proxies_json_avance(chemin_fichier: str) -> list[dict]:
         print(f"❌ Erreur lors du chargement : {e}")
         return []
 
-def generater_proxy_json():
-    pro = tester_proxies(charger_proxies_json_avance("scrap/config/proxies.json"))
+def sauvegarder_proxies_valides(checks: List[ProxyCheck]):
     with open("scrap/config/proxies_validated.json", "w", encoding="utf-8") as fichier:
-        json.dump(pro, fichier, indent=4)
+        json.dump([check.proxy for check in checks], fichier, indent=4)
+
+async def generater_proxy_json_async(on_valid=None, save: bool = True) -> List[ProxyCheck]:
+    checks = await valider_proxies_async(charger_proxies_json_avance("scrap/config/proxies.json"),
+                                         on_valid=on_valid)
+    if save:
+        sauvegarder_proxies_valides(checks)
+    return checks
+
+def generater_proxy_json():
+    return asyncio.run(generater_proxy_json_async())
 
 if __name__ == "__main__":
-    pro=tester_proxies(charger_proxies_json_avance("scrap/config/proxies.json"))
-    with open("scrap/config/proxies_validated.json", "w", encoding="utf-8") as fichier:
-        json.dump(pro, fichier, indent=4)
\ No newline at end of file
+    generater_proxy_json()
\ No newline at end of file
@@ -6,13 +6,15 @@ import os
 import glob
 import logging
 
+from scrap.core.dataset import DATA_DIR
+
 logger = logging.getLogger(__name__)
 
 def cleanup_ads_data():
     """
     Supprime tous les fichiers ads_*.json du répertoire de données
     """
-    data_dir = os.path.join("scrap", "tools", "scrap", "data")
+    data_dir = DATA_DIR
     
     if not os.path.exists(data_dir):
         logger.info("Répertoire de données n'existe pas, rien à nettoyer")
@@ -38,7 +40,7 @@ def get_ads_files_count():
     """
     Retourne le nombre de fichiers ads_*.json dans le répertoire de données
     """
-    data_dir = os.path.join("scrap", "tools", "scrap", "data")
+    data_dir = DATA_DIR
     
     if not os.path.exists(data_dir):
         return 0